@@ -2,5 +2,8 @@ from comparedmethods.vanilla_borda import *
 from comparedmethods.balanced_committee import *
 from comparedmethods.vanilla_stv import *
 from comparedmethods.rapf import *
+from comparedmethods.precedence import *
+from comparedmethods.stationary import *
 from comparedmethods.mc4 import *
+from comparedmethods.copeland import *
 from comparedmethods.epira import *
\ No newline at end of file
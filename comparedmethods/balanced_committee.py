@@ -3,36 +3,19 @@ References: https://github.com/huanglx12/Balanced-Committee-Election/blob/master
 
 """
 import numpy as np
-import gurobipy as gp
-from gurobipy import GRB
 import pandas as pd
 import iteround
+from src.borda import borda_ranking
 
 
 def get_borda_scores(preference_df, candidate_ids):
     """
     Calculate borda score per item.
-    :param profile_df: Dataframe of preference profile
+    :param profile_df: Dataframe of preference profile or EncodedProfile
     :param considered_candidates:  Numpy array of canidates ids
-    :return: Dictionary of borda scores where candidates are keys and scores are values
+    :return: candidates ordered by borda score and their scores
     """
-    num_rankings = len(preference_df.columns)
-    borda_scores = {key: 0 for key in candidate_ids}
-    num_items = len(candidate_ids) # use for borda count with same scores per ranking
-    for r in range(0, num_rankings):
-        single_ranking = preference_df[preference_df.columns[r]]  # isolate ranking
-        single_ranking = np.array(
-            single_ranking[~pd.isnull(single_ranking)]
-        )  # drop any NaNs
-        # num_items = len(single_ranking) # use for borda count with different scores per ranking
-        points_at_pos = list(range(num_items - 1, -1, -1))
-        for item_pos in range(0, len(single_ranking)):
-            item = single_ranking[item_pos]
-            borda_scores[item] +=points_at_pos[item_pos]
-
-    ids = list(borda_scores.keys())
-    new_scores = [borda_scores[cand] for cand in ids]
-    scores, ordered_candidate_ids = zip(*sorted(zip(new_scores, ids), reverse=True))
+    ordered_candidate_ids, scores = borda_ranking(preference_df, candidate_ids)
     return ordered_candidate_ids, scores
 
 
@@ -66,23 +49,73 @@ def _check_grp_cnts(per_grp, total_grp_cnts):
     return np.all(np.asarray(difs) < 0)
 
 
-def balanced_committee(profile_df, profile_item_group_dict, fair_rep, k_cnt):
+def balanced_committee(profile_df, profile_item_group_dict, fair_rep, k_cnt, extra_constraints=None):
     """
     Balancde Committee multiwinner voting from Celis et al. IJCAI'17
-    :param profile_df: Dataframe of preference profile
-    :param candidate_ids: List of candidates
+    :param profile_df: Dataframe of preference profile or EncodedProfile
     :param profile_item_group_dict: Dictionary of candidates (keys) and groups (values)
+    :param fair_rep: EQUAL or PROPORTIONAL (see get_bounds)
     :param k_cnt: length of consensus
+    :param extra_constraints: Optional function (model, x) adding constraints to the Gurobi model, x is keyed by
+        (candidate string, group string). Without it the program is solved exactly without Gurobi, when several
+        committees reach the best total Borda score the one of _greedy_committee is returned (Gurobi may return another)
     :return: consensus
     """
     #BORDA
     candidates, borda_scores = get_borda_scores(profile_df, list(profile_item_group_dict.keys()))
     item_strings = [str(var) for var in candidates]
     group_strings = [str(profile_item_group_dict[var]) for var in candidates]
-    item_grpid_combo_strings = list(zip(item_strings, group_strings))
     bound_dict = get_bounds(profile_item_group_dict, fair_rep, k_cnt)
+    if extra_constraints is None:
+        committee_items = _greedy_committee(item_strings, group_strings, borda_scores, bound_dict, k_cnt)
+    else:
+        committee_items = _gurobi_committee(item_strings, group_strings, borda_scores, bound_dict, k_cnt,
+                                            extra_constraints)
+    committee_items = np.asarray([i for i in committee_items])
+    return pd.DataFrame(committee_items)
+
+
+def _greedy_committee(item_strings, group_strings, borda_scores, bound_dict, k_cnt):
+    """
+    Exact solution when the only constraints are the committee size and the group lower bounds: the lb best candidates
+    of every group, then the best remaining candidates. Scores are additive, so swapping any member for a better
+    scoring non member that keeps the bounds can only raise the total.
+    Ties are broken explicitly: among candidates with equal scores the one earlier in item_strings (the Borda order of
+    get_borda_scores) is taken first, so the committee is deterministic. An integer program solver reaches the same
+    total score but may pick other candidates among the tied ones.
+    :param item_strings: List of candidates (as strings) in Borda order
+    :param group_strings: List of the group (as string) of every candidate
+    :param borda_scores: List of the Borda score of every candidate
+    :param bound_dict: Dictionary of groups (keys) and lower bounds (vals), see get_bounds
+    :param k_cnt: length of consensus
+    :return: list of committee members (as strings) in Borda order
+    """
+    order = np.argsort(-np.asarray(borda_scores, dtype=np.float64), kind='stable')
+    groups = np.asarray(group_strings, dtype=object)[order]
+    selected = np.zeros(len(item_strings), dtype=bool)
+    for grp_id, lb in bound_dict.items():
+        members = order[groups == str(grp_id)]
+        if lb > len(members):
+            raise ValueError("Infeasible balanced committee, group " + str(grp_id) + " has fewer than " + str(lb)
+                             + " candidates")
+        selected[members[:int(lb)]] = True
+    remaining = k_cnt - np.count_nonzero(selected)
+    if remaining < 0 or remaining > np.count_nonzero(~selected):
+        raise ValueError("Infeasible balanced committee, the group bounds do not fit a committee of " + str(k_cnt))
+    selected[order[~selected[order]][:remaining]] = True
+    return [item for item, s in zip(item_strings, selected) if s]
+
+
+def _gurobi_committee(item_strings, group_strings, borda_scores, bound_dict, k_cnt, extra_constraints):
+    """
+    Balanced Committee integer program solved by Gurobi, for constraints beyond the group lower bounds
+    :param extra_constraints: Function (model, x) adding constraints to the model
+    :return: list of committee members (as strings) in Borda order
+    """
+    import gurobipy as gp
+    from gurobipy import GRB
 
-    num_groups = len(list(bound_dict.keys()))
+    item_grpid_combo_strings = list(zip(item_strings, group_strings))
 
     # Declare and initialize model
     m = gp.Model('BalC')
@@ -96,7 +129,7 @@ def balanced_committee(profile_df, profile_item_group_dict, fair_rep, k_cnt):
     #constraints for bounds
     for grp_id, lb in bound_dict.items():
         m.addConstr((x.sum('*', str(grp_id)) >= lb), name ='group_bounds')
-        m.write('balcomm.lp')
+    extra_constraints(m, x)
 
     weights = {}
     iter = 0
@@ -106,28 +139,9 @@ def balanced_committee(profile_df, profile_item_group_dict, fair_rep, k_cnt):
 
     candidates, scores = gp.multidict(weights)
     # objective function
-    print("setting objective function.....")
     m.setObjective(x.prod(scores), GRB.MAXIMIZE)
-
-    # Save model for inspection
-    #m.write('balcomm.lp')
-
     m.optimize()
-    # Display optimal values of decision variables
-    # print("Printing variables....")
-    # for v in m.getVars():
-    #     if v.x > 1e-6:
-    #         print(v.varName, v.x)
 
     committee_vars = [var.varName for var in m.getVars() if var.x == 1 and var.varName.startswith('cand')]
     committee_items = [(var.split(',')[0]).split('[')[1] for var in committee_vars]
-    committee_items = np.asarray([i for i in committee_items])
-    return pd.DataFrame(committee_items)
-
-
-
-
-
-
-
-
+    return committee_items
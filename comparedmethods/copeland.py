@@ -0,0 +1,19 @@
+import pandas as pd
+import numpy as np
+from comparedmethods.precedence import pairwise_majority
+
+
+def copeland(profile_df, k_cnt):
+    """
+    Preference Aggregation by Copeland's method, candidates ordered by pairwise majority wins plus half of the ties
+    (among voters ranking both candidates), equal scores keep the order of first appearance in the profile
+    :param profile_df: Dataframe of preference profile or PairwiseMajority
+    :param k_cnt: length of consensus
+    :return: consensus ranking
+    """
+    majority = pairwise_majority(profile_df)
+    scores = majority.copeland_scores()
+    item_names = np.empty(majority.items, dtype=object)
+    item_names[list(majority.item_key.values())] = list(majority.item_key.keys())
+    result_ranking = np.asarray(item_names[np.argsort(-scores, kind='stable')].tolist())
+    return pd.DataFrame(result_ranking[0:k_cnt])
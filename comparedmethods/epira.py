@@ -1,6 +1,8 @@
 from src.groupaware_stv import *
 import src.imputation as imp
 import src.getset_representation as getset
+from src.encoded_profile import encode_profile
+from src.borda import borda_ranking
 
 def calc_exposure_ratio(ranking, group_ids):
 
@@ -122,35 +124,19 @@ def epiRA(consensus, item_group_dict, bnd, grporder):
 def __bordascoring(profile_df, candidate_ids, k_cnt):
     """
     BORDA preference aggregation.
-    :param profile_df: Dataframe of preference profile
+    :param profile_df: Dataframe of preference profile or EncodedProfile
     :param considered_candidates:  Numpy array of canidates ids
     :param k_cnt: length of consensus ranking
     :return:Dataframe of consensus ranking
     """
-    num_rankings = len(profile_df.columns)
-    borda_scores = {key: 0 for key in candidate_ids}
-    num_items = len(candidate_ids) # use for borda count with same scores per ranking
-    for r in range(0, num_rankings):
-        single_ranking = profile_df[profile_df.columns[r]]  # isolate ranking
-        single_ranking = np.array(
-            single_ranking[~pd.isnull(single_ranking)]
-        )  # drop any NaNs
-        # num_items = len(single_ranking) # use for borda count with different scores per ranking
-        points_at_pos = list(range(num_items - 1, -1, -1))
-        for item_pos in range(0, len(single_ranking)):
-            item = single_ranking[item_pos]
-            borda_scores[item] +=points_at_pos[item_pos]
-
-    ids = list(borda_scores.keys())
-    new_scores = [borda_scores[cand] for cand in ids]
-    scores, ordered_candidate_ids = zip(*sorted(zip(new_scores, ids), reverse=True))
+    ordered_candidate_ids, scores = borda_ranking(profile_df, candidate_ids)
     return ordered_candidate_ids[0:k_cnt]
 
 
 def EPIRA(profile_df, candidate_ids, profile_item_group_dict, k_cnt, epira_bnd):
     """
     EPIRA from Cachel et al. FAccT23
-    :param profile_df: Dataframe of preference profile
+    :param profile_df: Dataframe of preference profile or EncodedProfile
     :param candidate_ids: List of candidates
     :param profile_item_group_dict: Dictionary of candidates (keys) and groups (values)
     :param k_cnt: length of consensus
@@ -159,8 +145,11 @@ def EPIRA(profile_df, candidate_ids, profile_item_group_dict, k_cnt, epira_bnd):
     """
 
     #consensus = __bordascoring(profile_df, candidate_ids, k_cnt)
-    borda_k_cnt = len(np.unique(profile_df)) #get borda ranking of all candidates
-    consensus = __bordascoring(profile_df, candidate_ids, borda_k_cnt)
+    profile = encode_profile(profile_df, candidate_ids)
+    ranked = profile.ballots >= 0
+    #get borda ranking of all candidates (np.unique on the dataframe also counted NaN once)
+    borda_k_cnt = len(np.unique(profile.ballots[ranked])) + int(not np.all(ranked))
+    consensus = __bordascoring(profile, candidate_ids, borda_k_cnt)
     item_group_dict = dict(zip(consensus, [profile_item_group_dict[c] for c in consensus]))
     #Fairness of Exposure Post-Process
     consensus = epiRA(consensus, item_group_dict, epira_bnd, True)
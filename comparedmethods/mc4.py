@@ -1,5 +1,8 @@
+import warnings
 import pandas as pd
 import numpy as np
+from comparedmethods.precedence import get_voter_item_count, pairwise_majority
+from comparedmethods.stationary import power_iteration, stationary_distribution
 #References: https://github.com/kalyaniuniversity/MC4/blob/master/mc4/algorithm.py
 np.set_printoptions(formatter={'float': lambda x: "{0:0.6f}".format(x)})
 
@@ -14,24 +17,6 @@ def get_dataframe(file):
     return pd.read_csv(file)
 
 
-def get_voter_item_count(df):
-    """
-    :param df: Profile
-    :return: voters int: count of voters providing preferences, items int: count of items being ranked (each ranked by >= 1 voter)
-        item_key ndarray: array of unique items
-    """
-
-    voters = len(df.columns)
-    unique_items = pd.unique(df.values.ravel('K')) #this includes nan if we have a partial list
-    item_key = unique_items[~pd.isnull(unique_items)] #drop any nans
-    items = len(item_key)
-    int_vals = list(range(items))
-    item_key_dict = dict(zip(item_key, int_vals))
-    return voters, items, item_key_dict
-
-
-
-
 def fill_transition_matrix_mc4(df, items, item_key_dict):
     """
     Return partial transition matrix from the dataframe containing different ranks using mC4
@@ -40,24 +25,8 @@ def fill_transition_matrix_mc4(df, items, item_key_dict):
     :param item_key_dict: Dictionary of candidates (keys) and groups (values)
     :return: Transition matrix
     """
-    matrix = np.zeros((items,items))
-    df_np = df.to_numpy()
-    items = list(item_key_dict.keys())
-    for a in items:
-        for b in items:
-            if a != b:
-                ab_loc = np.bitwise_or(df_np == a, df_np == b) #locations of a and b
-                rank_both = np.count_nonzero(ab_loc, axis = 0) == 2 #voters who rank both a and b
-                pref_both = df_np[:,rank_both] #pref lists with both a and b
-                ab_compared_in = np.count_nonzero(rank_both)
-                a_over_b_count = 0
-                for i in range(ab_compared_in):
-                    a_over_b_count += np.count_nonzero(np.where(pref_both[:,i] == a)[0] < np.where(pref_both[:,i] == b)[0]) #count row index of a is < (higher) row index of b
-                if ab_compared_in > 0 and a_over_b_count / ab_compared_in  >= 0.5: #strict majority prefer a to b by voter ranking a and b
-                    matrix[item_key_dict[b],item_key_dict[a]] = 1
-                else:
-                    matrix[item_key_dict[b], item_key_dict[a]] = 0
-    return matrix
+    #strict majority prefer a to b by voter ranking a and b
+    return pairwise_majority(df, item_key_dict).transition_matrix('MC4')
 
 
 def get_normalized_transition_matrix(partial_mat, items):
@@ -123,63 +92,109 @@ def solve_stationary_distribution_matrix(state_matrix, transition_matrix, precis
     :param iterations: number of iterations to reach stationary distribution
     :return: stationary distribution matrix
     """
-    counter = 1
+    return power_iteration(transition_matrix, precision, iterations, state_matrix)[0]
 
-    while counter <= iterations:
+def extract_ranks(matrix, item_key):
+    """
+    Get ranking from matrix
+    :param matrix: final matrix
+    :param item_key: Dictionary of candidates (keys)
+    :return: Consensus ranking
+    """
+    item_names = np.empty(len(item_key), dtype=object)
+    item_names[list(item_key.values())] = list(item_key.keys())
+    #highest first, ties by index, nan (diverged states) before everything like np.argmax
+    state_matrix = np.asarray(matrix)
+    order = np.lexsort((-state_matrix, ~np.isnan(state_matrix)))
+    return np.asarray(item_names[order].tolist())
 
-        current_state_matrix = state_matrix
 
-        new_state_matrix = state_matrix.dot(transition_matrix)
+def markov_chain_stationary(profile_df, method, solver='power', precision=0.0000001, iterations=500):
+    """
+    Stationary distribution of the Markov chain methods of Dwork et al.
+    MC1-MC3 transition matrices already hold probabilities, MC4 moves to a uniformly picked candidate when the
+    majority prefers it (each transition 1 / items, as get_normalized_transition_matrix).
+    :param profile_df: Dataframe of preference profile or PairwiseMajority
+    :param method: MC1, MC2, MC3 or MC4 (see PairwiseMajority.transition_matrix)
+    :param solver: stationary distribution solver, power, direct or eigs (see stationary_distribution)
+    :param precision: acceptable error margin for convergence
+    :param iterations: maximum number of iterations
+    :return: stationary distribution matrix, number of iterations run, residual (a RuntimeWarning reports a residual
+        that is not finite or above the precision)
+    """
+    alpha = 1 / 7
+    majority = pairwise_majority(profile_df)
+    items = majority.items
+    partial_transition_matrix = majority.transition_matrix(method)
+    if method == 'MC4':
+        normalized_transition_matrix = get_normalized_transition_matrix(partial_transition_matrix, items)
+    else:
+        normalized_transition_matrix = fix_diagnols(partial_transition_matrix, items)
+    ergodic_transition_matrix = ergodic_transition(normalized_transition_matrix, alpha, items)
+    stationary_distribution_matrix, iterations_run, residual = stationary_distribution(ergodic_transition_matrix,
+                                                                                        solver, precision, iterations)
+    #power iteration stops once every entry moves by less than precision, so its L1 residual can reach items * precision
+    if not np.isfinite(residual) or residual > precision * items:
+        warnings.warn(method + " stationary distribution did not converge (solver " + str(solver) + ", "
+                      + str(iterations_run) + " iterations, residual " + str(residual)
+                      + "), the ranking is taken from that state", RuntimeWarning)
+    return stationary_distribution_matrix, iterations_run, residual
 
-        error = new_state_matrix - current_state_matrix
 
-        if (np.abs(error) < precision).all():
-            break
+def markov_chain_ranking(profile_df, k_cnt, method, solver='power'):
+    """
+    Preference Aggregation by the Markov chain methods of Dwork et al.
+    :param profile_df: Dataframe of preference profile or PairwiseMajority (shared by every method on one profile)
+    :param k_cnt: length of consensus
+    :param method: MC1, MC2, MC3 or MC4 (see PairwiseMajority.transition_matrix)
+    :param solver: stationary distribution solver, power, direct or eigs (see stationary_distribution)
+    :return: consensus ranking
+    """
+    majority = pairwise_majority(profile_df)
+    stationary_distribution_matrix, _, _ = markov_chain_stationary(majority, method, solver)
+    result_ranking = extract_ranks(stationary_distribution_matrix, majority.item_key)
+    return pd.DataFrame(result_ranking[0:k_cnt])
 
-        state_matrix = new_state_matrix
 
-        counter += 1
+def mc1(profile_df, k_cnt, solver='power'):
+    """
+    Preference Aggregation by Dwork et al. MC1 Algorithm
+    :param profile_df: Dataframe of preference profile or PairwiseMajority
+    :param k_cnt: length of consensus
+    :param solver: stationary distribution solver, power, direct or eigs (see stationary_distribution)
+    :return: consensus ranking
+    """
+    return markov_chain_ranking(profile_df, k_cnt, 'MC1', solver)
 
-    return state_matrix
 
-def extract_ranks(matrix, item_key):
+def mc2(profile_df, k_cnt, solver='power'):
     """
-    Get ranking from matrix
-    :param matrix: final matrix
-    :param item_key: Dictionary of candidates (keys)
-    :return: Consensus ranking
+    Preference Aggregation by Dwork et al. MC2 Algorithm
+    :param profile_df: Dataframe of preference profile or PairwiseMajority
+    :param k_cnt: length of consensus
+    :param solver: stationary distribution solver, power, direct or eigs (see stationary_distribution)
+    :return: consensus ranking
     """
-    state_matrix = np.copy(matrix)
-    ranking = []
-    item_names = list(item_key.keys())
-    item_indexers = list(item_key.values())
-    for i in range(len(item_key)):
-        max_indx = np.argmax(state_matrix)
-        ranking.append(item_names[item_indexers.index(max_indx)])
-        state_matrix[max_indx] = -np.inf
-
-    return np.asarray(ranking)
+    return markov_chain_ranking(profile_df, k_cnt, 'MC2', solver)
 
 
-def mc4(profile_df, k_cnt):
+def mc3(profile_df, k_cnt, solver='power'):
     """
-    Preference Aggregation by Dwork et al. MC4 Algorithm
-    :param profile_df: Dataframe of preference profile
+    Preference Aggregation by Dwork et al. MC3 Algorithm
+    :param profile_df: Dataframe of preference profile or PairwiseMajority
     :param k_cnt: length of consensus
+    :param solver: stationary distribution solver, power, direct or eigs (see stationary_distribution)
     :return: consensus ranking
     """
-    alpha = 1 / 7
-    precision = 0.0000001,
-    iterations = 500
-    voters, items, item_key = get_voter_item_count(profile_df)
-    partial_transition_matrix = fill_transition_matrix_mc4(profile_df, items, item_key)
-    normalized_transition_matrix = fix_diagnols(partial_transition_matrix, items)
-    ergodic_transition_matrix = ergodic_transition(normalized_transition_matrix, alpha, items)
-    initial_distribution_matrix = get_initial_distribution_matrix(items)
+    return markov_chain_ranking(profile_df, k_cnt, 'MC3', solver)
 
-    stationary_distribution_matrix = solve_stationary_distribution_matrix(initial_distribution_matrix,
-                                                                          ergodic_transition_matrix, precision,
-                                                                          iterations)
-    result_ranking = extract_ranks(stationary_distribution_matrix, item_key)
-    return pd.DataFrame(result_ranking[0:k_cnt])
 
+def mc4(profile_df, k_cnt, solver='power'):
+    """
+    Preference Aggregation by Dwork et al. MC4 Algorithm
+    :param profile_df: Dataframe of preference profile or PairwiseMajority
+    :param k_cnt: length of consensus
+    :param solver: stationary distribution solver, power, direct or eigs (see stationary_distribution)
+    :return: consensus ranking
+    """
+    return markov_chain_ranking(profile_df, k_cnt, 'MC4', solver)
@@ -0,0 +1,143 @@
+import pandas as pd
+import numpy as np
+
+
+def get_voter_item_count(df):
+    """
+    :param df: Profile
+    :return: voters int: count of voters providing preferences, items int: count of items being ranked (each ranked by >= 1 voter)
+        item_key ndarray: array of unique items
+    """
+
+    voters = len(df.columns)
+    unique_items = pd.unique(df.values.ravel('K')) #this includes nan if we have a partial list
+    item_key = unique_items[~pd.isnull(unique_items)] #drop any nans
+    items = len(item_key)
+    int_vals = list(range(items))
+    item_key_dict = dict(zip(item_key, int_vals))
+    return voters, items, item_key_dict
+
+
+def position_matrix(df, item_key_dict):
+    """
+    Position of every candidate in every ranking of a profile
+    :param df: Dataframe of preference profile (one column per voter, nan after a partial list ends)
+    :param item_key_dict: Dictionary of candidates (keys) and their indexes (values)
+    :return: Numpy int64 array (voters x items), row index of the candidate in the voter's column (first occurrence)
+        or the depth of the profile when the voter does not rank it
+    """
+    df_np = df.to_numpy()
+    depth, voters = df_np.shape
+    codes = pd.Series(df_np.ravel()).map(item_key_dict).to_numpy(dtype=np.float64).reshape(depth, voters)
+    ranked = ~np.isnan(codes)
+    rows, cols = np.nonzero(ranked)
+    positions = np.full((voters, len(item_key_dict)), depth, dtype=np.int64)
+    np.minimum.at(positions, (cols, codes[ranked].astype(np.int64)), rows)
+    return positions
+
+
+class PairwiseMajority:
+    """
+    Pairwise comparisons of a profile, computed once and shared by the pairwise methods (Copeland, MC1-MC4).
+    A single blocked broadcasting pass over the position matrix fills every count the methods are derived from:
+    above (a ranked above b), both (a and b ranked) and the MC2/MC3 weighted variants of above.
+    """
+
+    def __init__(self, df, item_key_dict=None, block_size=2 ** 24):
+        """
+        :param df: Dataframe of preference profile
+        :param item_key_dict: Dictionary of candidates (keys) and their indexes (values), see get_voter_item_count
+        :param block_size: Number of (voter, a, b) comparisons evaluated together, bounds the memory of a block
+        """
+        if item_key_dict is None:
+            _, _, item_key_dict = get_voter_item_count(df)
+        self.item_key = item_key_dict
+        self.items = len(item_key_dict)
+        self.positions = position_matrix(df, item_key_dict)
+        self.voters = self.positions.shape[0]
+        ranked = self.positions < df.shape[0]
+        self.ranked_by = np.count_nonzero(ranked, axis=0)  # voters ranking each candidate
+        ranked_float = ranked.astype(np.float64)
+        self.both = np.rint(ranked_float.T @ ranked_float).astype(np.int64)
+
+        # weight of voter v for candidate a: 1 (counts), 1 / (position + 1) (MC2), 1 / list length (MC3)
+        lengths = np.maximum(np.count_nonzero(ranked, axis=1), 1)[:, None]
+        weights = np.stack([ranked_float, ranked_float / (self.positions + 1), ranked_float / lengths])
+        preceding = np.zeros((self.items, 3, self.items))  # [a, weight, b]: voters ranking b above a (a ranked)
+        step = max(1, block_size // max(self.voters * self.items, 1))
+        for start in range(0, self.items, step):
+            block = self.positions[:, start:start + step, None]
+            # b above a already implies b is ranked, a is ranked through the weights
+            b_above = (self.positions[:, None, :] < block).astype(np.float64).transpose(1, 0, 2)
+            preceding[start:start + step] = weights[:, :, start:start + step].transpose(2, 0, 1) @ b_above
+        self.above = np.rint(preceding[:, 0, :]).T.astype(np.int64)
+        self.mc2_preceding = preceding[:, 1, :]
+        self.mc3_preceding = preceding[:, 2, :]
+
+    def majority(self):
+        """
+        :return: Numpy bool array (items x items), True where at least half of the voters ranking both a and b put
+            a above b (ties count for both)
+        """
+        return (self.both > 0) & (2 * self.above >= self.both)
+
+    def copeland_scores(self):
+        """
+        Copeland score of every candidate: pairwise majority wins plus half of the pairwise ties
+        :return: Numpy float array indexed like item_key
+        """
+        wins = (self.both > 0) & (2 * self.above > self.both)
+        ties = (self.both > 0) & (2 * self.above == self.both)
+        np.fill_diagonal(ties, False)
+        return np.count_nonzero(wins, axis=1) + 0.5 * np.count_nonzero(ties, axis=1)
+
+    def transition_matrix(self, method):
+        """
+        Off-diagonal transitions of the Markov chain methods of Dwork et al., the diagonal is left to fix_diagnols
+        MC1: move uniformly to a candidate some voter ranks above the current one (or stay)
+        MC2: pick a voter ranking the current candidate, move uniformly to a candidate it ranks at least as high
+        MC3: pick a voter ranking the current candidate and one of its candidates, move there if ranked higher
+        MC4: 1 where the majority of voters ranking both prefer the other candidate (as fill_transition_matrix_mc4)
+        :param method: MC1, MC2, MC3 or MC4
+        :return: Numpy float64 array (items x items), row: current candidate, column: next candidate
+        """
+        if method == 'MC1':
+            reachable = self.above.T > 0
+            np.fill_diagonal(reachable, False)
+            matrix = reachable / (np.count_nonzero(reachable, axis=1) + 1)[:, None]
+        elif method == 'MC2':
+            matrix = self.mc2_preceding / np.maximum(self.ranked_by, 1)[:, None]
+        elif method == 'MC3':
+            matrix = self.mc3_preceding / np.maximum(self.ranked_by, 1)[:, None]
+        elif method == 'MC4':
+            matrix = self.majority().T.astype(np.float64)
+        else:
+            raise ValueError("Unknown Markov chain method " + str(method) + ", use MC1, MC2, MC3 or MC4")
+        matrix = np.array(matrix, dtype=np.float64, order='C')
+        np.fill_diagonal(matrix, 0)
+        return matrix
+
+
+def pairwise_majority(df, item_key_dict=None):
+    """
+    Build the pairwise comparisons of a profile
+    :param df: Dataframe of preference profile or PairwiseMajority
+    :param item_key_dict: Dictionary of candidates (keys) and their indexes (values), see get_voter_item_count
+    :return: PairwiseMajority
+    """
+    if isinstance(df, PairwiseMajority):
+        return df
+    return PairwiseMajority(df, item_key_dict)
+
+
+def precedence_counts(df, item_key_dict, block_size=2 ** 24):
+    """
+    Pairwise precedence counts of a profile
+    :param df: Dataframe of preference profile
+    :param item_key_dict: Dictionary of candidates (keys) and their indexes (values)
+    :param block_size: Number of (voter, a, b) comparisons evaluated together, bounds the memory of a block
+    :return: above ndarray (items x items): number of voters ranking a above b, among voters ranking both,
+        both ndarray (items x items): number of voters ranking both a and b
+    """
+    majority = PairwiseMajority(df, item_key_dict, block_size)
+    return majority.above, majority.both
@@ -1,13 +1,135 @@
 import numpy as np
 import pandas as pd
-import networkx as nx
+import scipy.optimize
 import random
-import math
 sd = 123
 random.seed(sd)
 np.random.seed(sd)
 #References: https://github.com/MouinulIslamNJIT/Rank-Aggregation_Proportionate_Fairness/blob/main/AlgRAPF.py
 
+def rank_ranges(group):
+    """
+    Positions every item may take in a proportionate fair ranking (rankRange of RAPF): the i-th of the fp items of a
+    group spans floor((i - 1) * n / fp) + 1 to ceil(i * n / fp), capped at n
+    :param group: List of the group of every item, in ranking order
+    :return: r1 ndarray, r2 ndarray of 1-indexed positions
+    """
+    numberOfItem = len(group)
+    group_codes = pd.factorize(pd.Series(group, dtype=object), use_na_sentinel=False)[0]
+    grpCount = np.bincount(group_codes)[group_codes]
+    rankGrpPos = pd.Series(group_codes).groupby(group_codes).cumcount().to_numpy() + 1
+    r1 = (rankGrpPos - 1) * numberOfItem // grpCount + 1
+    r2 = np.minimum(-(-rankGrpPos * numberOfItem // grpCount), numberOfItem)
+    return r1, r2
+
+
+def fair_reranking(single_ranking, group):
+    """
+    RAPF fair re-ranking of one base ranking: the minimum cost assignment of its items to positions inside their
+    rank ranges (see rank_ranges)
+    :param single_ranking: Numpy int array of the items of the base ranking (candidate codes), in ranking order
+    :param group: List of the group of every item
+    :return: Numpy int array of candidate codes, the fair ranking
+    """
+    numberOfItem = len(single_ranking)
+    r1, r2 = rank_ranges(group)
+
+    # rows are the items in ranking order, columns the positions 1..n, so ties between optimal assignments always
+    # break the same way; an item outside its range costs 1e11
+    positions = np.arange(1, numberOfItem + 1)
+    in_range = (positions >= r1[:, None]) & (positions <= r2[:, None])
+    cost = np.where(in_range, np.abs(single_ranking[:, None] - positions), 100000000000).astype(np.float64)
+    matched_rows, matched_cols = scipy.optimize.linear_sum_assignment(cost)
+
+    ranking = np.zeros(numberOfItem, dtype=int)
+    ranking[matched_cols] = single_ranking[matched_rows]
+    return ranking
+
+
+def _fair_reranking_task(task):
+    return fair_reranking(*task)
+
+
+class RAPFBatch:
+    """
+    RAPF for many seeds of one profile. A seed only selects the voter whose ranking is re-ranked, so the fair
+    re-ranking of every voter is computed at most once (cached by voter index) and any set of seeds is a lookup.
+    """
+
+    def __init__(self, profile_df, profile_item_group_dict):
+        """
+        :param profile_df: Dataframe of preference profile
+        :param profile_item_group_dict: Dictionary of candidates (keys) and groups (values)
+        """
+        self.profile_df = profile_df
+        self.profile_item_group_dict = profile_item_group_dict
+        #Their code wants candidates to be represented by ints
+        self.int_to_string_cand = list(profile_item_group_dict.keys())
+        self.string_to_int_cand = dict(zip(list(profile_item_group_dict.keys()), range(len(profile_item_group_dict))))
+        self.num_rankings = len(profile_df.columns)
+        self.fair_rankings = {}  # voter index: fair re-ranking (candidate codes)
+
+    def voter(self, seed):
+        """
+        Voter whose ranking RAPF re-ranks for a seed, seeds random and np.random like RAPF does
+        :param seed: seed for reproducability
+        :return: voter index
+        """
+        np.random.seed(seed)  # for reproducibility
+        random.seed(seed) # for reproducibility
+        return random.randint(0,self.num_rankings-1)
+
+    def _task(self, voter):
+        single_ranking = self.profile_df[self.profile_df.columns[voter]]  # isolate ranking
+        single_ranking = np.array(
+            single_ranking[~pd.isnull(single_ranking)]
+        )
+        group = [self.profile_item_group_dict[i] for i in single_ranking]
+        return np.asarray([self.string_to_int_cand[c] for c in single_ranking]), group
+
+    def precompute(self, voters=None, processes=None):
+        """
+        Fill the cache for a set of voters
+        :param voters: Iterable of voter indexes, defaults to every voter
+        :param processes: Number of worker processes, None or 1 computes in this process (same rankings either way)
+        """
+        voters = range(self.num_rankings) if voters is None else voters
+        voters = [v for v in dict.fromkeys(voters) if v not in self.fair_rankings]
+        if processes is None or processes <= 1 or len(voters) <= 1:
+            for v in voters:
+                self.fair_rankings[v] = fair_reranking(*self._task(v))
+            return
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+            tasks = [self._task(v) for v in voters]
+            for v, ranking in zip(voters, executor.map(_fair_reranking_task, tasks)):
+                self.fair_rankings[v] = ranking
+
+    def consensus(self, seed, k_cnt):
+        """
+        RAPF consensus for one seed, same as RAPF(profile_df, profile_item_group_dict, k_cnt, seed)
+        :param seed: seed for reproducability
+        :param k_cnt: length of consensus
+        :return: consensus ranking
+        """
+        voter = self.voter(seed)
+        self.precompute([voter])
+        ranking = [self.int_to_string_cand[r] for r in self.fair_rankings[voter]]
+        return pd.DataFrame(ranking[0:k_cnt])
+
+    def sweep(self, seeds, k_cnt, processes=None):
+        """
+        RAPF consensus for every seed, at most one fair re-ranking per distinct voter
+        :param seeds: Iterable of seeds
+        :param k_cnt: length of consensus
+        :param processes: Number of worker processes for the distinct voters (see precompute)
+        :return: list of consensus rankings
+        """
+        seeds = list(seeds)
+        self.precompute([self.voter(seed) for seed in seeds], processes)
+        return [self.consensus(seed, k_cnt) for seed in seeds]
+
+
 def RAPF(profile_df, profile_item_group_dict, k_cnt, seed):
     """
     RAPF from SIGMOD'22
@@ -17,79 +139,4 @@ def RAPF(profile_df, profile_item_group_dict, k_cnt, seed):
     :param seed: seed for reproducability
     :return: consensus ranking
     """
-    #Their code wants candidates to be represented by ints
-    int_candidates = list(range(len(profile_item_group_dict.keys())))
-    int_to_string_cand = dict(zip(int_candidates, list(profile_item_group_dict.keys())))
-    string_to_int_cand = dict(zip( list(profile_item_group_dict.keys()), int_candidates))
-    np.random.seed(seed)  # for reproducibility
-    random.seed(seed) # for reproducibility
-    num_rankings = len(profile_df.columns)
-    #pick random
-    rand = random.randint(0,num_rankings-1)
-    single_ranking = profile_df[profile_df.columns[rand]]  # isolate ranking
-    single_ranking = np.array(
-        single_ranking[~pd.isnull(single_ranking)]
-    )
-
-    group = [profile_item_group_dict[i] for i in single_ranking]
-    single_ranking = np.asarray([string_to_int_cand[c] for c in single_ranking])
-
-    numberOfItem = len(single_ranking)
-
-    rankGrp = {}
-    for i in range(0, len(single_ranking)):
-        rankGrp[single_ranking[i]] = group[i]
-
-    grpCount = {}
-    for i in group:
-        grpCount[i] = 0
-
-    rankGrpPos = {}
-    for i in single_ranking:
-        grpCount[rankGrp[i]] = grpCount[rankGrp[i]] + 1
-        rankGrpPos[i] = grpCount[rankGrp[i]]
-
-    rankRange = {}
-    for item in single_ranking:
-        i = rankGrpPos[item]
-        n = numberOfItem
-        fp = grpCount[rankGrp[item]]
-        r1 = math.floor((i - 1) * n / fp) + 1
-        r2 = math.ceil(i * n / fp)
-        if r2 > numberOfItem:
-            r2 = numberOfItem
-        rankRange[item] = (r1, r2)
-
-    B = nx.Graph(seed = seed)
-    top_nodes = []
-    bottom_nodes = []
-
-    for i in single_ranking:
-        top_nodes.append(i)
-        bottom_nodes.append(str(i))
-    B.add_nodes_from(top_nodes, bipartite=0)
-    B.add_nodes_from(bottom_nodes, bipartite=1)
-
-    for i in single_ranking:
-        r1, r2 = rankRange[i]
-        # print(r1,r2)
-        for j in range(1, numberOfItem + 1):
-            if j >= r1 and j <= r2:
-                # print(i,j)
-                B.add_edge(i, str(j), weight=abs(i - j))
-            else:
-                B.add_edge(i, str(j), weight=100000000000)
-                # print(i,j)
-
-    my_matching = nx.algorithms.bipartite.minimum_weight_full_matching(B, top_nodes, "weight")
-
-    vy = list(my_matching.keys())  # v @ position y, where y is zero-indexed
-    v = vy[0:numberOfItem]
-    y = vy[numberOfItem:numberOfItem * 2]
-
-    ranking = np.zeros(numberOfItem, dtype=int)
-    for ind_i in range(0, numberOfItem):
-        ranking[int(y[ind_i]) - 1] = v[ind_i]
-
-    ranking = [int_to_string_cand[r] for r in ranking]
-    return pd.DataFrame(ranking[0:k_cnt])
\ No newline at end of file
+    return RAPFBatch(profile_df, profile_item_group_dict).consensus(seed, k_cnt)
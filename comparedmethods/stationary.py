@@ -0,0 +1,113 @@
+import numpy as np
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.linalg
+
+
+def _step(state_matrix, transition_matrix):
+    """
+    One transition pi P (as P^T pi for scipy.sparse matrices)
+    """
+    if scipy.sparse.issparse(transition_matrix):
+        return transition_matrix.T.dot(state_matrix)
+    return state_matrix.dot(transition_matrix)
+
+
+def _residual(state_matrix, transition_matrix):
+    """
+    L1 norm of pi P - pi, nan when the state diverged
+    """
+    return float(np.sum(np.abs(_step(state_matrix, transition_matrix) - state_matrix)))
+
+
+def power_iteration(transition_matrix, precision=1e-7, iterations=500, state_matrix=None):
+    """
+    Stationary distribution by power iteration, stops once no entry of the state moves by precision or more
+    :param transition_matrix: final transition matrix or ergodic transition matrix (numpy or scipy.sparse)
+    :param precision: acceptable error margin for convergence
+    :param iterations: maximum number of iterations
+    :param state_matrix: initial distribution matrix, defaults to the uniform distribution
+    :return: stationary distribution matrix, number of iterations run, residual
+    """
+    if state_matrix is None:
+        state_matrix = np.repeat((1 / transition_matrix.shape[0]), transition_matrix.shape[0])
+    counter = 1
+    while counter <= iterations:
+        new_state_matrix = _step(state_matrix, transition_matrix)
+        if (np.abs(new_state_matrix - state_matrix) < precision).all():
+            break
+        state_matrix = new_state_matrix
+        counter += 1
+    return state_matrix, min(counter, iterations), _residual(state_matrix, transition_matrix)
+
+
+def direct_solve(transition_matrix, precision=1e-7, iterations=500):
+    """
+    Stationary distribution by one dense linear solve of pi (P - I) = 0 with sum(pi) = 1
+    :param transition_matrix: final transition matrix or ergodic transition matrix (numpy or scipy.sparse)
+    :param precision: unused, the solve is exact up to rounding
+    :param iterations: unused
+    :return: stationary distribution matrix, number of iterations run (0), residual
+    """
+    if scipy.sparse.issparse(transition_matrix):
+        transition_matrix = transition_matrix.toarray()
+    items = transition_matrix.shape[0]
+    system = transition_matrix.T - np.eye(items)
+    system[-1] = 1  # one balance equation is redundant, replace it by the normalization
+    rhs = np.zeros(items)
+    rhs[-1] = 1
+    state_matrix = np.linalg.solve(system, rhs)
+    return state_matrix, 0, _residual(state_matrix, transition_matrix)
+
+
+def eigs_solve(transition_matrix, precision=1e-7, iterations=500):
+    """
+    Stationary distribution as the eigenvector of P^T for eigenvalue 1, by ARPACK.
+    A scipy.sparse transition matrix is only used through products P^T x (eigenvalue 1 is its largest for a stochastic
+    matrix), so large sparse chains are never factorized or made dense. A dense matrix is LU factorized once and
+    solved in shift-invert mode around 1, which finds that eigenvector even when other eigenvalues are larger.
+    :param transition_matrix: final transition matrix or ergodic transition matrix (numpy or scipy.sparse)
+    :param precision: ARPACK relative tolerance
+    :param iterations: maximum number of Arnoldi restarts
+    :return: stationary distribution matrix, number of products or shift-invert solves, residual
+    """
+    items = transition_matrix.shape[0]
+    operations = []
+    if scipy.sparse.issparse(transition_matrix):
+        transposed = scipy.sparse.csr_matrix(transition_matrix.T)
+        apply = transposed.dot
+    else:
+        sigma = 1 + 1e-9  # just off the eigenvalue, so the shifted matrix can be factorized
+        factors = scipy.linalg.lu_factor(transition_matrix.T - sigma * np.eye(items))
+        apply = lambda x: scipy.linalg.lu_solve(factors, x)
+
+    def counted(x):
+        operations.append(1)
+        return apply(x)
+
+    operator = scipy.sparse.linalg.LinearOperator((items, items), matvec=counted, dtype=np.float64)
+    if scipy.sparse.issparse(transition_matrix):
+        _, vectors = scipy.sparse.linalg.eigs(operator, k=1, which='LM', tol=precision, maxiter=iterations)
+    else:
+        _, vectors = scipy.sparse.linalg.eigs(transition_matrix.T, k=1, sigma=sigma, OPinv=operator, tol=precision,
+                                              maxiter=iterations)
+    state_matrix = np.real(vectors[:, 0])
+    state_matrix = state_matrix / np.sum(state_matrix)
+    return state_matrix, len(operations), _residual(state_matrix, transition_matrix)
+
+
+STATIONARY_SOLVERS = {'power': power_iteration, 'direct': direct_solve, 'eigs': eigs_solve}
+
+
+def stationary_distribution(transition_matrix, solver='power', precision=1e-7, iterations=500):
+    """
+    Stationary distribution of a Markov chain
+    :param transition_matrix: final transition matrix or ergodic transition matrix (numpy or scipy.sparse)
+    :param solver: power (power iteration), direct (dense linear solve) or eigs (ARPACK, for large sparse chains)
+    :param precision: acceptable error margin for convergence
+    :param iterations: maximum number of iterations
+    :return: stationary distribution matrix, number of iterations run, residual (L1 norm of pi P - pi)
+    """
+    if solver not in STATIONARY_SOLVERS:
+        raise ValueError("Unknown stationary solver " + str(solver) + ", use one of " + str(list(STATIONARY_SOLVERS)))
+    return STATIONARY_SOLVERS[solver](transition_matrix, precision, iterations)
@@ -1,65 +1,35 @@
 import pandas as pd
 import numpy as np
 import src as src
-import random
 
-from itertools import combinations
-def config_study(profile_df, dataset_df, candidates_col, sa_col, full_profile_df):
+def config_study(profile_df, dataset_df, candidates_col, sa_col, full_profile_df, imputation_cache=None,
+                 num_trials=1000, seed=123):
     # Prefair
     features_df = dataset_df.drop(columns=[sa_col])  # Drop sensative attribute
-    completed_profile_df = src.imp._imputate_candidates(profile_df, features_df, candidates_col)
+    completed_profile_df = src.imp._imputate_candidates(profile_df, features_df, candidates_col,
+                                                        imputation_cache=imputation_cache)
     prefair_akt = avg_kt(completed_profile_df, full_profile_df)
 
     # Random
-    # For every ranking:
-    profile_dict = {}  # init empty dict
-    num_unique_rankings = len(profile_df.columns)
-    totals_random_akt = []
-    for trail in range(0,10):
-        for r in range(0, num_unique_rankings):
-            single_ranking = pd.DataFrame(profile_df.iloc[:, r])  # isolate ranking
-            candidates_ranked = list(single_ranking.to_numpy().flatten())
-            unranked_set_df = dataset_df[~dataset_df[candidates_col].isin(candidates_ranked)]
-            unranked_data = unranked_set_df.drop(columns=[candidates_col])
-            candidates_unranked = list(unranked_set_df[candidates_col].to_numpy())
-            #random shuffle
-            #then append
-            random.seed(123+trail)
-            random.shuffle(candidates_unranked)
-            completed_ranking = candidates_ranked + candidates_unranked
-            profile_dict[list(profile_df.columns)[r]] = completed_ranking
-        # Update profile
-        random_profile_df = pd.DataFrame(profile_dict)
-        random_akt = avg_kt(random_profile_df, full_profile_df)
-        totals_random_akt.append(random_akt)
-    print(totals_random_akt)
+    # every trial completes each ranking with its unranked candidates in a random order
+    totals_random_akt = src.random_completion_distances(profile_df, dataset_df[candidates_col].values,
+                                                        full_profile_df, num_trials, seed)
+    print("random average KT over", num_trials, "trials, 95% interval:", np.percentile(totals_random_akt, [2.5, 97.5]))
     return prefair_akt, np.mean(totals_random_akt)
 
 def avg_kt(i_profile, known_profile):
-    # For every ranking:
-    num_unique_rankings = len(i_profile.columns)
-    avg = []
-    for r in range(0, num_unique_rankings):
-        single_ranking = pd.DataFrame(i_profile.iloc[:, r])  # isolate ranking
-        candidates_ranked = list(single_ranking.to_numpy().flatten())
-        single_known_ranking = pd.DataFrame(known_profile.iloc[:, r])  # isolate ranking
-        candidates_ranked_known = list(single_known_ranking.to_numpy().flatten())
-
-        #drop candidates that are not known
-        candidates_ranked = sorted(set(candidates_ranked) & set(candidates_ranked_known), key = candidates_ranked.index)
-        candidates_ranked_known = [x for x in candidates_ranked_known if str(x) != 'nan']
-        kt = ktd(candidates_ranked, candidates_ranked_known)
-        avg.append(kt)
-    return np.mean(avg)
+    """
+    Average Kendall tau distance between the imputed and the known ranking of every voter, only the known candidates
+    of each ranking are compared (see src.kendall_tau_distances).
+    :param i_profile: Dataframe of imputed preference profile
+    :param known_profile: Dataframe of known preference profile, same columns as i_profile
+    :return: average distance
+    """
+    return np.mean(src.kendall_tau_distances(i_profile, known_profile))
 
 
 def ktd(rank_a, rank_b):
-
-    tau = 0
-    n_candidates = len(rank_a)
-    a = list(range(0, len(rank_a))) #make ints
-    b = [rank_a.index(cand) for cand in rank_b]
-    for i, j in combinations(range(n_candidates), 2):
-        tau += (np.sign(a[i] - a[j]) ==
-                -np.sign(b[i] - b[j]))
-    return tau
\ No newline at end of file
+    """
+    Kendall tau distance between two rankings, see src.kendall_tau_distance.
+    """
+    return src.kendall_tau_distance(rank_a, rank_b)
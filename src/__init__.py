@@ -1,6 +1,14 @@
+from src.encoded_profile import *
+from src.transfer_engine import *
+from src.vote_tally import *
+from src.borda import *
+from src.candidate_pool import *
+from src.feature_store import *
 from src.groupaware_stv import *
 from src.metrics import *
 from src.imputation import *
+from src.imputation_cache import *
 from src.prefair import *
 from src.getset_representation import *
-from src.metric_helpers import *
\ No newline at end of file
+from src.metric_helpers import *
+from src.kendall_tau import *
\ No newline at end of file
@@ -0,0 +1,66 @@
+import numpy as np
+from src.encoded_profile import encode_profile, LazyCompletedProfile
+
+
+def borda_scores(profile, num_items):
+    """
+    Borda score of every candidate code, a ranking gives num_items - 1 points to its first candidate, num_items - 2 to
+    its second and so on (partial rankings stop scoring where they end). Scores are cached on the profile so methods
+    run on the same EncodedProfile only count once.
+    :param profile: EncodedProfile of preference profile
+    :param num_items: Number of candidates the points are based on
+    :return: Numpy int64 array of scores indexed by candidate code
+    """
+    num_items = int(num_items)
+    if num_items not in profile.borda_cache:
+        points_at_pos = num_items - 1 - np.arange(profile.ballots.shape[1], dtype=np.int64)
+        ranked = profile.ballots >= 0
+        points = points_at_pos * profile.weights[:, None]  # a compressed ballot scores once per voter
+        scores = np.bincount(profile.ballots[ranked], weights=points[ranked], minlength=profile.num_candidates)
+        if isinstance(profile, LazyCompletedProfile):
+            scores[profile.tail] += _tail_borda_scores(profile, num_items)
+        profile.borda_cache[num_items] = scores.astype(np.int64)
+    return profile.borda_cache[num_items]
+
+
+def _tail_borda_scores(profile, num_items):
+    """
+    Borda points the tail of a LazyCompletedProfile gives, without writing the tails out.
+    An unranked candidate at tail position t sits at depth + t - (ranked candidates before t in the tail) on a ballot.
+    :param profile: LazyCompletedProfile of preference profile
+    :param num_items: Number of candidates the points are based on
+    :return: Numpy float64 array of points indexed by tail position
+    """
+    depth = profile.ballots.shape[1]
+    num_tail = len(profile.tail)
+    weights = np.broadcast_to(profile.weights[:, None], profile.ballots.shape)
+    prefix_positions = profile.tail_position[profile.ballots]  # -1 when the ranked candidate is not in the tail
+    in_tail = prefix_positions >= 0
+    # how many candidates of the same prefix come earlier in the tail
+    rank_in_ballot = np.argsort(np.argsort(prefix_positions, axis=1, kind='stable'), axis=1, kind='stable')
+    earlier = rank_in_ballot - np.count_nonzero(~in_tail, axis=1)[:, None]
+
+    ranked_weight = np.bincount(prefix_positions[in_tail], weights=weights[in_tail], minlength=num_tail)
+    earlier_weight = np.cumsum(ranked_weight) - ranked_weight  # voters ranking a candidate before t in the tail
+    earlier_ranked = np.bincount(prefix_positions[in_tail], weights=(weights * earlier)[in_tail], minlength=num_tail)
+    unranked_weight = np.sum(profile.weights) - ranked_weight
+    points_at_pos = num_items - 1 - depth - np.arange(num_tail)
+    return unranked_weight * points_at_pos + earlier_weight - earlier_ranked
+
+
+def borda_ranking(profile_df, candidate_ids, num_items=None):
+    """
+    Rank candidates by Borda score, ties go to the larger candidate id.
+    :param profile_df: Dataframe of preference profile or EncodedProfile
+    :param candidate_ids: List of candidate ids to rank
+    :param num_items: Number of candidates the points are based on, defaults to len(candidate_ids)
+    :return: list of candidate ids (best first), list of their scores
+    """
+    candidate_ids = list(candidate_ids)
+    profile = encode_profile(profile_df, candidate_ids)
+    if num_items is None:
+        num_items = len(candidate_ids)
+    codes = profile.encode(candidate_ids)
+    scores = borda_scores(profile, num_items)[codes]
+    order = np.lexsort((codes, scores))[::-1]  # codes follow the id order
+    return [candidate_ids[i] for i in order], scores[order].tolist()
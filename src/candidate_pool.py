@@ -0,0 +1,85 @@
+import numpy as np
+
+
+class CandidatePool:
+    """
+    Candidate dataset indexed once by candidate id.
+    Codes follow the sorted order of the candidate ids (like EncodedProfile) and every code keeps its group code, so
+    group lookups are array indexing instead of a dataframe scan per candidate.
+    """
+
+    def __init__(self, dataset_df, candidates_col, sa_col):
+        """
+        :param dataset_df: Dataframe of candidate dataset
+        :param candidates_col: Column in dataset_df with candidate ids/names
+        :param sa_col: Column in dataset_df with group information
+        """
+        self.dataset_df = dataset_df
+        self.candidates_col = candidates_col
+        self.sa_col = sa_col
+        self.candidate_ids, self.rows, self.row_counts = np.unique(dataset_df[candidates_col].values,
+                                                                   return_index=True, return_counts=True)
+        self.id_to_code = dict(zip(self.candidate_ids.tolist(), range(len(self.candidate_ids))))
+        sa = dataset_df[sa_col].to_numpy()[self.rows]
+        self.group_ids = sa.tolist()  # plain python values, same as Series.item()
+        self.groups, self.group_codes, self.group_counts = np.unique(sa, return_inverse=True, return_counts=True)
+
+    @property
+    def num_candidates(self):
+        return len(self.candidate_ids)
+
+    def encode(self, ids):
+        """
+        Map candidate ids to codes.
+        :param ids: Iterable of candidate ids
+        :return: Numpy int64 array of codes
+        """
+        ids = list(ids)
+        codes = np.asarray([self.id_to_code.get(c, -1) for c in ids], dtype=np.int64)
+        bad = (codes < 0) | (self.row_counts[codes] != 1)
+        if np.any(bad):
+            # same failure as dataset_df.loc[dataset_df[candidates_col] == c][sa_col].item()
+            raise ValueError("Candidate " + str(ids[int(np.argmax(bad))]) +
+                             " must appear exactly once in the candidate dataset")
+        return codes
+
+    def groups_of(self, ids):
+        """
+        Group of every candidate in ids.
+        :param ids: Iterable of candidate ids
+        :return: list of groups
+        """
+        return [self.group_ids[code] for code in self.encode(ids)]
+
+    def item_group_dict(self, ids=None):
+        """
+        Create item group dict.
+        :param ids: Iterable of candidate ids, defaults to the whole pool
+        :return: Dictionary where candidates are keys and values are their groups
+        """
+        ids = list(self.candidate_ids) if ids is None else list(ids)
+        return dict(zip(ids, self.groups_of(ids)))
+
+    def group_cnt_dict(self, ids=None):
+        """
+        Count candidates per group.
+        :param ids: Iterable of candidate ids, defaults to the whole pool
+        :return: Dictionary of every pool group (keys) and counts (values)
+        """
+        if ids is None:
+            return dict(zip(self.groups, self.group_counts))
+        counts = np.bincount(self.group_codes[self.encode(ids)], minlength=len(self.groups))
+        return dict(zip(self.groups, counts))
+
+
+def candidate_pool(dataset_df, candidates_col, sa_col):
+    """
+    Index a candidate dataset.
+    :param dataset_df: Dataframe of candidate dataset or CandidatePool
+    :param candidates_col: Column in dataset_df with candidate ids/names
+    :param sa_col: Column in dataset_df with group information
+    :return: CandidatePool
+    """
+    if isinstance(dataset_df, CandidatePool):
+        return dataset_df
+    return CandidatePool(dataset_df, candidates_col, sa_col)
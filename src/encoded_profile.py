@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+
+
+class EncodedProfile:
+    """
+    Preference profile stored as a dense matrix of integer candidate codes.
+    Row r of ballots is the r-th ranking (column r of the profile dataframe) and partial rankings are padded with -1.
+    Codes follow the sorted order of the candidate ids, so comparing codes is the same as comparing ids.
+    Each row carries a weight, the number of voters who submitted that ballot (see compress_profile).
+    """
+
+    def __init__(self, ballots, candidate_ids, voters, weights=None):
+        """
+        :param ballots: Numpy int32 array (rankings x depth) of candidate codes, -1 after a ranking ends
+        :param candidate_ids: Numpy array of candidate ids where the index is the code
+        :param voters: List of ranking names (the profile dataframe columns)
+        :param weights: Numpy int64 array of ballot multiplicities, defaults to one voter per ballot
+        """
+        self.ballots = ballots
+        self.candidate_ids = candidate_ids
+        self.id_to_code = dict(zip(candidate_ids.tolist(), range(len(candidate_ids))))
+        self.voters = voters
+        self.weights = np.ones(ballots.shape[0], dtype=np.int64) if weights is None else weights
+        self.lengths = np.count_nonzero(ballots >= 0, axis=1)
+        self.borda_cache = {}  # Borda scores per number of items, see src.borda
+
+    @property
+    def num_rankings(self):
+        """
+        Number of voters, counting every copy of a compressed ballot.
+        """
+        return int(np.sum(self.weights))
+
+    @property
+    def num_ballots(self):
+        """
+        Number of stored (possibly distinct) ballots.
+        """
+        return self.ballots.shape[0]
+
+    @property
+    def num_candidates(self):
+        return len(self.candidate_ids)
+
+    def encode(self, ids):
+        """
+        Map candidate ids to codes.
+        :param ids: Iterable of candidate ids
+        :return: Numpy int32 array of codes
+        """
+        return np.asarray([self.id_to_code[c] for c in ids], dtype=np.int32)
+
+    def decode(self, codes):
+        """
+        Map codes to candidate ids.
+        :param codes: Iterable of codes
+        :return: list of candidate ids
+        """
+        return self.candidate_ids[np.asarray(codes, dtype=np.int64)].tolist()
+
+    def first_preferences(self):
+        """
+        :return: Numpy int32 array of the first candidate of every ballot
+        """
+        return self.ballots[:, 0]
+
+    def common_prefix(self):
+        """
+        Positions every ranking fills, matches profile_df.dropna() on the dataframe.
+        :return: Numpy array (rankings x depth) of codes
+        """
+        return self.ballots[:, :int(np.min(self.lengths, initial=self.ballots.shape[1]))]
+
+    def to_dataframe(self):
+        """
+        Decode back to the dataframe layout used across the repo (one column per stored ballot, weights are dropped).
+        :return: Dataframe of preference profile
+        """
+        ids = np.append(self.candidate_ids, np.nan).astype(object)
+        return pd.DataFrame(ids[self.ballots].T, columns=self.voters)
+
+
+def encode_profile(profile_df, candidate_ids=None, weights=None):
+    """
+    Encode a preference profile into integer candidate codes.
+    :param profile_df: Dataframe of preference profile or an EncodedProfile
+    :param candidate_ids: Optional candidate ids that must receive a code even if nobody ranks them (e.g. the pool)
+    :param weights: Optional multiplicity of each profile column, defaults to one voter per column
+    :return: EncodedProfile
+    """
+    if isinstance(profile_df, EncodedProfile):
+        if candidate_ids is None or all(c in profile_df.id_to_code for c in candidate_ids):
+            return profile_df
+        weights = profile_df.weights
+        profile_df = profile_df.to_dataframe()
+
+    values = profile_df.to_numpy().T  # rankings x depth
+    # drop any NaNs by moving ranked candidates to the front of each ballot
+    ranked = ~pd.isnull(values)
+    order = np.argsort(~ranked, axis=1, kind='stable')
+    values = np.take_along_axis(values, order, axis=1)
+    ranked = np.take_along_axis(ranked, order, axis=1)
+
+    # the given candidate ids come first so their objects are the ones kept (101 == 101.0, factorize gives both one
+    # code), ids only the profile holds come back as int when NaN padding turned whole number ids into floats
+    given = [] if candidate_ids is None else list(candidate_ids)
+    ids = np.concatenate([np.asarray(given, dtype=object), np.asarray(values[ranked], dtype=object)])
+    first_codes, first_ids = pd.factorize(ids)
+    first_ids = np.asarray(first_ids, dtype=object)
+    num_given = int(np.max(first_codes[:len(given)], initial=-1)) + 1
+    profile_only = first_ids[num_given:]
+    is_float = np.asarray([isinstance(c, (float, np.floating)) for c in profile_only], dtype=bool)
+    if np.any(is_float) and all(float(c).is_integer() for c in profile_only[is_float]):
+        profile_only[is_float] = [int(c) for c in profile_only[is_float]]
+    sorted_order = np.argsort(first_ids, kind='stable')
+    unique_ids = first_ids[sorted_order]
+    to_sorted_code = np.empty(len(sorted_order), dtype=np.int64)
+    to_sorted_code[sorted_order] = np.arange(len(sorted_order))
+
+    ballots = np.full(values.shape, -1, dtype=np.int32)
+    ballots[ranked] = to_sorted_code[first_codes[len(given):]]
+    return EncodedProfile(ballots, unique_ids, list(profile_df.columns), weights)
+
+
+def compress_profile(profile):
+    """
+    Collapse identical ballots into one weighted ballot.
+    :param profile: Dataframe of preference profile or EncodedProfile
+    :return: EncodedProfile with distinct ballots and their multiplicities as weights
+    """
+    profile = encode_profile(profile)
+    ballots, first_indx, inverse = np.unique(profile.ballots, axis=0, return_index=True, return_inverse=True)
+    weights = np.bincount(inverse.ravel(), weights=profile.weights, minlength=len(ballots)).astype(np.int64)
+    voters = [profile.voters[i] for i in first_indx]
+    return EncodedProfile(ballots, profile.candidate_ids, voters, weights)
+
+
+class LazyCompletedProfile(EncodedProfile):
+    """
+    Completed preference profile that never stores the imputed part of its ballots.
+    Every ballot is its ranked prefix (ballots) followed by the shared tail order without the candidates the prefix
+    already ranks, tail positions are resolved on demand (see CompletedTransferEngine and src.borda).
+    """
+
+    def __init__(self, ballots, tail, candidate_ids, voters, weights=None):
+        """
+        :param ballots: Numpy int32 array (rankings x depth) of the ranked prefixes, no padding
+        :param tail: Numpy int32 array of candidate codes in imputation order, each code at most once
+        :param candidate_ids: Numpy array of candidate ids where the index is the code
+        :param voters: List of ranking names (the profile dataframe columns)
+        :param weights: Numpy int64 array of ballot multiplicities, defaults to one voter per ballot
+        """
+        super().__init__(ballots, candidate_ids, voters, weights)
+        self.tail = tail
+        self.tail_position = np.full(len(candidate_ids), -1, dtype=np.int64)
+        self.tail_position[tail] = np.arange(len(tail))
+        self.lengths = self.lengths + len(tail) - np.count_nonzero(self.tail_position[ballots] >= 0, axis=1)
+
+    def first_preferences(self):
+        if self.ballots.shape[1] > 0:
+            return super().first_preferences()
+        return np.full(self.num_ballots, self.tail[0], dtype=np.int32)
+
+    def materialize(self):
+        """
+        Write out the full ballots.
+        :return: EncodedProfile of the completed profile
+        """
+        num_ballots = self.num_ballots
+        ranked = np.zeros((num_ballots, self.num_candidates), dtype=bool)
+        ranked[np.arange(num_ballots)[:, None], self.ballots] = True
+        unranked = ~ranked[:, self.tail]
+        # boolean indexing walks each row left to right, so every ranking keeps the tail order
+        width = int(self.lengths[0]) - self.ballots.shape[1] if num_ballots > 0 else 0
+        fill = np.broadcast_to(self.tail, unranked.shape)[unranked].reshape(num_ballots, width)
+        return EncodedProfile(np.hstack([self.ballots, fill.astype(np.int32)]), self.candidate_ids, self.voters,
+                              self.weights)
+
+    def common_prefix(self):
+        return self.materialize().common_prefix()
+
+    def to_dataframe(self):
+        return self.materialize().to_dataframe()
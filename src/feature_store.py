@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import sklearn.preprocessing
+
+
+class FeatureStore:
+    """
+    Candidate features prepared once for cosine similarity.
+    Every row is L2-normalized into one contiguous matrix (float32 by default) and the row norms are kept, so the
+    similarity of a query to the whole pool is a matrix-vector product and feature sums need no second copy.
+    Rows follow the rows of the candidate dataset.
+    """
+
+    def __init__(self, features, candidate_ids, dtype=np.float32):
+        """
+        :param features: Numpy float64 array (candidates x features), see feature_matrix
+        :param candidate_ids: Numpy array of the candidate id of every row
+        :param dtype: Numpy dtype of the normalized matrix
+        """
+        self.candidate_ids = candidate_ids
+        self.dtype = np.dtype(dtype)
+        self.norms = np.linalg.norm(features, axis=1)
+        self.unit_features = np.ascontiguousarray(sklearn.preprocessing.normalize(features), dtype=self.dtype)
+
+    @property
+    def num_candidates(self):
+        return self.unit_features.shape[0]
+
+    def feature_sums(self, rows):
+        """
+        Sum of the features of the selected candidates, rebuilt from the normalized rows and their norms.
+        :param rows: Numpy bool array (queries x candidates) of the rows each query selects
+        :return: Numpy array (queries x features) of feature sums
+        """
+        weights = np.where(rows, self.norms, 0).astype(self.dtype)
+        return weights @ self.unit_features
+
+    def similarity(self, vectors):
+        """
+        Cosine similarity of every vector to every candidate.
+        :param vectors: Numpy array (queries x features)
+        :return: Numpy array (queries x candidates) of similarities
+        """
+        unit_vectors = sklearn.preprocessing.normalize(np.atleast_2d(vectors)).astype(self.dtype, copy=False)
+        return unit_vectors @ self.unit_features.T
+
+
+def feature_matrix(dataset_df, candidates_col):
+    """
+    Validate and encode the candidate features, every column but the candidate ids must be numeric.
+    :param dataset_df: Dataframe of candidate dataset
+    :param candidates_col: Column in dataset_df with candidate ids/names
+    :return: Numpy float64 array (candidates x features)
+    """
+    feature_df = dataset_df.drop(columns=[candidates_col])
+    non_numeric = [col for col in feature_df.columns if not pd.api.types.is_numeric_dtype(feature_df[col])]
+    if non_numeric:
+        raise ValueError("Candidate features must be numeric, encode or drop the columns " + str(non_numeric))
+    features = feature_df.to_numpy(dtype=np.float64)
+    if not np.all(np.isfinite(features)):
+        raise ValueError("Candidate features contain NaN or infinite values")
+    return features
+
+
+def feature_store(dataset_df, candidates_col, dtype=np.float32):
+    """
+    Build the feature store of a candidate dataset.
+    :param dataset_df: Dataframe of candidate dataset or FeatureStore
+    :param candidates_col: Column in dataset_df with candidate ids/names
+    :param dtype: Numpy dtype of the normalized matrix
+    :return: FeatureStore
+    """
+    if isinstance(dataset_df, FeatureStore):
+        return dataset_df
+    return FeatureStore(feature_matrix(dataset_df, candidates_col), dataset_df[candidates_col].values, dtype)
@@ -1,34 +1,30 @@
 import iteround
 import numpy as np
+from src.encoded_profile import EncodedProfile
+from src.candidate_pool import candidate_pool
 
 def get_representation(profile_df, dataset_df, candidates_col, sa_col):
     """
     Return data structures capturing the representation of groups in a preference profile.
-    :param profile_df: Dataframe of preference profile
-    :param dataset_df: Dataframe of candidate dataset
+    :param profile_df: Dataframe of preference profile or EncodedProfile
+    :param dataset_df: Dataframe of candidate dataset or CandidatePool
     :param candidates_col: Column in dataset_df with candidate ids/names
     :param sa_col: Column in dataset_df with group information
     :return: item_group_dict, pool_group_cnt_dict, ranked_item_group_dict, profile_group_cnt_dict
     """
     # SA data for all candidates (i.e., whole pool)
-    unique_candidates = list(np.unique(dataset_df[candidates_col].values))
-    sa = [dataset_df.loc[dataset_df[candidates_col] == c][sa_col].item() for c in unique_candidates]
-    item_group_dict = dict(zip(unique_candidates, sa))
-    groups, count_per_group, = np.unique(sa, return_counts=True)
+    pool = candidate_pool(dataset_df, candidates_col, sa_col)
+    item_group_dict = pool.item_group_dict()
     # Dictionary of groups and their counts
-    pool_group_cnt_dict = dict(map(lambda i, j: (i, j), groups, count_per_group))
+    pool_group_cnt_dict = pool.group_cnt_dict()
 
     # SA data for candidates in the profile
-    unique_ranked_candidates = list(np.unique(profile_df.dropna()))
-    sa_ranked = [dataset_df.loc[dataset_df[candidates_col] == c][sa_col].item() for c in unique_ranked_candidates]
-    groups_ranked, count_per_ranked_group = np.unique(sa_ranked, return_counts=True)
-    ranked_item_group_dict = dict(zip(unique_ranked_candidates, sa_ranked))
-    profile_group_cnt_dict = {}
-    for group in list(pool_group_cnt_dict.keys()):
-        if group in groups_ranked:  # group is in the profile
-            profile_group_cnt_dict[group] = count_per_ranked_group[np.where(groups_ranked == group)[0][0]]
-        else:  # group is not in the profile
-            profile_group_cnt_dict[group] = 0
+    if isinstance(profile_df, EncodedProfile):
+        unique_ranked_candidates = profile_df.decode(np.unique(profile_df.common_prefix()))
+    else:
+        unique_ranked_candidates = list(np.unique(profile_df.dropna()))
+    ranked_item_group_dict = pool.item_group_dict(unique_ranked_candidates)
+    profile_group_cnt_dict = pool.group_cnt_dict(unique_ranked_candidates)  # groups not in the profile count 0
 
     return item_group_dict, pool_group_cnt_dict, ranked_item_group_dict, profile_group_cnt_dict
 
@@ -1,45 +1,211 @@
 import os
 os.environ["OMP_NUM_THREADS"] = '1' #For Kmeans on windows comment if not applicable
+import numpy as np
 import pandas as pd
 import sklearn.cluster
+from src.encoded_profile import EncodedProfile, LazyCompletedProfile, encode_profile
+from src.feature_store import FeatureStore, feature_matrix, feature_store
+
+
 #To use a different distance function change the below
-def _imputate_candidates(profile_df, dataset_df, candidates_col):
+class SimilarityImputer:
+    """
+    Completes rankings with the unranked candidates ordered by cosine similarity to the centroid of the pool.
+    The centroid and the similarity order of the whole pool are computed once, each ranking only filters that order.
+    """
+
+    def __init__(self, dataset_df, candidates_col):
+        """
+        :param dataset_df: Dataframe of candidate dataset
+        :param candidates_col: Column in dataset_df with candidate ids/names
+        """
+        self.candidates = dataset_df[candidates_col]
+        self.candidate_ids = self.candidates.values
+        # Determine the centroid
+        features = feature_matrix(dataset_df, candidates_col)
+        kmeans = sklearn.cluster.KMeans(n_clusters=1, init='k-means++', random_state=0).fit(features)
+        self.centroid = kmeans.cluster_centers_
+        # Determine similarity between centroid and other candidates
+        # float64 keeps the exact similarities, tied ones go through the unstable sort below
+        self.store = FeatureStore(features, self.candidate_ids, dtype=np.float64)
+        self.sim = self.store.similarity(self.centroid).flatten()
+        self.order = _order_by_similarity(self.sim)
+        # the sort is not stable, with tied similarities the order of an unranked subset can differ from the pool's
+        self.ties = len(np.unique(self.sim)) < len(self.sim)
+
+    def complete(self, candidates_ranked):
+        """
+        Append the unranked candidates to a ranking.
+        :param candidates_ranked: List of ranked candidates
+        :return: list of candidates, the ranking followed by every unranked candidate
+        """
+        unranked = ~self.candidates.isin(candidates_ranked).to_numpy()
+        if self.ties:
+            unranked_rows = np.flatnonzero(unranked)
+            order = unranked_rows[_order_by_similarity(self.sim[unranked_rows])]
+        else:
+            order = self.order[unranked[self.order]]
+        return candidates_ranked + self.candidate_ids[order].tolist()
+
+    def complete_profile(self, profile):
+        """
+        Batch mode of complete, every ranking of an encoded profile is completed in one pass over a ranked mask.
+        Like _imputate_candidates only the positions every ranking fills are kept (profile_df.dropna()).
+        :param profile: EncodedProfile of preference profile
+        :return: EncodedProfile of the completed profile, with the same weights
+        """
+        completed = self.complete_lazily(profile)
+        if isinstance(completed, LazyCompletedProfile):
+            return completed.materialize()
+        return completed
+
+    def complete_lazily(self, profile):
+        """
+        Complete an encoded profile without writing out the imputed tails, every ranking shares the similarity order.
+        Tied similarities can order the tail differently per ranking, then the completed profile is written out.
+        :param profile: EncodedProfile of preference profile
+        :return: LazyCompletedProfile (EncodedProfile when there are ties), with the same weights
+        """
+        profile = encode_profile(profile, self.candidate_ids)
+        ballots = profile.common_prefix()
+        num_ballots = ballots.shape[0]
+        pool_codes = profile.encode(self.candidate_ids)
+        ranked = np.zeros((num_ballots, profile.num_candidates), dtype=bool)
+        ranked[np.arange(num_ballots)[:, None], ballots] = True
+        num_unranked = np.count_nonzero(~ranked[:, pool_codes], axis=1)
+        if np.any(num_unranked != num_unranked[:1]):
+            raise ValueError("All arrays must be of the same length")
+        if not self.ties and len(np.unique(pool_codes)) == len(pool_codes):
+            return LazyCompletedProfile(ballots, pool_codes[self.order], profile.candidate_ids, profile.voters,
+                                        profile.weights)
+
+        unranked = ~ranked[:, pool_codes]
+        fill = [pool_codes[np.flatnonzero(row)[_order_by_similarity(self.sim[row])]] for row in unranked]
+        width = int(num_unranked[0]) if num_ballots > 0 else 0
+        fill = np.asarray(fill, dtype=np.int32).reshape(num_ballots, width)
+        return EncodedProfile(np.hstack([ballots, fill]), profile.candidate_ids, profile.voters, profile.weights)
+
+
+class PersonalizedImputer:
+    """
+    Completes every ranking with its unranked candidates ordered by cosine similarity to the centroid of the candidates
+    that ranking ranks (the mean of their features, which is what KMeans(n_clusters=1) converges to).
+    The index is the float32 FeatureStore of the pool, so the similarities of a batch of rankings are one matrix
+    product instead of a cosine pass over the pool per ranking.
+    """
+
+    def __init__(self, dataset_df, candidates_col, batch_size=2048):
+        """
+        :param dataset_df: Dataframe of candidate dataset
+        :param candidates_col: Column in dataset_df with candidate ids/names
+        :param batch_size: Number of rankings queried together
+        """
+        self.candidates = dataset_df[candidates_col]
+        self.candidate_ids = self.candidates.values
+        self.store = feature_store(dataset_df, candidates_col)
+        # for rankings without any pool candidate
+        self.pool_sum = self.store.feature_sums(np.ones((1, self.store.num_candidates), dtype=bool))[0]
+        self.batch_size = batch_size
+
+    def _fill(self, ranked):
+        """
+        Unranked pool rows of every ranking, most similar to the ranking's centroid first (ties keep the pool order).
+        :param ranked: Numpy bool array (rankings x pool) of the pool rows each ranking ranks
+        :return: Numpy int64 array (rankings x unranked count) of pool rows
+        """
+        num_unranked = np.count_nonzero(~ranked, axis=1)
+        if np.any(num_unranked != num_unranked[:1]):
+            raise ValueError("All arrays must be of the same length")
+        width = int(num_unranked[0]) if len(ranked) > 0 else 0
+        fill = np.empty((len(ranked), width), dtype=np.int64)
+        for start in range(0, len(ranked), self.batch_size):
+            batch = ranked[start:start + self.batch_size]
+            # cosine similarity ignores scale, so the feature sum stands in for the centroid
+            sums = self.store.feature_sums(batch)
+            sums[~np.any(batch, axis=1)] = self.pool_sum
+            sim = self.store.similarity(sums)
+            sim[batch] = -np.inf
+            fill[start:start + self.batch_size] = np.argsort(-sim, axis=1, kind='stable')[:, :width]
+        return fill
+
+    def complete(self, candidates_ranked):
+        """
+        Append the unranked candidates to a ranking.
+        :param candidates_ranked: List of ranked candidates
+        :return: list of candidates, the ranking followed by every unranked candidate
+        """
+        ranked = self.candidates.isin(candidates_ranked).to_numpy()[None, :]
+        return candidates_ranked + self.candidate_ids[self._fill(ranked)[0]].tolist()
+
+    def complete_profile(self, profile):
+        """
+        Batch mode of complete for an encoded profile, only the positions every ranking fills are kept.
+        :param profile: EncodedProfile of preference profile
+        :return: EncodedProfile of the completed profile, with the same weights
+        """
+        profile = encode_profile(profile, self.candidate_ids)
+        ballots = profile.common_prefix()
+        num_ballots = ballots.shape[0]
+        pool_codes = profile.encode(self.candidate_ids)
+        ranked_codes = np.zeros((num_ballots, profile.num_candidates), dtype=bool)
+        ranked_codes[np.arange(num_ballots)[:, None], ballots] = True
+        fill = pool_codes[self._fill(ranked_codes[:, pool_codes])]
+        return EncodedProfile(np.hstack([ballots, fill.astype(np.int32)]), profile.candidate_ids, profile.voters,
+                              profile.weights)
+
+    def complete_lazily(self, profile):
+        """
+        Every ranking has its own tail order, so the completed profile is written out (see complete_profile).
+        """
+        return self.complete_profile(profile)
+
+
+def imputer_for(imputation, dataset_df, candidates_col):
+    """
+    Build the imputer for an imputation mode.
+    :param imputation: POOL (similarity to the pool centroid) or PERSONALIZED (similarity to each voter's centroid)
+    :param dataset_df: Dataframe of candidate dataset
+    :param candidates_col: Column in dataset_df with candidate ids/names
+    :return: SimilarityImputer or PersonalizedImputer
+    """
+    if imputation == "PERSONALIZED":
+        return PersonalizedImputer(dataset_df, candidates_col)
+    return SimilarityImputer(dataset_df, candidates_col)
+
+
+def _order_by_similarity(sim):
+    """
+    Order candidates by similarity to the centroid, same sort as DataFrame.sort_values(by=['Sim'], ascending=False).
+    :param sim: Numpy array of similarities
+    :return: Numpy array of indices into sim
+    """
+    return pd.Series(sim).sort_values(ascending=False).index.to_numpy()
+
+
+def _imputate_candidates(profile_df, dataset_df, candidates_col, imputation="POOL", imputation_cache=None):
     """
     Impute candidates in a partial preference profile
     :param profile_df: Dataframe of preference profile
     :param dataset_df: Dataframe of candidate dataset
     :param candidates_col: Column in dataset_df with candidate ids/names
+    :param imputation: POOL or PERSONALIZED (see imputer_for)
+    :param imputation_cache: Optional ImputationCache, the completed profile is read from it when already imputed
     :return: profile_df
     """
+    if imputation_cache is not None:
+        return imputation_cache.complete_profile(profile_df, dataset_df, candidates_col, imputation).to_dataframe()
+
     profile_dict = {} #init empty dict
+    imputer = imputer_for(imputation, dataset_df, candidates_col)
     #For every ranking:
     num_unique_rankings = len(profile_df.columns)
 
     profile_df = profile_df.dropna() #handle top-k where voters have different k
     for r in range(0, num_unique_rankings):
-        single_ranking = pd.DataFrame(profile_df.iloc[:, r])  # isolate ranking
-        candidates_ranked = list(single_ranking.to_numpy().flatten())
-        unranked_set_df = dataset_df[~dataset_df[candidates_col].isin(candidates_ranked)]
-        unranked_data = unranked_set_df.drop(columns=[candidates_col])
-        # Determine the centroid
-        fit_data = dataset_df.drop(columns=[candidates_col])
-        kmeans = sklearn.cluster.KMeans(n_clusters=1, init='k-means++', random_state=0).fit(fit_data)
-        centroid = kmeans.cluster_centers_
-        # Determine similarity between centroid and other candidates
-        #Need to deal with string candidate ids here
-        sim = sklearn.metrics.pairwise.cosine_similarity(centroid, unranked_data.to_numpy(), dense_output=True)
-        unranked_set_df = unranked_set_df.assign(Sim = sim.flatten().tolist())
-        unranked_set_df = unranked_set_df[[candidates_col, 'Sim']]
-        # Order candidates by similarity to this centroid
-        unranked_set_df = unranked_set_df.sort_values(by=['Sim'], ascending=False)
-        completed_ranking = candidates_ranked + unranked_set_df[candidates_col].values.tolist()
-        profile_dict[list(profile_df.columns)[r]] = completed_ranking
+        candidates_ranked = profile_df.iloc[:, r].tolist()  # isolate ranking
+        # Order unranked candidates by similarity to the centroid
+        profile_dict[list(profile_df.columns)[r]] = imputer.complete(candidates_ranked)
 
     #Update profile
     profile_df = pd.DataFrame(profile_dict)
     return profile_df
-
-
-
-
-
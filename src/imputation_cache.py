@@ -0,0 +1,108 @@
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+from src.encoded_profile import EncodedProfile, LazyCompletedProfile, encode_profile
+import src.imputation as imp
+
+_CACHE_VERSION = 1  # bump when the imputation output changes so old entries are never read
+
+
+class ImputationCache:
+    """
+    On-disk cache of completed preference profiles.
+    Entries are content addressed: the key hashes the ranked prefixes, the candidate codes, the candidate dataset and
+    the imputation mode, so changing any input selects a different entry and a stale one is never returned.
+    Completed ballots are stored as .npy files and opened memory mapped (a LazyCompletedProfile only stores its tail).
+    """
+
+    def __init__(self, cache_dir):
+        """
+        :param cache_dir: Directory for the cached profiles, created on first write
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, profile, dataset_df, candidates_col, imputation="POOL"):
+        """
+        Content hash of the imputation inputs.
+        :param profile: EncodedProfile of preference profile, encoded with every candidate of dataset_df
+        :param dataset_df: Dataframe of candidate dataset (features and candidate ids)
+        :param candidates_col: Column in dataset_df with candidate ids/names
+        :param imputation: POOL or PERSONALIZED (see imputer_for)
+        :return: hex digest
+        """
+        digest = hashlib.sha256()
+        digest.update(repr((_CACHE_VERSION, imputation, candidates_col, list(dataset_df.columns))).encode())
+        digest.update(pd.util.hash_pandas_object(dataset_df, index=False).to_numpy().tobytes())
+        digest.update('\x1f'.join(map(repr, profile.candidate_ids.tolist())).encode())
+        prefix = np.ascontiguousarray(profile.common_prefix(), dtype=np.int32)
+        digest.update(repr(prefix.shape).encode())
+        digest.update(prefix.tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key, kind):
+        return os.path.join(self.cache_dir, key + '.' + kind + '.npy')
+
+    def _load(self, path):
+        try:
+            return np.load(path, mmap_mode='r')
+        except (OSError, ValueError):  # missing or truncated entry
+            return None
+
+    def _save(self, path, array):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = path + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(array, dtype=np.int32))
+        os.replace(tmp_path, path)  # readers never see a partial file
+
+    def complete_lazily(self, profile, dataset_df, candidates_col, imputation="POOL"):
+        """
+        Cached imputer_for(imputation, dataset_df, candidates_col).complete_lazily(profile).
+        :param profile: Dataframe of preference profile or EncodedProfile
+        :param dataset_df: Dataframe of candidate dataset (features and candidate ids)
+        :param candidates_col: Column in dataset_df with candidate ids/names
+        :param imputation: POOL or PERSONALIZED (see imputer_for)
+        :return: LazyCompletedProfile or EncodedProfile, with the weights of profile
+        """
+        profile = encode_profile(profile, dataset_df[candidates_col].values)
+        key = self.key(profile, dataset_df, candidates_col, imputation)
+        tail = self._load(self._path(key, 'tail'))
+        if tail is not None:
+            self.hits += 1
+            return LazyCompletedProfile(profile.common_prefix(), tail, profile.candidate_ids, profile.voters,
+                                        profile.weights)
+        ballots = self._load(self._path(key, 'ballots'))
+        if ballots is not None:
+            self.hits += 1
+            return EncodedProfile(ballots, profile.candidate_ids, profile.voters, profile.weights)
+
+        self.misses += 1
+        completed = imp.imputer_for(imputation, dataset_df, candidates_col).complete_lazily(profile)
+        if isinstance(completed, LazyCompletedProfile):
+            self._save(self._path(key, 'tail'), completed.tail)
+        else:
+            self._save(self._path(key, 'ballots'), completed.ballots)
+        return completed
+
+    def complete_profile(self, profile, dataset_df, candidates_col, imputation="POOL"):
+        """
+        Cached imputer_for(imputation, dataset_df, candidates_col).complete_profile(profile).
+        :return: EncodedProfile of the completed profile, with the weights of profile
+        """
+        completed = self.complete_lazily(profile, dataset_df, candidates_col, imputation)
+        if isinstance(completed, LazyCompletedProfile):
+            return completed.materialize()
+        return completed
+
+    def clear(self):
+        """
+        Delete every cached profile.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.npy'):
+                os.remove(os.path.join(self.cache_dir, name))
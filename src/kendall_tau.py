@@ -0,0 +1,179 @@
+import numpy as np
+from src.encoded_profile import encode_profile
+
+
+def inversions(values, lengths=None):
+    """
+    Count the inversions of every row (pairs i < j with values[i] > values[j], equal values are not inverted).
+    Bottom-up merge sort run on all rows at once, each of the log2(width) passes merges every pair of sorted blocks
+    with one searchsorted over the whole batch.
+    :param values: Numpy array (rows x width) of non-negative ints
+    :param lengths: Optional numpy int array, entries at or after a row's length are ignored (defaults to width)
+    :return: Numpy int64 array of inversion counts
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.int64))
+    num_rows, width = values.shape
+    lengths = np.full(num_rows, width, dtype=np.int64) if lengths is None else np.asarray(lengths, dtype=np.int64)
+    size = 1 << max(width - 1, 0).bit_length()
+    # pad past every row's length with increasing values above all others, they add no inversions
+    big = int(np.max(values, initial=0)) + 1
+    pad = big + np.arange(size, dtype=np.int64)
+    vals = np.broadcast_to(pad, (num_rows, size)).copy()
+    in_row = np.arange(width) < lengths[:, None]
+    vals[:, :width][in_row] = values[in_row]
+
+    counts = np.zeros(num_rows, dtype=np.int64)
+    span = big + size  # every key is below span, so offsetting each block pair by span keeps the keys sorted
+    index = np.arange(size // 2, dtype=np.int64)
+    block = 1
+    while block < size:
+        num_pairs = num_rows * (size // (2 * block))
+        pairs = vals.reshape(num_pairs, 2, block)
+        offsets = (np.arange(num_pairs, dtype=np.int64) * span)[:, None]
+        left = (pairs[:, 0, :] + offsets).ravel()
+        right = (pairs[:, 1, :] + offsets).ravel()
+        starts = np.repeat(np.arange(num_pairs, dtype=np.int64) * block, block)
+        left_not_above = np.searchsorted(left, right, side='right') - starts  # left elements <= each right element
+        right_below = np.searchsorted(right, left, side='left') - starts  # right elements < each left element
+        counts += np.sum((block - left_not_above).reshape(num_rows, -1), axis=1)
+
+        # merged position of every element within its pair, ties keep the left element first
+        within = np.tile(index[:block], num_pairs)
+        merged = np.empty((num_pairs, 2 * block), dtype=np.int64)
+        rows = np.repeat(np.arange(num_pairs), block)
+        merged[rows, within + right_below] = pairs[:, 0, :].ravel()
+        merged[rows, within + left_not_above] = pairs[:, 1, :].ravel()
+        vals = merged.reshape(num_rows, size)
+        block *= 2
+    return counts
+
+
+def _positions(profile):
+    """
+    Position of every candidate code in every ranking (first occurrence), -1 when not ranked.
+    :param profile: EncodedProfile
+    :return: Numpy int64 array (rankings x candidate codes, one extra slot for -1 padding)
+    """
+    ballots = profile.ballots
+    positions = np.full((ballots.shape[0], profile.num_candidates + 1), -1, dtype=np.int64)
+    rows = np.arange(ballots.shape[0])
+    for j in range(ballots.shape[1] - 1, -1, -1):
+        positions[rows, ballots[:, j]] = j
+    positions[:, -1] = -1
+    return positions
+
+
+def _common_order(positions_a, ballots_b):
+    """
+    For paired rankings a and b, the positions in a of the candidates of b that a also ranks, in the order of b.
+    :param positions_a: Numpy int array (pairs x candidate codes + 1), see _positions
+    :param ballots_b: Numpy int array (pairs x depth) of candidate codes, -1 after a ranking ends
+    :return: Numpy int64 array (pairs x depth) of positions, numpy int64 array of their counts
+    """
+    values = np.take_along_axis(positions_a, ballots_b.astype(np.int64), axis=1)  # -1 reads the padding slot
+    common = values >= 0
+    order = np.argsort(~common, axis=1, kind='stable')
+    values = np.take_along_axis(values, order, axis=1)
+    lengths = np.count_nonzero(common, axis=1)
+    values[np.arange(values.shape[1]) >= lengths[:, None]] = 0
+    return values, lengths
+
+
+def _shared_codes(profile_a, profile_b):
+    """
+    Encode two preference profiles with the same candidate codes.
+    :return: EncodedProfile of profile_a, EncodedProfile of profile_b
+    """
+    profile_a = encode_profile(profile_a)
+    profile_b = encode_profile(profile_b, profile_a.candidate_ids)
+    profile_a = encode_profile(profile_a, profile_b.candidate_ids)
+    return profile_a, profile_b
+
+
+def kendall_tau_distance(rank_a, rank_b):
+    """
+    Kendall tau distance, the number of candidate pairs of rank_b that rank_a orders the other way.
+    Only the candidates both rankings contain are compared.
+    :param rank_a: List of candidates
+    :param rank_b: List of candidates
+    :return: distance
+    """
+    position = {}
+    for i, cand in enumerate(rank_a):
+        position.setdefault(cand, i)
+    values = [position[cand] for cand in rank_b if cand in position]
+    return int(inversions(np.asarray([values], dtype=np.int64).reshape(1, -1))[0])
+
+
+def kendall_tau_distances(profile_a, profile_b):
+    """
+    Kendall tau distance of every ranking of profile_a to the ranking of profile_b in the same column.
+    :param profile_a: Dataframe of preference profile or EncodedProfile (e.g. the imputed profile)
+    :param profile_b: Dataframe of preference profile or EncodedProfile with the same number of rankings (e.g. known)
+    :return: Numpy int64 array of distances
+    """
+    profile_a, profile_b = _shared_codes(profile_a, profile_b)
+    if profile_a.num_ballots != profile_b.num_ballots:
+        raise ValueError("Both profiles must have the same number of rankings")
+    values, lengths = _common_order(_positions(profile_a), profile_b.ballots)
+    return inversions(values, lengths)
+
+
+def kendall_tau_matrix(profile_a, profile_b=None, block_size=4096):
+    """
+    Kendall tau distance of every ranking of profile_a to every ranking of profile_b.
+    :param profile_a: Dataframe of preference profile or EncodedProfile
+    :param profile_b: Dataframe of preference profile or EncodedProfile, defaults to profile_a (voter x voter)
+    :param block_size: Number of ranking pairs evaluated together
+    :return: Numpy int64 array (rankings of a x rankings of b) of distances
+    """
+    profile_a, profile_b = _shared_codes(profile_a, profile_a if profile_b is None else profile_b)
+    positions_a = _positions(profile_a)
+    num_a, num_b = profile_a.num_ballots, profile_b.num_ballots
+    distances = np.zeros(num_a * num_b, dtype=np.int64)
+    for start in range(0, num_a * num_b, block_size):
+        pair = np.arange(start, min(start + block_size, num_a * num_b))
+        values, lengths = _common_order(positions_a[pair // num_b], profile_b.ballots[pair % num_b])
+        distances[pair] = inversions(values, lengths)
+    return distances.reshape(num_a, num_b)
+
+
+def random_completion_distances(profile, pool_ids, known_profile, num_trials=1000, seed=123, block_size=4096):
+    """
+    Random-imputation baseline: every trial completes each ranking with its unranked pool candidates in a random order
+    and scores it against the known ranking of the same voter (see kendall_tau_distances).
+    Trial t draws from its own numpy Generator (spawned from seed), so a trial's result does not depend on how many
+    trials run or how they are blocked. The tails of a block of trials are one matrix of random keys.
+    :param profile: Dataframe of preference profile or EncodedProfile (the partial rankings)
+    :param pool_ids: Iterable of the candidate ids of the pool
+    :param known_profile: Dataframe of preference profile or EncodedProfile with the same number of rankings
+    :param num_trials: Number of random completions
+    :param seed: Seed of the trial streams
+    :param block_size: Number of completed rankings evaluated together
+    :return: Numpy float64 array of the average distance of every trial
+    """
+    profile = encode_profile(profile, pool_ids)
+    profile, known = _shared_codes(profile, known_profile)
+    if profile.num_ballots != known.num_ballots:
+        raise ValueError("Both profiles must have the same number of rankings")
+    num_ballots = profile.num_ballots
+    positions = _positions(profile)
+    unranked = np.zeros((num_ballots, profile.num_candidates), dtype=bool)
+    unranked[:, profile.encode(pool_ids)] = True
+    unranked &= positions[:, :-1] < 0
+    streams = np.random.SeedSequence(seed).spawn(num_trials)
+
+    averages = np.zeros(num_trials)
+    trials_per_block = max(1, block_size // max(num_ballots, 1))
+    for start in range(0, num_trials, trials_per_block):
+        trials = range(start, min(start + trials_per_block, num_trials))
+        keys = np.stack([np.random.default_rng(streams[t]).random(unranked.shape) for t in trials])
+        keys[:, ~unranked] = 2  # ranked candidates and candidates outside the pool sort after the unranked ones
+        tail_rank = np.argsort(np.argsort(keys, axis=2), axis=2)
+        completed = np.where(unranked, profile.lengths[:, None] + tail_rank, positions[:, :-1])
+        completed = np.concatenate([completed, np.full(completed.shape[:2] + (1,), -1)], axis=2)
+        completed = completed.reshape(-1, completed.shape[2])
+        values, lengths = _common_order(completed, np.tile(known.ballots, (len(trials), 1)))
+        distances = inversions(values, lengths).reshape(len(trials), num_ballots)
+        averages[start:start + len(trials)] = np.mean(distances, axis=1)
+    return averages
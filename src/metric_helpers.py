@@ -1,51 +1,65 @@
 # Script for helper functions
 import numpy as np
 import pandas as pd
+from src.candidate_pool import candidate_pool
+from src.encoded_profile import LazyCompletedProfile, encode_profile
+
 def get_item_group_dict_for_ranking(ranking_df, dataset_df, candidates_col, sa_col):
     """
     Create item group dict.
     :param ranking_df: Dataframe of candidates
-    :param dataset_df: Dataframe of candidate pool
+    :param dataset_df: Dataframe of candidate pool or CandidatePool
     :param candidates_col: Column in dataset_df with candidate ids/names
     :param sa_col: Column in dataset_df with group information
     :return: item_group_dict
     """
     unique_candidates = list(np.unique(ranking_df.values))
-    sa = [dataset_df.loc[dataset_df[candidates_col] == c][sa_col].item() for c in unique_candidates]
-    item_group_dict = dict(zip(unique_candidates, sa))
+    item_group_dict = candidate_pool(dataset_df, candidates_col, sa_col).item_group_dict(unique_candidates)
     return item_group_dict
 
 def get_item_group_dict(dataset_df, candidates_col, sa_col):
     """
     Create item group dict.
-    :param dataset_df: Dataframe of candidate pool
+    :param dataset_df: Dataframe of candidate pool or CandidatePool
     :param candidates_col: Column in dataset_df with candidate ids/names
     :param sa_col: Column in dataset_df with group information
     :return: item_group_dict
     """
-    unique_candidates = list(np.unique(dataset_df[candidates_col].values))
-    sa = [dataset_df.loc[dataset_df[candidates_col] == c][sa_col].item() for c in unique_candidates]
-    item_group_dict = dict(zip(unique_candidates, sa))
+    item_group_dict = candidate_pool(dataset_df, candidates_col, sa_col).item_group_dict()
     return item_group_dict
 
 def rankingdf_to_proportions(ranking_df, item_group_dict):
     """
     Calculate each group's proportion of a dataframe of ranking(s) i.e. the preference profile or consensus ranking.
-    :param ranking_df:Dataframe of candiates
+    :param ranking_df:Dataframe of candiates or EncodedProfile
     :param item_group_dict: Dictionary where candidates are keys and values are their groups
     :return: group_cnt_dict
     """
-    num_rankings = len(ranking_df.columns)
-    candidates = []
-    for r in range(0, num_rankings):
-        single_ranking = ranking_df[ranking_df.columns[r]]  # isolate ranking
-        single_ranking = np.array(
-            single_ranking[~pd.isnull(single_ranking)]
-        )  # drop any NaNs
-        candidates = candidates + single_ranking.tolist()
-    unique_candidates = np.unique(candidates)
-    groups_of_df = [item_group_dict[c] for c in unique_candidates]
-    grps, grp_count = np.unique(groups_of_df, return_counts=True)
+    profile = encode_profile(ranking_df)
+    if isinstance(profile, LazyCompletedProfile):
+        profile = profile.materialize()
+    unique_codes = np.unique(profile.ballots[profile.ballots >= 0])
+    groups_of_df = [item_group_dict[c] for c in profile.decode(unique_codes)]
+    grps, unique_group_codes = np.unique(groups_of_df, return_inverse=True)
+    group_codes = np.full(profile.num_candidates, -1, dtype=np.int64)
+    group_codes[unique_codes] = unique_group_codes
+    grp_count, _ = group_counts(profile.ballots, group_codes, len(grps))
     group_cnt_dict = dict(zip(grps.tolist(), grp_count.tolist()))
     return group_cnt_dict
 
+
+def group_counts(ballots, group_codes, num_groups):
+    """
+    Count the candidates of each group in encoded ranking(s).
+    :param ballots: Numpy int array (rankings x depth) of candidate codes, -1 after a ranking ends
+    :param group_codes: Numpy int array where the index is the candidate code and the value its group code
+    :param num_groups: Number of group codes
+    :return: numpy array of distinct candidates per group over all rankings,
+        numpy array (rankings x groups) of candidates per group in every ranking
+    """
+    ranked = ballots >= 0
+    counts = np.bincount(group_codes[np.unique(ballots[ranked])], minlength=num_groups)
+    rows = np.nonzero(ranked)[0]
+    per_ranking = np.bincount(rows * num_groups + group_codes[ballots[ranked]],
+                              minlength=ballots.shape[0] * num_groups).reshape(ballots.shape[0], num_groups)
+    return counts, per_ranking
@@ -3,91 +3,264 @@
 # Fairness-aware ranking in search & recommendation systems with application to linkedin talent search.
 # In Proceedings of the 25th acm sigkdd international conference on knowledge discovery & data mining (pp. 2221-2231).
 
+import functools
 import numpy as np
 import pandas as pd
+from src.encoded_profile import LazyCompletedProfile, encode_profile
+
+
+class SatisfactionProfile:
+    """
+    Profile side of the satisfaction metrics, encoded once and shared by every consensus ranking and depth.
+    The top of every ranking is kept as a code matrix per profile depth, a consensus ranking becomes an array of
+    consensus positions indexed by candidate code, so each metric is one gather and compare over that matrix.
+    """
+
+    def __init__(self, profile_df):
+        """
+        :param profile_df: Dataframe of preference profile or EncodedProfile
+        """
+        profile = encode_profile(profile_df)
+        if isinstance(profile, LazyCompletedProfile):
+            profile = profile.materialize()
+        self.profile = profile
+        self.weights = profile.weights
+        self._tops = {}
+
+    def _top(self, depths):
+        """
+        Top of every ranking, a candidate repeated within its top counts once like in a set.
+        :param depths: Numpy int array of the top depth of every ranking, at most its length
+        :return: Numpy int array (rankings x max depth) of codes, -1 outside the top
+        """
+        key = depths.tobytes()
+        if key not in self._tops:
+            width = int(np.max(depths, initial=0))
+            top = self.profile.ballots[:, :width].astype(np.int64)
+            order = np.argsort(top, axis=1, kind='stable')
+            sorted_top = np.take_along_axis(top, order, axis=1)
+            repeated_sorted = np.zeros(top.shape, dtype=bool)
+            repeated_sorted[:, 1:] = sorted_top[:, 1:] == sorted_top[:, :-1]  # stable, so the first copy is kept
+            repeated = np.empty(top.shape, dtype=bool)
+            np.put_along_axis(repeated, order, repeated_sorted, axis=1)
+            top[repeated | (np.arange(width) >= depths[:, None])] = -1
+            self._tops[key] = top
+        return self._tops[key]
+
+    def _percentage_depths(self, profile_percentage):
+        lengths = self.profile.lengths
+        return np.minimum(np.round(profile_percentage * lengths).astype(np.int64), lengths)
+
+    def _fixed_depths(self, profile_depth):
+        return np.minimum(profile_depth, self.profile.lengths).astype(np.int64)
+
+    def consensus_positions(self, batch):
+        """
+        Position of every profile candidate in every consensus ranking of a batch.
+        :param batch: ConsensusBatch
+        :return: Numpy int array (rankings x candidate codes, one extra slot for -1), the ranking's length when a
+            candidate is not in it
+        """
+        to_profile = np.asarray([self.profile.id_to_code.get(c, -1) for c in batch.candidate_ids.tolist()] + [-1],
+                                dtype=np.int64)
+        profile_codes = to_profile[batch.codes]
+        positions = np.repeat(batch.lengths[:, None], self.profile.num_candidates + 1, axis=1)
+        rows = np.arange(batch.num_rankings)
+        for j in range(batch.codes.shape[1] - 1, -1, -1):  # the first occurrence wins, like list.index
+            positions[rows, profile_codes[:, j]] = j
+        positions[:, -1] = batch.lengths
+        return positions
+
+    def batch_average_satisfaction_percentages(self, profile_percentage, batch, consensus_percentages):
+        """
+        average_satisfaction_percentage of every consensus ranking of a batch at several consensus depths.
+        :param profile_percentage: Depth of profile as percentage of profile
+        :param batch: ConsensusBatch
+        :param consensus_percentages: List of depths of consensus ranking as percentage of profile
+        :return: numpy array (consensus percentages x consensus rankings) of satisfaction
+        """
+        depths = self._percentage_depths(profile_percentage)
+        if np.any(depths == 0):
+            raise ZeroDivisionError("division by zero")  # a ranking with an empty top
+        top = self._top(depths)
+        positions = self.consensus_positions(batch)
+        satisfaction = np.empty((len(consensus_percentages), batch.num_rankings))
+        for r in range(batch.num_rankings):
+            top_positions = positions[r][top]
+            num_consensus = int(batch.lengths[r])
+            for i, consensus_percentage in enumerate(consensus_percentages):
+                consensus_depth = min(round(consensus_percentage * num_consensus), num_consensus)
+                overlap = np.count_nonzero(top_positions < consensus_depth, axis=1)
+                satisfaction[i, r] = np.average(overlap / depths, weights=self.weights)
+        return satisfaction
+
+    def batch_full_sat_index(self, profile_percentage, batch):
+        """
+        full_sat_index of every consensus ranking of a batch.
+        :return: numpy array of index as percentage per consensus ranking
+        """
+        top = self._top(self._percentage_depths(profile_percentage))
+        positions = self.consensus_positions(batch)
+        index = np.empty(batch.num_rankings)
+        for r in range(batch.num_rankings):
+            num_consensus = positions[r, -1]
+            top_positions = positions[r][top]
+            in_consensus = top_positions < num_consensus
+            if not np.all(np.any(in_consensus, axis=1)):
+                index[r] = np.inf
+                continue
+            sats = np.max(np.where(in_consensus, top_positions, -1), axis=1)
+            index[r] = (np.max(sats)+1)/num_consensus
+        return index
+
+    def batch_satisfaction_index_count(self, profile_depth, batch, consensus_depth, overlap):
+        """
+        satisfaction_index_count of every consensus ranking of a batch.
+        :return: numpy array of percent of rankers satisfied per consensus ranking
+        """
+        top = self._top(self._fixed_depths(profile_depth))
+        positions = self.consensus_positions(batch)
+        satisfaction = np.empty(batch.num_rankings)
+        for r in range(batch.num_rankings):
+            depth = min(consensus_depth, positions[r, -1])
+            overlaps = np.count_nonzero(positions[r][top] < depth, axis=1)
+            num_satisfied = np.sum(self.weights[overlaps >= overlap])
+            satisfaction[r] = num_satisfied/np.sum(self.weights)
+        return satisfaction
+
+    def average_satisfaction_percentages(self, profile_percentage, consensus_df, consensus_percentages):
+        """
+        average_satisfaction_percentage at several consensus depths in one pass.
+        :param profile_percentage: Depth of profile as percentage of profile
+        :param consensus_df: Dataframe of consensus ranking
+        :param consensus_percentages: List of depths of consensus ranking as percentage of profile
+        :return: numpy array of satisfaction per consensus percentage
+        """
+        return self.batch_average_satisfaction_percentages(profile_percentage, ConsensusBatch([consensus_df]),
+                                                           consensus_percentages)[:, 0]
+
+    def full_sat_index(self, profile_percentage, consensus_df):
+        """
+        See full_sat_index.
+        """
+        return self.batch_full_sat_index(profile_percentage, ConsensusBatch([consensus_df]))[0]
+
+    def satisfaction_index_count(self, profile_depth, consensus_df, consensus_depth, overlap):
+        """
+        See satisfaction_index_count.
+        """
+        return self.batch_satisfaction_index_count(profile_depth, ConsensusBatch([consensus_df]), consensus_depth,
+                                                   overlap)[0]
+
+
+class ConsensusBatch:
+    """
+    Many consensus rankings stacked into one code matrix, NaN slots stay in place as -1 (they count in the length).
+    With an item group dict every candidate code also keeps its group id (index into the sorted groups).
+    """
+
+    def __init__(self, consensus_dfs, item_group_dict=None):
+        """
+        :param consensus_dfs: List of dataframes of consensus rankings
+        :param item_group_dict: Optional dictionary of items (keys) and their group membership (values), e.g. the pool's
+        """
+        columns = [list(consensus_df[consensus_df.columns[0]]) for consensus_df in consensus_dfs]
+        self.lengths = np.asarray([len(column) for column in columns], dtype=np.int64)
+        # codes in order of first appearance, ids only need to be hashable (like the list and set lookups they replace)
+        id_to_code = {}
+        for column in columns:
+            for c in column:
+                if not pd.isnull(c):
+                    id_to_code.setdefault(c, len(id_to_code))
+        self.candidate_ids = np.empty(len(id_to_code), dtype=object)
+        self.candidate_ids[:] = list(id_to_code)
+        self.codes = np.full((len(columns), int(np.max(self.lengths, initial=0))), -1, dtype=np.int64)
+        for r, column in enumerate(columns):
+            self.codes[r, :len(column)] = [id_to_code.get(c, -1) for c in column]
+        if item_group_dict is not None:
+            self.groups, self.all_group_ids = np.unique(list(item_group_dict.values()), return_inverse=True)
+            grp_to_id = dict(zip(self.groups.tolist(), range(len(self.groups))))
+            self.group_ids = np.asarray([grp_to_id[item_group_dict[c]] for c in self.candidate_ids.tolist()],
+                                        dtype=np.int64)
+
+    @property
+    def num_rankings(self):
+        return len(self.lengths)
+
+    def ranking(self, r):
+        """
+        :param r: index of the consensus ranking
+        :return: Numpy array of the candidate codes of ranking r, NaNs dropped
+        """
+        codes = self.codes[r]
+        return codes[codes >= 0]
+
+    def group_counts(self):
+        """
+        Distinct candidates of each group per ranking, like rankingdf_to_proportions.
+        :return: Numpy int array (rankings x groups)
+        """
+        counts = np.zeros((self.num_rankings, len(self.groups)), dtype=np.int64)
+        for r in range(self.num_rankings):
+            counts[r] = np.bincount(self.group_ids[np.unique(self.ranking(r))], minlength=len(self.groups))
+        return counts
+
+    def group_cnt_dict(self, r):
+        """
+        :param r: index of the consensus ranking
+        :return: Dictionary of groups (keys) and counts (values) of ranking r, like rankingdf_to_proportions
+        """
+        counts = self.group_counts()[r]
+        return dict(zip(self.groups[counts > 0].tolist(), counts[counts > 0].tolist()))
+
+
+def satisfaction_profile(profile_df):
+    """
+    Encode a preference profile for the satisfaction metrics.
+    :param profile_df: Dataframe of preference profile, EncodedProfile or SatisfactionProfile
+    :return: SatisfactionProfile
+    """
+    if isinstance(profile_df, SatisfactionProfile):
+        return profile_df
+    return SatisfactionProfile(profile_df)
+
 
 def full_sat_index(profile_df, profile_percentage, consensus_df):
     """
     What index does the consensus satisfy profile_percentage?
-    :param profile_df: Dataframe of preference profile
+    :param profile_df: Dataframe of preference profile, EncodedProfile or SatisfactionProfile
     :param consensus_df: Dataframe of consensus ranking
     :param consensus_percentage: Depth of consensus ranking @ percentage
     :return: index as percentage
     """
-    num_rankings = len(profile_df.columns)
-    consensus = list(consensus_df[consensus_df.columns[0]])
-    sats = []
-    for r in range(0, num_rankings):
-        indxs = []
-        single_ranking = profile_df[profile_df.columns[r]]  # isolate ranking
-        single_ranking = np.array(
-            single_ranking[~pd.isnull(single_ranking)]
-        )  # drop any NaNs
-        top = list(single_ranking[0:round(profile_percentage * len(single_ranking))])
-        for i in top:
-            if i in consensus:
-                indxs.append(consensus.index(i))
-        if len(indxs) > 0:
-            sats.append(np.max(indxs))
-        else:
-            return np.inf
-    return (np.max(sats)+1)/len(consensus)
-
+    return satisfaction_profile(profile_df).full_sat_index(profile_percentage, consensus_df)
 
 
 def satisfaction_index_count(profile_df, profile_depth, consensus_df, consensus_depth, overlap):
     """
     Calculate percent of rankers satisfied (have overlap candidates @ both profile depth and consensus depth)
-    :param profile_df: Dataframe of preference profile
+    :param profile_df: Dataframe of preference profile, EncodedProfile or SatisfactionProfile
     :param profile_depth: index of profile
     :param consensus_df: Dataframe of consensus ranking
     :param consensus_depth: index of consensus ranking
     :param overlap: How many items should be shared to be satisfied
     :return: Percent of rankers satisfied
     """
-    consensus = list(consensus_df[consensus_df.columns[0]])
-    consensus_top = consensus[0:consensus_depth]
-    num_rankings = len(profile_df.columns)
-    num_satisfied = 0
-    for r in range(0, num_rankings):
-        single_ranking = profile_df[profile_df.columns[r]]  # isolate ranking
-        single_ranking = np.array(
-            single_ranking[~pd.isnull(single_ranking)]
-        )  # drop any NaNs
-        top = list(single_ranking[0:profile_depth])
-        top_length = len(top)
-        intersection = set(top).intersection(set(consensus_top))
-        if len(intersection) >= overlap:
-            num_satisfied += 1
-    satisfaction = num_satisfied/num_rankings
-    return satisfaction
+    return satisfaction_profile(profile_df).satisfaction_index_count(profile_depth, consensus_df, consensus_depth,
+                                                                     overlap)
 
 
 def average_satisfaction_percentage(profile_df, profile_percentage, consensus_df, consensus_percentage):
     """
     Average amongst rankers proportion of items shared between profile depth (as %) and consensus depth (as %)
-    :param profile_df: Dataframe of preference profile
+    :param profile_df: Dataframe of preference profile, EncodedProfile or SatisfactionProfile
     :param profile_percentage: Depth of profile as percentage of profile
     :param consensus_df: Dataframe of consensus ranking
     :param consensus_percentage: Depth of consensus ranking as percentage of profile
     :return: satisfaction
     """
-    consensus_depth = round(consensus_percentage*len(consensus_df[consensus_df.columns[0]]))
-    consensus = list(consensus_df[consensus_df.columns[0]])
-    consensus_top = consensus[0:consensus_depth]
-    num_rankings = len(profile_df.columns)
-    satisfied = []
-    for r in range(0, num_rankings):
-        single_ranking = profile_df[profile_df.columns[r]]  # isolate ranking
-        single_ranking = np.array(
-            single_ranking[~pd.isnull(single_ranking)]
-        )  # drop any NaNs
-        top = list(single_ranking[0:round(profile_percentage*len(single_ranking))])
-        top_length = len(top)
-        intersection = set(top).intersection(set(consensus_top))
-        satisfied.append(len(intersection)/top_length)
-    satisfaction = np.mean(satisfied)
-    return satisfaction
+    return satisfaction_profile(profile_df).average_satisfaction_percentages(profile_percentage, consensus_df,
+                                                                             [consensus_percentage])[0]
 
 
 def KL_div_pool_assess_set(pool_group_cnt_dict, assess_group_cnt_dict, fair_rep):
@@ -152,6 +325,90 @@ def fair_representation(pool_group_cnt_dict, assess_group_cnt_dict, fair_rep):
 
 
 
+def batch_KL_div_pool_assess_set(pool_group_cnt_dict, batch, fair_rep):
+    """
+    KL_div_pool_assess_set of every consensus ranking of a batch.
+    :param pool_group_cnt_dict: Dictionary of groups (keys) and counts (values)
+    :param batch: ConsensusBatch built with the pool item group dict
+    :param fair_rep: EQUAL or PROPORTIONAL
+    :return: numpy array of divergence values
+    """
+    counts = batch.group_counts()
+    consenus_totals = np.sum(counts, axis=1)
+    grp_to_id = dict(zip(batch.groups.tolist(), range(len(batch.groups))))
+    assess_counts = np.zeros((batch.num_rankings, len(pool_group_cnt_dict)), dtype=np.int64)
+    for i, grp in enumerate(pool_group_cnt_dict.keys()):
+        if grp in grp_to_id:
+            assess_counts[:, i] = counts[:, grp_to_id[grp]]
+    if fair_rep == "EQUAL":
+        desired_proportions = [1/len(list(pool_group_cnt_dict.keys()))] * len(pool_group_cnt_dict)
+    if fair_rep == "PROPORTIONAL":
+        pool_total = np.sum(list(pool_group_cnt_dict.values()))
+        desired_proportions = [cnt/pool_total for cnt in pool_group_cnt_dict.values()]
+    consensus_proportions = np.divide(assess_counts, consenus_totals[:, None], out=np.zeros(assess_counts.shape),
+                                      where=assess_counts > 0)
+    return __kl_divergences(consensus_proportions, np.asarray(desired_proportions))
+
+
+def batch_fair_representation(pool_group_cnt_dict, batch, fair_rep):
+    """
+    fair_representation of every consensus ranking of a batch.
+    :param pool_group_cnt_dict: Dictionary of groups (keys) and counts (values)
+    :param batch: ConsensusBatch built with the pool item group dict
+    :param fair_rep: EQUAL or PROPORTIONAL
+    :return: numpy array of values
+    """
+    counts = batch.group_counts()
+    vals = np.zeros(batch.num_rankings)
+    for r in range(batch.num_rankings):
+        assess_cnts = counts[r][counts[r] > 0]  # counts in object being measured
+        if len(list(pool_group_cnt_dict.keys())) != len(assess_cnts):
+            continue  # one group is not selected into the assessed object
+        if fair_rep == "EQUAL":
+            proportions_of_assess_set = assess_cnts / np.sum(assess_cnts)
+            vals[r] = np.min(proportions_of_assess_set) / np.max(proportions_of_assess_set)
+        if fair_rep == "PROPORTIONAL":
+            pool_cnts = list(pool_group_cnt_dict.values())  # counts in pool
+            selection_rates = assess_cnts / np.asarray(pool_cnts)
+            vals[r] = np.min(selection_rates) / np.max(selection_rates)
+    return vals
+
+
+def batch_NDKL(batch, fair_rep, ranked_groups=False):
+    """
+    NDKL of every consensus ranking of a batch.
+    :param batch: ConsensusBatch built with an item group dict
+    :param fair_rep: EQUAL or PROPORTIONAL
+    :param ranked_groups: Use only the ranked items as item_group_dict (as get_item_group_dict_for_ranking does)
+    :return: numpy array of NDKL values
+    """
+    return np.asarray([__ndkl(*__batch_group_ids(batch, r, ranked_groups), fair_rep)
+                       for r in range(batch.num_rankings)])
+
+
+def batch_NDKL_allpos(batch, fair_rep, ranked_groups=False):
+    """
+    NDKL_allpos of every consensus ranking of a batch, see batch_NDKL.
+    :return: numpy array of NDKL values
+    """
+    return np.asarray([__ndkl_allpos(*__batch_group_ids(batch, r, ranked_groups), fair_rep)
+                       for r in range(batch.num_rankings)])
+
+
+def __batch_group_ids(batch, r, ranked_groups):
+    """
+    Group ids of consensus ranking r of a batch, see __ranking_group_ids.
+    :return: Numpy array of group ids in ranking order, numpy array of group ids of all items, number of groups
+    """
+    ranking = batch.ranking(r)
+    group_ids = batch.group_ids[ranking]
+    if not ranked_groups:
+        return group_ids, batch.all_group_ids, len(batch.groups)
+    ranked_grps = np.unique(group_ids)
+    all_group_ids = np.searchsorted(ranked_grps, batch.group_ids[np.unique(ranking)])
+    return np.searchsorted(ranked_grps, group_ids), all_group_ids, len(ranked_grps)
+
+
 def __kl_divergence(p, q):
     """
     Calculate KL-Divergence between P and Q, with epsilon to avoid divide by zero.
@@ -174,51 +431,65 @@ def NDKL(ranking_df, item_group_dict, fair_rep):
     :param fair_rep EQUAL or PROPORTIONAL
     :return: NDKL value.
     """
-    if len(ranking_df.columns) > 1:
-        raise AssertionError("NDKL can only be calculated on a single ranking.")
+    group_ids, all_group_ids, num_groups = __ranking_group_ids(ranking_df, item_group_dict)
+    return __ndkl(group_ids, all_group_ids, num_groups, fair_rep)
 
-    single_ranking = ranking_df[ranking_df.columns[0]]  # isolate ranking
-    single_ranking = np.array(
-        single_ranking[~pd.isnull(single_ranking)]
-    )  # drop any NaNs
 
-    group_ids = [item_group_dict[c] for c in single_ranking]
-    unique_grps = np.unique(list(item_group_dict.values()))
-    group_ids = np.asarray( 
-        [np.argwhere(unique_grps == grp_of_item)[0, 0] for grp_of_item in group_ids]
-    )
-    all_groups = np.asarray(list(item_group_dict.values()))
-    all_group_ids = np.asarray(
-        [np.argwhere(unique_grps == grp_of_item)[0, 0] for grp_of_item in all_groups]
-    )
-    num_groups = len(unique_grps)
-    num_items = len(single_ranking)
+def NDKL_allpos(ranking_df, item_group_dict, fair_rep):
+    """
+    Calculate Normalized Discounted KL-Divergence Score (Geyik et al.).
+    :param ranking_df: Pandas dataframe of ranking(s).
+    :param item_group_dict: Dictionary of items (keys) and their group membership (values).
+    :return: NDKL value.
+    """
+    group_ids, all_group_ids, num_groups = __ranking_group_ids(ranking_df, item_group_dict)
+    return __ndkl_allpos(group_ids, all_group_ids, num_groups, fair_rep)
 
-    if fair_rep == 'PROPORTIONAL':
-        #dr = __distributions(group_ids, num_groups)  # Distributions per group
-        dr = __distributions(all_group_ids, num_groups)  # Distributions per group
-    if fair_rep == 'EQUAL':
-        dr = np.tile((1/(num_groups)), num_groups) #for more equal chunks
-      # Array of Z scores
-
-    chunks = list(range(num_groups, num_items + num_groups,num_groups))
-    Z = __Z_Vector(len(chunks))
-    vals = []
-    for ind in range(0, len(list(range(num_groups, num_items+ num_groups,num_groups)))):
-        end_prefix = chunks[ind]
-        P = __distributions(group_ids[0 : end_prefix], num_groups)
-        kl = __kl_divergence(P, dr)
-        vals.append(Z[ind]*kl)
+
+def __ndkl(group_ids, all_group_ids, num_groups, fair_rep):
+    """
+    NDKL of a ranking given as group ids, see NDKL.
+    :param group_ids: Numpy array of group ids in ranking order.
+    :param all_group_ids: Numpy array of group ids of all items.
+    :param num_groups: Int, number of distinct groups
+    :param fair_rep EQUAL or PROPORTIONAL
+    :return: NDKL value.
+    """
+    num_items = len(group_ids)
+    dr = __desired_distribution(all_group_ids, num_groups, fair_rep)
+
+    chunks = np.arange(num_groups, num_items + num_groups, num_groups)
+    Z = __Z_Vector(len(chunks))  # Array of Z scores
+    P = __prefix_distributions(group_ids, num_groups, np.minimum(chunks, num_items))
+    vals = Z * __kl_divergences(P, dr)
     result = (1 / np.sum(Z)) * np.sum(vals)
     return result
 
 
-def NDKL_allpos(ranking_df, item_group_dict, fair_rep):
+def __ndkl_allpos(group_ids, all_group_ids, num_groups, fair_rep):
     """
-    Calculate Normalized Discounted KL-Divergence Score (Geyik et al.).
+    NDKL_allpos of a ranking given as group ids, see NDKL_allpos.
+    :param group_ids: Numpy array of group ids in ranking order.
+    :param all_group_ids: Numpy array of group ids of all items.
+    :param num_groups: Int, number of distinct groups
+    :param fair_rep EQUAL or PROPORTIONAL
+    :return: NDKL value.
+    """
+    num_items = len(group_ids)
+    dr = __desired_distribution(all_group_ids, num_groups, fair_rep)
+    Z = __Z_Vector(num_items)  # Array of Z scores
+
+    #Eq. 4 in Geyik et al.
+    P = __prefix_distributions(group_ids, num_groups, np.arange(1, num_items + 1))
+    return (1 / np.sum(Z)) * np.sum(Z * __kl_divergences(P, dr))
+
+
+def __ranking_group_ids(ranking_df, item_group_dict):
+    """
+    Group ids (index into the sorted groups) of a single ranking and of every item.
     :param ranking_df: Pandas dataframe of ranking(s).
     :param item_group_dict: Dictionary of items (keys) and their group membership (values).
-    :return: NDKL value.
+    :return: Numpy array of group ids in ranking order, numpy array of group ids of all items, number of groups
     """
     if len(ranking_df.columns) > 1:
         raise AssertionError("NDKL can only be calculated on a single ranking.")
@@ -228,33 +499,53 @@ def NDKL_allpos(ranking_df, item_group_dict, fair_rep):
         single_ranking[~pd.isnull(single_ranking)]
     )  # drop any NaNs
 
-    group_ids = [item_group_dict[c] for c in single_ranking]
-    unique_grps = np.unique(list(item_group_dict.values()))
-    group_ids = np.asarray(
-        [np.argwhere(unique_grps == grp_of_item)[0, 0] for grp_of_item in group_ids]
-    )
-    all_groups = np.asarray(list(item_group_dict.values()))
-    all_group_ids = np.asarray(
-        [np.argwhere(unique_grps == grp_of_item)[0, 0] for grp_of_item in all_groups]
-    )
-    num_groups = len(unique_grps)
-    num_items = len(single_ranking)
+    unique_grps, all_group_ids = np.unique(list(item_group_dict.values()), return_inverse=True)
+    grp_to_id = dict(zip(unique_grps.tolist(), range(len(unique_grps))))
+    group_ids = np.asarray([grp_to_id[item_group_dict[c]] for c in single_ranking], dtype=np.int64)
+    return group_ids, all_group_ids, len(unique_grps)
+
 
+def __desired_distribution(all_group_ids, num_groups, fair_rep):
+    """
+    Target group distribution of NDKL.
+    :param all_group_ids: Numpy array of group ids of all items.
+    :param num_groups: Int, number of distinct groups
+    :param fair_rep EQUAL or PROPORTIONAL
+    :return: Numpy array of each group's target proportion.
+    """
     if fair_rep == 'PROPORTIONAL':
-        #dr = __distributions(group_ids, num_groups)  # Distributions per group
-        dr = __distributions(all_group_ids, num_groups)  # Distributions per group
+        return __distributions(all_group_ids, num_groups)  # Distributions per group
     if fair_rep == 'EQUAL':
-        dr = np.tile((1/(num_groups)), num_groups) #for more equal chunks
-    Z = __Z_Vector(num_items)  # Array of Z scores
+        return np.tile((1/(num_groups)), num_groups) #for more equal chunks
 
-    #Eq. 4 in Geyik et al.
-    return (1 / np.sum(Z)) * np.sum(
-        [
-            Z[i]
-            * __kl_divergence(__distributions(group_ids[0 : i + 1], num_groups), dr)
-            for i in range(0, num_items)
-        ]
-    )
+
+def __prefix_distributions(group_ids, num_groups, ends):
+    """
+    Group proportions of many prefixes of a ranking at once from cumulative group counts.
+    Same values as __distributions(group_ids[0:end], num_groups) for every end.
+    :param group_ids: Numpy array of group id represented in the ranking.
+    :param num_groups: Int, number of distinct groups
+    :param ends: Numpy array of prefix lengths, each at least 1
+    :return: Numpy array (prefixes x groups) of each group's proportion.
+    """
+    one_hot = np.zeros((len(group_ids), num_groups), dtype=np.int64)
+    one_hot[np.arange(len(group_ids)), group_ids] = 1
+    counts = np.cumsum(one_hot, axis=0)[ends - 1]
+    return counts / ends[:, None]
+
+
+def __kl_divergences(P, q):
+    """
+    __kl_divergence of every row of P and q.
+    :param P: Numpy array (distributions x groups).
+    :param q: Numpy array q distribution.
+    :return: Numpy array of KL-Divergence scores.
+    """
+    epsilon = 0.0000001  # Epsilon is used here to avoid P or Q is equal to 0. "
+    P = P + epsilon
+    q = q + epsilon
+
+    return np.sum(P * np.log(P / q), axis=1)
 
 
 def __distributions(ranking, num_groups):
@@ -269,10 +560,13 @@ def __distributions(ranking, num_groups):
     )
 
 
+@functools.lru_cache(maxsize=None)
 def __Z_Vector(k):
     """
-    Calculate Z score
+    Calculate Z score, cached per k (the array is read only).
     :param k: Int, position of ranking.
     :return: Numpy array of Z values.
     """
-    return 1 / np.log2(np.array(range(0, k)) + 2)
\ No newline at end of file
+    Z = 1 / np.log2(np.array(range(0, k)) + 2)
+    Z.flags.writeable = False
+    return Z
\ No newline at end of file
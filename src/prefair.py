@@ -1,24 +1,31 @@
 from src.groupaware_stv import *
+from src.encoded_profile import encode_profile, compress_profile
 import src.imputation as imp
 import src.getset_representation as getset
 
 
 
-def preFAIR(profile_df, dataset_df, candidates_col, sa_col, fair_rep, k_cnt):
+def preFAIR(profile_df, dataset_df, candidates_col, sa_col, fair_rep, k_cnt, imputation="POOL",
+            imputation_cache=None):
     """
     PreFAIR Fair Preference Aggregation
-    :param profile_df: Dataframe of preference profile
+    :param profile_df: Dataframe of preference profile or EncodedProfile
     :param dataset_df: Dataframe of candidate dataset
     :param candidates_col: Column in dataset_df with candidate ids/names
     :param sa_col: Column in dataset_df with group information
     :param fair_rep: EQUAL or PROPORTIONAL
     :param k_cnt: length of consensus ranking
+    :param imputation: POOL (similarity to the pool centroid) or PERSONALIZED (similarity to each voter's centroid)
+    :param imputation_cache: Optional ImputationCache shared across runs on the same profile and candidate dataset
     :return: Dataframe consensus ranking
     """
+    #Encode the profile once and collapse identical ballots, every step below works on the weighted candidate codes
+    profile = compress_profile(encode_profile(profile_df, dataset_df[candidates_col].values))
+
     #Step 1: Calculate current representation
 
     item_group_dict, pool_group_cnt_dict, ranked_item_group_dict, profile_group_cnt_dict = getset.get_representation(
-        profile_df, dataset_df, candidates_col, sa_col)
+        profile, dataset_df, candidates_col, sa_col)
 
     # Step 2: Set fair representation
     group_constraints = getset.set_representation(pool_group_cnt_dict, profile_group_cnt_dict, fair_rep, k_cnt)
@@ -28,11 +35,14 @@ def preFAIR(profile_df, dataset_df, candidates_col, sa_col, fair_rep, k_cnt):
     if np.any(diff < 0):
         #Not enough candidates have to impute
         features_df = dataset_df.drop(columns=[sa_col]) #Drop sensative attribute
-        completed_profile_df = imp._imputate_candidates(profile_df, features_df, candidates_col)
+        if imputation_cache is not None:
+            completed_profile = imputation_cache.complete_lazily(profile, features_df, candidates_col, imputation)
+        else:
+            completed_profile = imp.imputer_for(imputation, features_df, candidates_col).complete_lazily(profile)
     else:
-        completed_profile_df = profile_df
+        completed_profile = profile
 
 
     #Step 4: Group-aware STV
-    consensus = group_aware_single_transferable_vote(completed_profile_df, item_group_dict, group_constraints)
+    consensus = group_aware_single_transferable_vote(completed_profile, item_group_dict, group_constraints)
     return pd.DataFrame(consensus)
\ No newline at end of file
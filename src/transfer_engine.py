@@ -0,0 +1,185 @@
+import numpy as np
+from src.encoded_profile import LazyCompletedProfile
+
+
+class TransferEngine:
+    """
+    Incremental next-preference lookups for STV vote transfers.
+    Each candidate keeps the (ballot, position) pairs where it is ranked and each ballot keeps a pointer from every
+    position to the next position still holding a continuing candidate. Removing a candidate or transferring its
+    votes only touches the ballots that rank it instead of scanning the whole profile.
+    """
+
+    def __init__(self, profile, considered_candidates):
+        """
+        :param profile: EncodedProfile of preference profile
+        :param considered_candidates: List of candidate codes that can be elected
+        """
+        self.ballots = profile.ballots
+        self.weights = profile.weights
+        num_rankings, depth = self.ballots.shape
+        self.depth = depth
+
+        # Candidate -> ballots and positions ranking it
+        rows, positions = np.nonzero(self.ballots >= 0)
+        codes = self.ballots[rows, positions]
+        order = np.argsort(codes, kind='stable')
+        self._rows = rows[order]
+        self._positions = positions[order].astype(np.int32)
+        self._starts = np.searchsorted(codes[order], np.arange(profile.num_candidates + 1))
+
+        # _skip[r, p] == p while position p holds a continuing candidate, column depth marks the end of the ballot
+        self._skip = np.tile(np.arange(depth + 1, dtype=np.int32), (num_rankings, 1))
+        continuing = np.zeros(profile.num_candidates + 1, dtype=bool)  # last slot is the -1 padding
+        continuing[considered_candidates] = True
+        stale_rows, stale_positions = np.nonzero(~continuing[self.ballots])
+        self._skip[stale_rows, stale_positions] = stale_positions + 1
+
+    def _occurrences(self, cand):
+        """
+        Ballots ranking candidate cand and the position of cand in them.
+        :param cand: candidate code
+        :return: rows, positions
+        """
+        start, end = self._starts[cand], self._starts[cand + 1]
+        return self._rows[start:end], self._positions[start:end]
+
+    def _find(self, rows, positions):
+        """
+        First position at or after positions that holds a continuing candidate (path halving on the pointers).
+        :param rows: Numpy array of ballot indices
+        :param positions: Numpy array of positions in those ballots
+        :return: Numpy array of positions, depth when the ballot has no continuing candidate left
+        """
+        current = positions
+        while True:
+            parent = self._skip[rows, current]
+            if np.array_equal(parent, current):
+                return current
+            grandparent = self._skip[rows, parent]
+            self._skip[rows, current] = grandparent
+            current = grandparent
+
+    def remove(self, cand):
+        """
+        Candidate cand stops being continuing (elected, eliminated or its group is closed).
+        :param cand: candidate code
+        """
+        rows, positions = self._occurrences(cand)
+        self._skip[rows, positions] = positions + 1
+
+    def next_preferences(self, cand):
+        """
+        Return the next continuing preference after candidate cand on every ballot ranking cand.
+        :param cand: candidate code
+        :return: list of next candidate codes, list of their counts (weighted by ballot multiplicity)
+        """
+        rows, positions = self._occurrences(cand)
+        next_positions = self._find(rows, positions + 1)
+        has_next = next_positions < self.depth
+        rows = rows[has_next]
+        next_prefs = self.ballots[rows, next_positions[has_next]]
+        next_cands, next_indx = np.unique(next_prefs, return_inverse=True)
+        pref_num = np.bincount(next_indx.ravel(), weights=self.weights[rows]).astype(np.int64)
+        return next_cands.tolist(), pref_num.tolist()
+
+
+class CompletedTransferEngine(TransferEngine):
+    """
+    TransferEngine for a LazyCompletedProfile.
+    The ranked prefixes keep per ballot pointers like TransferEngine while the shared tail keeps a single pointer array
+    for every ballot, a ballot then skips the tail candidates its prefix already ranks.
+    """
+
+    def __init__(self, profile, considered_candidates):
+        """
+        :param profile: LazyCompletedProfile of preference profile
+        :param considered_candidates: List of candidate codes that can be elected
+        """
+        super().__init__(profile, considered_candidates)
+        self.tail = profile.tail
+        self.tail_position = profile.tail_position
+        self.num_ballots = profile.num_ballots
+        # _tail_skip[t] == t while tail position t holds a continuing candidate, len(tail) marks the end
+        self._tail_skip = np.arange(len(self.tail) + 1, dtype=np.int64)
+        continuing = np.zeros(profile.num_candidates, dtype=bool)
+        continuing[considered_candidates] = True
+        stale_positions = np.flatnonzero(~continuing[self.tail])
+        self._tail_skip[stale_positions] = stale_positions + 1
+
+    def _find_tail(self, positions):
+        """
+        First tail position at or after positions that holds a continuing candidate (path halving on the pointers).
+        :param positions: Numpy array of tail positions
+        :return: Numpy array of tail positions, len(tail) when no continuing candidate is left
+        """
+        current = positions
+        while True:
+            parent = self._tail_skip[current]
+            if np.array_equal(parent, current):
+                return current
+            grandparent = self._tail_skip[parent]
+            self._tail_skip[current] = grandparent
+            current = grandparent
+
+    def _next_in_tail(self, rows, positions):
+        """
+        First continuing tail candidate at or after positions that the ballot did not rank in its prefix.
+        :param rows: Numpy array of ballot indices
+        :param positions: Numpy array of tail positions
+        :return: Numpy array of candidate codes, -1 when the ballot has no continuing candidate left
+        """
+        next_cands = np.full(len(rows), -1, dtype=np.int64)
+        pending = np.arange(len(rows))
+        positions = self._find_tail(positions)
+        while len(pending) > 0:  # at most depth + 1 rounds, each round skips one ranked candidate
+            in_tail = positions < len(self.tail)
+            pending, positions = pending[in_tail], positions[in_tail]
+            cands = self.tail[positions]
+            ranked = np.any(self.ballots[rows[pending]] == cands[:, None], axis=1)
+            next_cands[pending[~ranked]] = cands[~ranked]
+            pending = pending[ranked]
+            positions = self._find_tail(positions[ranked] + 1)
+        return next_cands
+
+    def remove(self, cand):
+        super().remove(cand)
+        position = self.tail_position[cand]
+        if position >= 0:
+            self._tail_skip[position] = position + 1
+
+    def next_preferences(self, cand):
+        # ballots ranking cand in their prefix, once the prefix runs out they continue at the start of the tail
+        rows, positions = self._occurrences(cand)
+        next_positions = self._find(rows, positions + 1)
+        has_next = next_positions < self.depth
+        next_prefs = np.full(len(rows), -1, dtype=np.int64)
+        next_prefs[has_next] = self.ballots[rows[has_next], next_positions[has_next]]
+        next_prefs[~has_next] = self._next_in_tail(rows[~has_next], np.zeros(np.count_nonzero(~has_next),
+                                                                             dtype=np.int64))
+        # every other ballot holds cand in the tail
+        position = self.tail_position[cand]
+        if position >= 0:
+            other = np.ones(self.num_ballots, dtype=bool)
+            other[rows] = False
+            other_rows = np.flatnonzero(other)
+            other_prefs = self._next_in_tail(other_rows, np.full(len(other_rows), position + 1, dtype=np.int64))
+            rows = np.concatenate([rows, other_rows])
+            next_prefs = np.concatenate([next_prefs, other_prefs])
+        has_next = next_prefs >= 0
+        rows = rows[has_next]
+        next_cands, next_indx = np.unique(next_prefs[has_next], return_inverse=True)
+        pref_num = np.bincount(next_indx.ravel(), weights=self.weights[rows]).astype(np.int64)
+        return next_cands.tolist(), pref_num.tolist()
+
+
+def transfer_engine(profile, considered_candidates):
+    """
+    Build the transfer engine that fits the profile.
+    :param profile: EncodedProfile or LazyCompletedProfile of preference profile
+    :param considered_candidates: List of candidate codes that can be elected
+    :return: TransferEngine
+    """
+    if isinstance(profile, LazyCompletedProfile):
+        return CompletedTransferEngine(profile, considered_candidates)
+    return TransferEngine(profile, considered_candidates)
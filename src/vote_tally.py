@@ -0,0 +1,174 @@
+import numpy as np
+
+
+class _IndexedHeap:
+    """
+    Binary min-heap of candidate codes that knows where every candidate sits, so a key change is O(log n).
+    """
+
+    def __init__(self, keys):
+        """
+        :param keys: Dictionary of candidate codes (keys) and their sort keys (values)
+        """
+        self.keys = dict(keys)
+        self.heap = sorted(self.keys, key=self.keys.get)  # a sorted list is a valid heap
+        self.position = {cand: i for i, cand in enumerate(self.heap)}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def _swap(self, i, j):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.position[heap[i]] = i
+        self.position[heap[j]] = j
+
+    def _sift_up(self, i):
+        keys, heap = self.keys, self.heap
+        while i > 0:
+            parent = (i - 1) // 2
+            if keys[heap[i]] < keys[heap[parent]]:
+                self._swap(i, parent)
+                i = parent
+            else:
+                break
+
+    def _sift_down(self, i):
+        keys, heap = self.keys, self.heap
+        n = len(heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and keys[heap[child]] < keys[heap[smallest]]:
+                    smallest = child
+            if smallest == i:
+                break
+            self._swap(i, smallest)
+            i = smallest
+
+    def update(self, cand, key):
+        """
+        Change the key of candidate cand.
+        """
+        old_key = self.keys[cand]
+        self.keys[cand] = key
+        if key < old_key:
+            self._sift_up(self.position[cand])
+        else:
+            self._sift_down(self.position[cand])
+
+    def remove(self, cand):
+        """
+        Remove candidate cand from the heap.
+        """
+        i = self.position.pop(cand)
+        last = self.heap.pop()
+        del self.keys[cand]
+        if i < len(self.heap):
+            self.heap[i] = last
+            self.position[last] = i
+            self._sift_up(i)
+            self._sift_down(self.position[last])
+
+    def top(self):
+        return self.heap[0]
+
+    def while_key(self, keep):
+        """
+        All candidates at the top of the heap whose key satisfies keep, in key order.
+        :param keep: Function of a key that is True for a prefix of the key order
+        :return: list of candidates
+        """
+        found = []
+        stack = [0] if len(self.heap) > 0 else []
+        while stack:
+            i = stack.pop()
+            if i < len(self.heap) and keep(self.keys[self.heap[i]]):
+                found.append(self.heap[i])
+                stack.extend((2 * i + 1, 2 * i + 2))
+        return sorted(found, key=self.keys.get)
+
+
+class VoteTally:
+    """
+    Votes per continuing candidate for STV.
+    Votes live in an array indexed by candidate code, with a min-heap keyed by (votes, tiebreak score, order) for last
+    place and a max-heap keyed by (votes, candidate) for the quota check, so neither needs the votes rebuilt each round.
+    """
+
+    def __init__(self, candidates, tiebreak_scores, num_candidates):
+        """
+        :param candidates: List of candidate codes, the order breaks ties left after the tiebreak scores
+        :param tiebreak_scores: Dictionary of candidate codes (keys) and tiebreak scores (values)
+        :param num_candidates: Number of candidate codes in the profile
+        """
+        self.votes = np.zeros(num_candidates, dtype=np.float64)
+        self.tiebreak_scores = tiebreak_scores
+        self.order = {cand: i for i, cand in enumerate(candidates)}
+        self._lowest = _IndexedHeap({cand: self._low_key(cand) for cand in candidates})
+        self._highest = _IndexedHeap({cand: self._high_key(cand) for cand in candidates})
+
+    def _low_key(self, cand):
+        return self.votes[cand], self.tiebreak_scores[cand], self.order[cand]
+
+    def _high_key(self, cand):
+        return -self.votes[cand], -cand
+
+    def __len__(self):
+        return len(self._lowest)
+
+    def __contains__(self, cand):
+        return cand in self._lowest.position
+
+    def __getitem__(self, cand):
+        if cand not in self:
+            raise KeyError(cand)
+        return self.votes[cand]
+
+    def add(self, cand, vote_num):
+        """
+        Give candidate cand vote_num more votes.
+        :param cand: candidate code
+        :param vote_num: votes
+        """
+        if cand not in self:
+            raise KeyError(cand)
+        self.votes[cand] += vote_num
+        self._lowest.update(cand, self._low_key(cand))
+        self._highest.update(cand, self._high_key(cand))
+
+    def remove(self, cand):
+        """
+        Stop counting candidate cand.
+        :param cand: candidate code
+        :return: votes held by cand
+        """
+        self._lowest.remove(cand)
+        self._highest.remove(cand)
+        return self.votes[cand]
+
+    def max_votes(self):
+        """
+        :return: largest vote count (-inf when nobody is left)
+        """
+        if len(self) == 0:
+            return -np.inf
+        return self.votes[self._highest.top()]
+
+    def reaching(self, quota):
+        """
+        Candidates with at least quota votes.
+        :param quota: droop quota
+        :return: list of candidates, most votes first (ties go to the larger candidate code)
+        """
+        return self._highest.while_key(lambda key: -key[0] >= quota)
+
+    def lowest(self):
+        """
+        Candidates tied on the fewest votes.
+        :return: list of candidates, lowest tiebreak score first and then in the order given at construction
+        """
+        if len(self) == 0:
+            raise ValueError('No candidates left to eliminate')
+        min_votes = self.votes[self._lowest.top()]
+        return self._lowest.while_key(lambda key: key[0] == min_votes)
@@ -55,6 +55,7 @@ dataset_df[candidates_col] = dataset_df[candidates_col].apply(str)
 dataset_df = pd.DataFrame(np.hstack((dataset_df.to_numpy(), folk_features.to_numpy())))
 dataset_df.rename(columns={0: candidates_col}, inplace=True)
 dataset_df.rename(columns={1: sa_col}, inplace=True)
+pool = src.CandidatePool(dataset_df, candidates_col, sa_col)  # index the candidates once for every profile below
 epira_bnds = [.9, .9, .9, .9, .9,
               .9, .81, .79, .9, .9,
               .9, .82, .9, .9, .9,
@@ -76,16 +77,19 @@ for disp in [0, .2, .4, .6, .8, 1]:
             np_profile = profile_df.to_numpy()
             candidate_ids = list(np.unique(np_profile))
             dataset_name = 'synthetic-' + str(disp)
-            ranked_grps = [dataset_df.loc[dataset_df[candidates_col] == e][sa_col].item() for e in candidate_ids]
-            profile_item_group_dict = dict(zip(candidate_ids, ranked_grps))
+            profile_item_group_dict = pool.item_group_dict(candidate_ids)
             # necessary structures
-            _, pool_group_cnt_dict, _, profile_group_cnt_dict = src.get_representation(profile_df, dataset_df,
+            _, pool_group_cnt_dict, _, profile_group_cnt_dict = src.get_representation(profile_df, pool,
                                                                                        candidates_col, sa_col)
-            pool_item_group_dict = src.get_item_group_dict(dataset_df, candidates_col, sa_col)
+            pool_item_group_dict = src.get_item_group_dict(pool, candidates_col, sa_col)
+            # encoded once so the Borda based methods (STV tiebreaks, BORDA, EPIRA, balanced committee) share one Borda count
+            profile = src.encode_profile(profile_df, candidate_ids)
+            # top of every ranking kept once for all satisfaction metrics below
+            satisfaction = src.SatisfactionProfile(profile_df)
 
             # stv
-            cr_stv = cr.single_transferable_vote(profile_df, profile_item_group_dict, k_cnt)
-            assess_item_group_dict = src.get_item_group_dict_for_ranking(cr_stv, dataset_df, candidates_col, sa_col)
+            cr_stv = cr.single_transferable_vote(profile, profile_item_group_dict, k_cnt)
+            assess_item_group_dict = src.get_item_group_dict_for_ranking(cr_stv, pool, candidates_col, sa_col)
             assess_group_cnt_dict = src.rankingdf_to_proportions(cr_stv, pool_item_group_dict)
             method.append('STV')
             dataset.append(dataset_name)
@@ -95,11 +99,12 @@ for disp in [0, .2, .4, .6, .8, 1]:
             fair_rep_values.append(src.fair_representation(pool_group_cnt_dict, assess_group_cnt_dict, fair_rep))
             NDKL_values.append(src.NDKL(cr_stv, pool_item_group_dict, 'EQUAL'))
             NDKL_ranked.append(src.NDKL(cr_stv, assess_item_group_dict, 'EQUAL'))
-            avg_sat_10.append(src.average_satisfaction_percentage(profile_df, .1, cr_stv, .1))
-            avg_sat_20.append(src.average_satisfaction_percentage(profile_df, .1, cr_stv, .2))
-            avg_sat_30.append(src.average_satisfaction_percentage(profile_df, .1, cr_stv, .3))
-            avg_sat_40.append(src.average_satisfaction_percentage(profile_df, .1, cr_stv, .4))
-            avg_sat_50.append(src.average_satisfaction_percentage(profile_df, .1, cr_stv, .5))
+            avg_sats = satisfaction.average_satisfaction_percentages(.1, cr_stv, [.1, .2, .3, .4, .5])
+            avg_sat_10.append(avg_sats[0])
+            avg_sat_20.append(avg_sats[1])
+            avg_sat_30.append(avg_sats[2])
+            avg_sat_40.append(avg_sats[3])
+            avg_sat_50.append(avg_sats[4])
             result.append(cr_stv.iloc[:, 0].values.tolist())
             pool_grp_cnts.append(pool_group_cnt_dict)
             profile_grp_cnts.append(profile_group_cnt_dict)
@@ -109,7 +114,7 @@ for disp in [0, .2, .4, .6, .8, 1]:
 
             # mc4
             cr_mc4 = cr.mc4(profile_df, k_cnt)
-            assess_item_group_dict = src.get_item_group_dict_for_ranking(cr_mc4, dataset_df, candidates_col, sa_col)
+            assess_item_group_dict = src.get_item_group_dict_for_ranking(cr_mc4, pool, candidates_col, sa_col)
             assess_group_cnt_dict = src.rankingdf_to_proportions(cr_mc4, pool_item_group_dict)
             method.append('MC4')
             dataset.append(dataset_name)
@@ -119,11 +124,12 @@ for disp in [0, .2, .4, .6, .8, 1]:
             fair_rep_values.append(src.fair_representation(pool_group_cnt_dict, assess_group_cnt_dict, fair_rep))
             NDKL_values.append(src.NDKL(cr_mc4, pool_item_group_dict, 'EQUAL'))
             NDKL_ranked.append(src.NDKL(cr_mc4, assess_item_group_dict, 'EQUAL'))
-            avg_sat_10.append(src.average_satisfaction_percentage(profile_df, .1, cr_mc4, .1))
-            avg_sat_20.append(src.average_satisfaction_percentage(profile_df, .1, cr_mc4, .2))
-            avg_sat_30.append(src.average_satisfaction_percentage(profile_df, .1, cr_mc4, .3))
-            avg_sat_40.append(src.average_satisfaction_percentage(profile_df, .1, cr_mc4, .4))
-            avg_sat_50.append(src.average_satisfaction_percentage(profile_df, .1, cr_mc4, .5))
+            avg_sats = satisfaction.average_satisfaction_percentages(.1, cr_mc4, [.1, .2, .3, .4, .5])
+            avg_sat_10.append(avg_sats[0])
+            avg_sat_20.append(avg_sats[1])
+            avg_sat_30.append(avg_sats[2])
+            avg_sat_40.append(avg_sats[3])
+            avg_sat_50.append(avg_sats[4])
             result.append(cr_mc4.iloc[:, 0].values.tolist())
             pool_grp_cnts.append(pool_group_cnt_dict)
             profile_grp_cnts.append(profile_group_cnt_dict)
@@ -132,8 +138,8 @@ for disp in [0, .2, .4, .6, .8, 1]:
             dispersion.append(disp)
 
             # borda
-            cr_borda = cr.BORDA(profile_df, candidate_ids, k_cnt)
-            assess_item_group_dict = src.get_item_group_dict_for_ranking(cr_borda, dataset_df, candidates_col, sa_col)
+            cr_borda = cr.BORDA(profile, candidate_ids, k_cnt)
+            assess_item_group_dict = src.get_item_group_dict_for_ranking(cr_borda, pool, candidates_col, sa_col)
             assess_group_cnt_dict = src.rankingdf_to_proportions(cr_borda, pool_item_group_dict)
             method.append('BORDA')
             dataset.append(dataset_name)
@@ -143,11 +149,12 @@ for disp in [0, .2, .4, .6, .8, 1]:
             fair_rep_values.append(src.fair_representation(pool_group_cnt_dict, assess_group_cnt_dict, fair_rep))
             NDKL_values.append(src.NDKL(cr_borda, pool_item_group_dict, 'EQUAL'))
             NDKL_ranked.append(src.NDKL(cr_borda, assess_item_group_dict, 'EQUAL'))
-            avg_sat_10.append(src.average_satisfaction_percentage(profile_df, .1, cr_borda, .1))
-            avg_sat_20.append(src.average_satisfaction_percentage(profile_df, .1, cr_borda, .2))
-            avg_sat_30.append(src.average_satisfaction_percentage(profile_df, .1, cr_borda, .3))
-            avg_sat_40.append(src.average_satisfaction_percentage(profile_df, .1, cr_borda, .4))
-            avg_sat_50.append(src.average_satisfaction_percentage(profile_df, .1, cr_borda, .5))
+            avg_sats = satisfaction.average_satisfaction_percentages(.1, cr_borda, [.1, .2, .3, .4, .5])
+            avg_sat_10.append(avg_sats[0])
+            avg_sat_20.append(avg_sats[1])
+            avg_sat_30.append(avg_sats[2])
+            avg_sat_40.append(avg_sats[3])
+            avg_sat_50.append(avg_sats[4])
             result.append(cr_borda.iloc[:, 0].values.tolist())
             pool_grp_cnts.append(pool_group_cnt_dict)
             profile_grp_cnts.append(profile_group_cnt_dict)
@@ -156,8 +163,8 @@ for disp in [0, .2, .4, .6, .8, 1]:
             dispersion.append(disp)
 
             # EPIRA
-            cr_epira = cr.EPIRA(profile_df, candidate_ids, profile_item_group_dict, k_cnt, epira_bnds[bnd])
-            assess_item_group_dict = src.get_item_group_dict_for_ranking(cr_epira, dataset_df, candidates_col, sa_col)
+            cr_epira = cr.EPIRA(profile, candidate_ids, profile_item_group_dict, k_cnt, epira_bnds[bnd])
+            assess_item_group_dict = src.get_item_group_dict_for_ranking(cr_epira, pool, candidates_col, sa_col)
             assess_group_cnt_dict = src.rankingdf_to_proportions(cr_epira, pool_item_group_dict)
             method.append('EPIRA')
             dataset.append(dataset_name)
@@ -167,11 +174,12 @@ for disp in [0, .2, .4, .6, .8, 1]:
             fair_rep_values.append(src.fair_representation(pool_group_cnt_dict, assess_group_cnt_dict, fair_rep))
             NDKL_values.append(src.NDKL(cr_epira, pool_item_group_dict, 'EQUAL'))
             NDKL_ranked.append(src.NDKL(cr_epira, assess_item_group_dict, 'EQUAL'))
-            avg_sat_10.append(src.average_satisfaction_percentage(profile_df, .1, cr_epira, .1))
-            avg_sat_20.append(src.average_satisfaction_percentage(profile_df, .1, cr_epira, .2))
-            avg_sat_30.append(src.average_satisfaction_percentage(profile_df, .1, cr_epira, .3))
-            avg_sat_40.append(src.average_satisfaction_percentage(profile_df, .1, cr_epira, .4))
-            avg_sat_50.append(src.average_satisfaction_percentage(profile_df, .1, cr_epira, .5))
+            avg_sats = satisfaction.average_satisfaction_percentages(.1, cr_epira, [.1, .2, .3, .4, .5])
+            avg_sat_10.append(avg_sats[0])
+            avg_sat_20.append(avg_sats[1])
+            avg_sat_30.append(avg_sats[2])
+            avg_sat_40.append(avg_sats[3])
+            avg_sat_50.append(avg_sats[4])
             result.append(cr_epira.iloc[:, 0].values.tolist())
             pool_grp_cnts.append(pool_group_cnt_dict)
             profile_grp_cnts.append(profile_group_cnt_dict)
@@ -183,48 +191,33 @@ for disp in [0, .2, .4, .6, .8, 1]:
 
 
             # RAPF
-            kl_div_pool_cr_ = []
-            kl_div_pool_profile_ = []
-            fair_rep_values_ = []
-            NDKL_values_ = []
-            NDKL_ranked_ = []
-            NDKL_ALLk_values_ = []
-            NDKL_ALLk_ranked_ = []
             fairness_exposure_ = []
-            avg_sat_10_ = []
-            avg_sat_20_ = []
-            avg_sat_30_ = []
-            avg_sat_40_ = []
-            avg_sat_50_ = []
-            full_sat_ = []
-            top_1_indx_ = []
-            sat_indx_cnt_top5_ = []
-            sat_indx_cnt_top10_ = []
+            cr_rapfs = []
             for i in range(0, 10):
                 seed = i  # for repro
                 cr_rapf = cr.RAPF(profile_df, profile_item_group_dict, k_cnt, seed)
-                assess_item_group_dict = src.get_item_group_dict_for_ranking(cr_rapf, dataset_df, candidates_col,
+                assess_item_group_dict = src.get_item_group_dict_for_ranking(cr_rapf, pool, candidates_col,
                                                                              sa_col)
-                assess_group_cnt_dict = src.rankingdf_to_proportions(cr_rapf, pool_item_group_dict)
-                kl_div_pool_cr_.append(src.KL_div_pool_assess_set(pool_group_cnt_dict, assess_group_cnt_dict, fair_rep))
-                kl_div_pool_profile_.append(
-                    src.KL_div_pool_assess_set(pool_group_cnt_dict, profile_group_cnt_dict, fair_rep))
-                fair_rep_values_.append(src.fair_representation(pool_group_cnt_dict, assess_group_cnt_dict, fair_rep))
-                NDKL_values_.append(src.NDKL(cr_rapf, pool_item_group_dict, 'EQUAL'))
-                NDKL_ranked_.append(src.NDKL(cr_rapf, assess_item_group_dict, 'EQUAL'))
-                NDKL_ALLk_values_.append(src.NDKL_allpos(cr_rapf, pool_item_group_dict, 'EQUAL'))
-                NDKL_ALLk_ranked_.append(src.NDKL_allpos(cr_rapf, assess_item_group_dict, 'EQUAL'))
                 ex, _ = frt.EXP(cr_rapf, assess_item_group_dict, 'MinMaxRatio')
                 fairness_exposure_.append(ex)
-                avg_sat_10_.append(src.average_satisfaction_percentage(profile_df, .1, cr_rapf, .1))
-                avg_sat_20_.append(src.average_satisfaction_percentage(profile_df, .1, cr_rapf, .2))
-                avg_sat_30_.append(src.average_satisfaction_percentage(profile_df, .1, cr_rapf, .3))
-                avg_sat_40_.append(src.average_satisfaction_percentage(profile_df, .1, cr_rapf, .4))
-                avg_sat_50_.append(src.average_satisfaction_percentage(profile_df, .1, cr_rapf, .5))
-                full_sat_.append(src.full_sat_index(profile_df, .1, cr_rapf))
-                top_1_indx_.append(src.full_sat_index(profile_df, 1 / k_cnt, cr_rapf))
-                sat_indx_cnt_top5_.append(src.satisfaction_index_count(profile_df, 5, cr_rapf, 5, 1))
-                sat_indx_cnt_top10_.append(src.satisfaction_index_count(profile_df, 10, cr_rapf, 10, 1))
+                cr_rapfs.append(cr_rapf)
+            # every seed is evaluated at once, the profile side of the metrics is shared
+            rapf_batch = src.ConsensusBatch(cr_rapfs, pool_item_group_dict)
+            kl_div_pool_cr_ = src.batch_KL_div_pool_assess_set(pool_group_cnt_dict, rapf_batch, fair_rep)
+            kl_div_pool_profile_ = np.repeat(
+                src.KL_div_pool_assess_set(pool_group_cnt_dict, profile_group_cnt_dict, fair_rep),
+                rapf_batch.num_rankings)
+            fair_rep_values_ = src.batch_fair_representation(pool_group_cnt_dict, rapf_batch, fair_rep)
+            NDKL_values_ = src.batch_NDKL(rapf_batch, 'EQUAL')
+            NDKL_ranked_ = src.batch_NDKL(rapf_batch, 'EQUAL', ranked_groups=True)
+            NDKL_ALLk_values_ = src.batch_NDKL_allpos(rapf_batch, 'EQUAL')
+            NDKL_ALLk_ranked_ = src.batch_NDKL_allpos(rapf_batch, 'EQUAL', ranked_groups=True)
+            avg_sat_10_, avg_sat_20_, avg_sat_30_, avg_sat_40_, avg_sat_50_ = \
+                satisfaction.batch_average_satisfaction_percentages(.1, rapf_batch, [.1, .2, .3, .4, .5])
+            full_sat_ = satisfaction.batch_full_sat_index(.1, rapf_batch)
+            top_1_indx_ = satisfaction.batch_full_sat_index(1 / k_cnt, rapf_batch)
+            sat_indx_cnt_top5_ = satisfaction.batch_satisfaction_index_count(5, rapf_batch, 5, 1)
+            sat_indx_cnt_top10_ = satisfaction.batch_satisfaction_index_count(10, rapf_batch, 10, 1)
 
             method.append('RAPF')
             dataset.append(dataset_name)
@@ -238,16 +231,17 @@ for disp in [0, .2, .4, .6, .8, 1]:
             avg_sat_30.append(np.mean(avg_sat_30_))
             avg_sat_40.append(np.mean(avg_sat_40_))
             avg_sat_50.append(np.mean(avg_sat_50_))
-            result.append(cr_rapf.iloc[:, 0].values.tolist())
+            # the row keeps the ranking of the last seed and its group counts
+            result.append(cr_rapfs[-1].iloc[:, 0].values.tolist())
             pool_grp_cnts.append(pool_group_cnt_dict)
             profile_grp_cnts.append(profile_group_cnt_dict)
-            cr_grp_cnts.append(assess_group_cnt_dict)
+            cr_grp_cnts.append(src.rankingdf_to_proportions(cr_rapfs[-1], pool_item_group_dict))
             profile_percentage.append(profile_percent)
             dispersion.append(disp)
 
             # Balanced Committee
-            cr_bce = cr.balanced_committee(profile_df, profile_item_group_dict, fair_rep, k_cnt)
-            assess_item_group_dict = src.get_item_group_dict_for_ranking(cr_bce, dataset_df, candidates_col, sa_col)
+            cr_bce = cr.balanced_committee(profile, profile_item_group_dict, fair_rep, k_cnt)
+            assess_item_group_dict = src.get_item_group_dict_for_ranking(cr_bce, pool, candidates_col, sa_col)
             assess_group_cnt_dict = src.rankingdf_to_proportions(cr_bce, pool_item_group_dict)
             method.append('BALANCED-COMMITTEE-ELECTION')
             dataset.append(dataset_name)
@@ -257,11 +251,12 @@ for disp in [0, .2, .4, .6, .8, 1]:
             fair_rep_values.append(src.fair_representation(pool_group_cnt_dict, assess_group_cnt_dict, fair_rep))
             NDKL_values.append(src.NDKL(cr_bce, pool_item_group_dict, 'EQUAL'))
             NDKL_ranked.append(src.NDKL(cr_bce, assess_item_group_dict, 'EQUAL'))
-            avg_sat_10.append(src.average_satisfaction_percentage(profile_df, .1, cr_bce, .1))
-            avg_sat_20.append(src.average_satisfaction_percentage(profile_df, .1, cr_bce, .2))
-            avg_sat_30.append(src.average_satisfaction_percentage(profile_df, .1, cr_bce, .3))
-            avg_sat_40.append(src.average_satisfaction_percentage(profile_df, .1, cr_bce, .4))
-            avg_sat_50.append(src.average_satisfaction_percentage(profile_df, .1, cr_bce, .5))
+            avg_sats = satisfaction.average_satisfaction_percentages(.1, cr_bce, [.1, .2, .3, .4, .5])
+            avg_sat_10.append(avg_sats[0])
+            avg_sat_20.append(avg_sats[1])
+            avg_sat_30.append(avg_sats[2])
+            avg_sat_40.append(avg_sats[3])
+            avg_sat_50.append(avg_sats[4])
             result.append(cr_bce.iloc[:, 0].values.tolist())
             pool_grp_cnts.append(pool_group_cnt_dict)
             profile_grp_cnts.append(profile_group_cnt_dict)
@@ -271,7 +266,7 @@ for disp in [0, .2, .4, .6, .8, 1]:
 
             # Prefair
             cr_prefair = src.preFAIR(profile_df, dataset_df, candidates_col, sa_col, fair_rep, k_cnt)
-            assess_item_group_dict = src.get_item_group_dict_for_ranking(cr_prefair, dataset_df, candidates_col, sa_col)
+            assess_item_group_dict = src.get_item_group_dict_for_ranking(cr_prefair, pool, candidates_col, sa_col)
             assess_group_cnt_dict = src.rankingdf_to_proportions(cr_prefair, pool_item_group_dict)
             method.append('PREFAIR')
             dataset.append(dataset_name)
@@ -281,11 +276,12 @@ for disp in [0, .2, .4, .6, .8, 1]:
             fair_rep_values.append(src.fair_representation(pool_group_cnt_dict, assess_group_cnt_dict, fair_rep))
             NDKL_values.append(src.NDKL(cr_prefair, pool_item_group_dict, 'EQUAL'))
             NDKL_ranked.append(src.NDKL(cr_prefair, assess_item_group_dict, 'EQUAL'))
-            avg_sat_10.append(src.average_satisfaction_percentage(profile_df, .1, cr_prefair, .1))
-            avg_sat_20.append(src.average_satisfaction_percentage(profile_df, .1, cr_prefair, .2))
-            avg_sat_30.append(src.average_satisfaction_percentage(profile_df, .1, cr_prefair, .3))
-            avg_sat_40.append(src.average_satisfaction_percentage(profile_df, .1, cr_prefair, .4))
-            avg_sat_50.append(src.average_satisfaction_percentage(profile_df, .1, cr_prefair, .5))
+            avg_sats = satisfaction.average_satisfaction_percentages(.1, cr_prefair, [.1, .2, .3, .4, .5])
+            avg_sat_10.append(avg_sats[0])
+            avg_sat_20.append(avg_sats[1])
+            avg_sat_30.append(avg_sats[2])
+            avg_sat_40.append(avg_sats[3])
+            avg_sat_50.append(avg_sats[4])
             result.append(cr_prefair.iloc[:, 0].values.tolist())
             pool_grp_cnts.append(pool_group_cnt_dict)
             profile_grp_cnts.append(profile_group_cnt_dict)
@@ -0,0 +1,78 @@
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from comparedmethods.balanced_committee import _greedy_committee, _gurobi_committee, balanced_committee
+
+
+def _instance(seed):
+    """
+    Small committee program with many tied scores, candidates in Borda order as get_borda_scores returns them.
+    :return: item_strings, group_strings, borda_scores, bound_dict, k_cnt
+    """
+    rng = np.random.default_rng(seed)
+    num_items = int(rng.integers(5, 11))
+    num_groups = int(rng.integers(2, 4))
+    groups = [int(g) for g in rng.integers(0, num_groups, num_items)]
+    scores = sorted((int(v) for v in rng.integers(0, 6, num_items)), reverse=True)
+    k_cnt = int(rng.integers(2, num_items))
+    group_sizes = {g: groups.count(g) for g in set(groups)}
+    bound_dict = {}
+    free = k_cnt
+    for g in sorted(group_sizes):
+        bound_dict[g] = int(rng.integers(0, min(group_sizes[g], free) + 1))
+        free -= bound_dict[g]
+    return [str(i) for i in range(num_items)], [str(g) for g in groups], scores, bound_dict, k_cnt
+
+
+def _total(committee, item_strings, borda_scores):
+    score = dict(zip(item_strings, borda_scores))
+    return sum(score[item] for item in committee)
+
+
+def _best_total(item_strings, group_strings, borda_scores, bound_dict, k_cnt):
+    """
+    Best total score over every committee of size k_cnt meeting the group lower bounds.
+    """
+    best = None
+    for committee in itertools.combinations(range(len(item_strings)), k_cnt):
+        groups = [group_strings[i] for i in committee]
+        if all(groups.count(str(g)) >= lb for g, lb in bound_dict.items()):
+            total = sum(borda_scores[i] for i in committee)
+            best = total if best is None else max(best, total)
+    return best
+
+
+@pytest.mark.parametrize('seed', range(60))
+def test_greedy_reaches_best_total(seed):
+    item_strings, group_strings, borda_scores, bound_dict, k_cnt = _instance(seed)
+    committee = _greedy_committee(item_strings, group_strings, borda_scores, bound_dict, k_cnt)
+    assert len(committee) == k_cnt
+    for g, lb in bound_dict.items():
+        assert sum(group_strings[item_strings.index(c)] == str(g) for c in committee) >= lb
+    assert _total(committee, item_strings, borda_scores) == _best_total(item_strings, group_strings, borda_scores,
+                                                                       bound_dict, k_cnt)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_greedy_matches_gurobi_objective(seed):
+    pytest.importorskip('gurobipy')
+    item_strings, group_strings, borda_scores, bound_dict, k_cnt = _instance(seed)
+    greedy = _greedy_committee(item_strings, group_strings, borda_scores, bound_dict, k_cnt)
+    gurobi = _gurobi_committee(item_strings, group_strings, borda_scores, bound_dict, k_cnt, lambda m, x: None)
+    assert _total(greedy, item_strings, borda_scores) == _total(gurobi, item_strings, borda_scores)
+
+
+def test_ties_follow_borda_order():
+    item_strings = ['a', 'b', 'c', 'd', 'e']
+    group_strings = ['0', '1', '0', '1', '1']
+    committee = _greedy_committee(item_strings, group_strings, [3, 3, 3, 3, 3], {0: 2, 1: 1}, 3)
+    assert committee == ['a', 'b', 'c']
+
+
+def test_balanced_committee_profile():
+    # Borda scores (4 candidates): 10: 9, 11: 6, 12: 3, 13: 0, group 1 needs one seat of two
+    profile = pd.DataFrame({voter: [10, 11, 12, 13] for voter in range(3)})
+    item_group_dict = {10: 'x', 11: 'x', 12: 'y', 13: 'y'}
+    committee = balanced_committee(profile, item_group_dict, 'EQUAL', 2)
+    assert committee.iloc[:, 0].tolist() == ['10', '12']
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from comparedmethods.vanilla_borda import BORDA
+from src.borda import borda_ranking
+from src.encoded_profile import compress_profile, encode_profile
+
+
+def _reference_borda(profile_df, candidate_ids):
+    """
+    Borda count as computed before the shared kernel: a dictionary of scores filled ranking by ranking.
+    """
+    num_rankings = len(profile_df.columns)
+    borda_scores = {key: 0 for key in candidate_ids}
+    num_items = len(candidate_ids)
+    for r in range(0, num_rankings):
+        single_ranking = profile_df[profile_df.columns[r]]
+        single_ranking = np.array(single_ranking[~pd.isnull(single_ranking)])
+        points_at_pos = list(range(num_items - 1, -1, -1))
+        for item_pos in range(0, len(single_ranking)):
+            borda_scores[single_ranking[item_pos]] += points_at_pos[item_pos]
+    ids = list(borda_scores.keys())
+    new_scores = [borda_scores[cand] for cand in ids]
+    scores, ordered_candidate_ids = zip(*sorted(zip(new_scores, ids), reverse=True))
+    return list(ordered_candidate_ids), list(scores)
+
+
+def _case(seed):
+    """
+    Profile of uneven top-k rankings (NaN padded) over a pool some candidates of which nobody ranks.
+    """
+    rng = np.random.default_rng(seed)
+    num_candidates = int(rng.integers(2, 15))
+    candidate_ids = [int(c) for c in rng.permutation(np.arange(100, 100 + num_candidates))]
+    rankings = {v: list(rng.permutation(candidate_ids)[:int(rng.integers(1, num_candidates + 1))])
+                for v in range(int(rng.integers(1, 8)))}  # few voters, so many scores tie
+    profile_df = pd.DataFrame({v: pd.Series(r, dtype=object) for v, r in rankings.items()})
+    return profile_df, candidate_ids
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_borda_matches_reference(seed):
+    profile_df, candidate_ids = _case(seed)
+    expected_ids, expected_scores = _reference_borda(profile_df, candidate_ids)
+    assert borda_ranking(profile_df, candidate_ids) == (expected_ids, expected_scores)
+    compressed = compress_profile(encode_profile(profile_df, candidate_ids))
+    assert borda_ranking(compressed, candidate_ids) == (expected_ids, expected_scores)
+    k_cnt = len(candidate_ids) // 2 + 1
+    assert BORDA(profile_df, candidate_ids, k_cnt)[0].tolist() == expected_ids[:k_cnt]
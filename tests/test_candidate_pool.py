@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.candidate_pool import CandidatePool
+
+
+def _dataset():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'id': rng.permutation(np.arange(100, 140)), 'group': rng.choice(['f', 'm', 'x'], 40),
+                         'score': rng.random(40)})
+
+
+def test_groups_match_dataframe_lookups():
+    dataset_df = _dataset()
+    pool = CandidatePool(dataset_df, 'id', 'group')
+    ids = [117, 102, 139, 100]
+    expected = {c: dataset_df.loc[dataset_df['id'] == c]['group'].item() for c in ids}
+    assert pool.item_group_dict(ids) == expected
+    assert pool.item_group_dict() == {c: dataset_df.loc[dataset_df['id'] == c]['group'].item()
+                                      for c in np.unique(dataset_df['id'].values)}
+    groups, counts = np.unique(dataset_df['group'], return_counts=True)
+    assert pool.group_cnt_dict() == dict(zip(groups, counts))
+    assert pool.group_cnt_dict(ids) == {g: sum(expected[c] == g for c in ids) for g in groups}
+
+
+def test_unknown_or_duplicate_candidates_raise():
+    dataset_df = pd.concat([_dataset(), pd.DataFrame({'id': [100], 'group': ['f'], 'score': [0.5]})])
+    pool = CandidatePool(dataset_df, 'id', 'group')
+    with pytest.raises(ValueError):
+        pool.groups_of([100])
+    with pytest.raises(ValueError):
+        pool.groups_of([999])
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.metric_helpers import rankingdf_to_proportions
+from src.metrics import (ConsensusBatch, KL_div_pool_assess_set, NDKL, NDKL_allpos, SatisfactionProfile,
+                         average_satisfaction_percentage, batch_fair_representation, batch_KL_div_pool_assess_set,
+                         batch_NDKL, batch_NDKL_allpos, fair_representation, full_sat_index,
+                         satisfaction_index_count)
+
+
+def _case(seed):
+    """
+    Pool with three groups, a profile and ten consensus rankings, some of them missing a group.
+    """
+    rng = np.random.default_rng(seed)
+    candidates = ['c' + str(i) for i in range(30)]
+    pool_item_group_dict = {c: ['f', 'm', 'x'][i % 3] for i, c in enumerate(candidates)}
+    profile_df = pd.DataFrame({v: list(rng.permutation(candidates)) for v in range(12)})
+    consensus_dfs = []
+    for r in range(10):
+        pool = [c for c in candidates if r % 4 != 0 or pool_item_group_dict[c] != 'x']
+        consensus_dfs.append(pd.DataFrame(list(rng.permutation(pool)[:int(rng.integers(3, 15))])))
+    pool_groups, pool_counts = np.unique(list(pool_item_group_dict.values()), return_counts=True)
+    pool_group_cnt_dict = dict(zip(pool_groups.tolist(), pool_counts.tolist()))
+    return profile_df, consensus_dfs, pool_item_group_dict, pool_group_cnt_dict
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('fair_rep', ['EQUAL', 'PROPORTIONAL'])
+def test_group_metrics_match_scalar(seed, fair_rep):
+    profile_df, consensus_dfs, pool_item_group_dict, pool_group_cnt_dict = _case(seed)
+    batch = ConsensusBatch(consensus_dfs, pool_item_group_dict)
+    counts = [rankingdf_to_proportions(cr, pool_item_group_dict) for cr in consensus_dfs]
+    assert [batch.group_cnt_dict(r) for r in range(batch.num_rankings)] == counts
+    np.testing.assert_allclose(batch_KL_div_pool_assess_set(pool_group_cnt_dict, batch, fair_rep),
+                               [KL_div_pool_assess_set(pool_group_cnt_dict, c, fair_rep) for c in counts],
+                               rtol=1e-12)
+    np.testing.assert_allclose(batch_fair_representation(pool_group_cnt_dict, batch, fair_rep),
+                               [fair_representation(pool_group_cnt_dict, c, fair_rep) for c in counts], rtol=1e-12)
+    ranked_dicts = [{c: pool_item_group_dict[c] for c in np.unique(cr.values)} for cr in consensus_dfs]
+    assert batch_NDKL(batch, fair_rep).tolist() == [NDKL(cr, pool_item_group_dict, fair_rep) for cr in consensus_dfs]
+    assert batch_NDKL(batch, fair_rep, ranked_groups=True).tolist() == \
+        [NDKL(cr, d, fair_rep) for cr, d in zip(consensus_dfs, ranked_dicts)]
+    assert batch_NDKL_allpos(batch, fair_rep).tolist() == \
+        [NDKL_allpos(cr, pool_item_group_dict, fair_rep) for cr in consensus_dfs]
+    assert batch_NDKL_allpos(batch, fair_rep, ranked_groups=True).tolist() == \
+        [NDKL_allpos(cr, d, fair_rep) for cr, d in zip(consensus_dfs, ranked_dicts)]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_satisfaction_matches_scalar(seed):
+    profile_df, consensus_dfs, pool_item_group_dict, _ = _case(seed)
+    satisfaction = SatisfactionProfile(profile_df)
+    batch = ConsensusBatch(consensus_dfs)
+    percentages = [.1, .2, .3, .4, .5]
+    np.testing.assert_allclose(
+        satisfaction.batch_average_satisfaction_percentages(.1, batch, percentages),
+        [[average_satisfaction_percentage(profile_df, .1, cr, p) for cr in consensus_dfs] for p in percentages],
+        rtol=1e-12)
+    assert satisfaction.batch_full_sat_index(.1, batch).tolist() == \
+        [full_sat_index(profile_df, .1, cr) for cr in consensus_dfs]
+    assert satisfaction.batch_satisfaction_index_count(5, batch, 5, 1).tolist() == \
+        [satisfaction_index_count(profile_df, 5, cr, 5, 1) for cr in consensus_dfs]
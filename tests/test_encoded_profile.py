@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from src.encoded_profile import compress_profile, encode_profile
+
+
+def _padded_int_profile():
+    # the NaN padding of v2 and v3 makes those columns float
+    return pd.DataFrame({'v1': [101, 103, 102], 'v2': [103, 101, np.nan], 'v3': [102, np.nan, np.nan],
+                         'v4': [101, 103, 102]})
+
+
+def _same_rankings(df_a, df_b):
+    assert list(df_a.columns) == list(df_b.columns)
+    for col in df_a.columns:
+        assert df_a[col].dropna().tolist() == df_b[col].dropna().tolist()
+
+
+def test_int_ids_with_nan_padding_keep_their_objects():
+    pool = {101: 'f', 102: 'm', 103: 'f', 104: 'm'}
+    profile = encode_profile(_padded_int_profile(), pool.keys())
+    decoded = profile.decode(range(profile.num_candidates))
+    assert decoded == [101, 102, 103, 104]
+    assert all(type(c) is int for c in decoded)
+    assert [pool[c] for c in decoded] == ['f', 'm', 'f', 'm']
+    assert profile.ballots.tolist() == [[0, 2, 1], [2, 0, -1], [1, -1, -1], [0, 2, 1]]
+
+
+def test_int_ids_without_pool_decode_as_int():
+    profile = encode_profile(_padded_int_profile())
+    assert all(type(c) is int for c in profile.decode(range(profile.num_candidates)))
+
+
+def test_round_trip():
+    df = _padded_int_profile()
+    _same_rankings(encode_profile(df).to_dataframe(), df)
+    str_df = pd.DataFrame({'a': ['x', 'z', 'y'], 'b': ['y', np.nan, np.nan]})
+    _same_rankings(encode_profile(str_df).to_dataframe(), str_df)
+
+
+def test_compress_round_trip():
+    df = _padded_int_profile()
+    profile = encode_profile(df)
+    compressed = compress_profile(profile)
+    assert compressed.num_ballots == 3
+    assert compressed.num_rankings == profile.num_rankings == 4
+    expanded = np.repeat(compressed.ballots, compressed.weights, axis=0)
+    assert sorted(map(tuple, expanded.tolist())) == sorted(map(tuple, profile.ballots.tolist()))
+    assert list(compressed.decode(range(compressed.num_candidates))) == [101, 102, 103]
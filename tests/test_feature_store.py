@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sklearn.metrics
+from src.feature_store import feature_store
+
+
+def _dataset(seed):
+    rng = np.random.default_rng(seed)
+    num_candidates = int(rng.integers(2, 30))
+    features = rng.random((num_candidates, 4)) * rng.integers(1, 100, 4)  # uneven feature scales
+    dataset_df = pd.DataFrame(features, columns=['f0', 'f1', 'f2', 'f3'])
+    dataset_df.insert(0, 'id', ['c' + str(c) for c in rng.permutation(num_candidates)])
+    return rng, dataset_df, features
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_store_matches_float64_features(seed, dtype):
+    rng, dataset_df, features = _dataset(seed)
+    store = feature_store(dataset_df, 'id', dtype)
+    assert store.unit_features.dtype == dtype
+    assert store.candidate_ids.tolist() == dataset_df['id'].tolist()
+    rtol = 1e-5 if dtype == np.float32 else 1e-12
+    rows = rng.random((6, len(features))) < 0.5
+    np.testing.assert_allclose(store.feature_sums(rows), rows.astype(np.float64) @ features, rtol=rtol)
+    queries = rng.random((3, features.shape[1]))
+    np.testing.assert_allclose(store.similarity(queries), sklearn.metrics.pairwise.cosine_similarity(queries, features),
+                               rtol=rtol)
+    assert feature_store(store, 'id') is store
+
+
+def test_invalid_features_are_rejected():
+    _, dataset_df, _ = _dataset(0)
+    with pytest.raises(ValueError, match='numeric'):
+        feature_store(dataset_df.assign(f1='x'), 'id')
+    with pytest.raises(ValueError, match='NaN'):
+        feature_store(dataset_df.assign(f1=np.nan), 'id')
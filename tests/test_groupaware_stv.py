@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.encoded_profile import compress_profile, encode_profile
+from src.groupaware_stv import group_aware_single_transferable_vote
+
+# Rankings the dictionary-based count (before the transfer engine) elected on _case(seed)
+_REFERENCE_ELECTED = {
+    0: [15, 13, 21, 18, 12, 10, 17],
+    1: [15, 13, 10, 17, 14, 12, 11],
+    2: [15, 19, 17, 10, 13, 20, 11],
+    3: [14, 12, 19, 11, 17, 21, 20, 10, 18, 13],
+    4: [18, 17, 13, 10, 14, 11, 12, 16, 19],
+    5: [17, 12, 10, 13],
+    6: [12, 16, 14],
+    7: [22, 19, 13, 20, 15, 12, 17, 10, 11],
+    8: [18, 16, 15, 19, 13, 14, 10, 20, 12],
+    9: [17, 15, 16, 11, 13, 12],
+    10: [20, 12, 11, 16, 18, 17, 10],
+    11: [13, 10, 12],
+}
+
+
+def _case(seed):
+    """
+    Top-k profile (k may be every candidate) with up to three groups and a seat count per group.
+    """
+    rng = np.random.default_rng(seed)
+    num_candidates = int(rng.integers(4, 14))
+    ids = [int(c) for c in rng.permutation(np.arange(10, 10 + num_candidates))]
+    depth = int(rng.integers(1, num_candidates + 1))
+    profile_df = pd.DataFrame({v: list(rng.permutation(ids)[:depth]) for v in range(int(rng.integers(1, 25)))})
+    item_group_dict = {c: int(rng.integers(0, 3)) for c in ids}
+    group_sizes = pd.Series(list(item_group_dict.values())).value_counts()
+    group_constraints = {grp: int(rng.integers(1, size + 1)) for grp, size in group_sizes.items()}
+    return profile_df, item_group_dict, group_constraints
+
+
+@pytest.mark.parametrize('seed', sorted(_REFERENCE_ELECTED))
+def test_stv_matches_reference_count(seed):
+    profile_df, item_group_dict, group_constraints = _case(seed)
+    elected = group_aware_single_transferable_vote(profile_df, item_group_dict, group_constraints)
+    assert [int(c) for c in elected] == _REFERENCE_ELECTED[seed]
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_stv_on_compressed_profile_matches_uncompressed(seed):
+    _, item_group_dict, group_constraints = _case(seed)
+    rng = np.random.default_rng(seed)
+    # a few distinct ballots repeated many times, so the weights decide the count
+    ids = list(item_group_dict.keys())
+    depth = int(rng.integers(1, len(ids) + 1))
+    ballots = [list(rng.permutation(ids)[:depth]) for _ in range(int(rng.integers(1, 5)))]
+    profile_df = pd.DataFrame({v: ballots[int(rng.integers(len(ballots)))] for v in range(int(rng.integers(1, 40)))})
+    compressed = compress_profile(encode_profile(profile_df, ids))
+    assert compressed.num_ballots <= len(ballots)
+    # the count consumes the constraints, every run gets its own copy
+    assert (group_aware_single_transferable_vote(compressed, item_group_dict, dict(group_constraints))
+            == group_aware_single_transferable_vote(profile_df, item_group_dict, dict(group_constraints)))
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sklearn.cluster
+import sklearn.metrics
+from src.encoded_profile import compress_profile, encode_profile
+from src.imputation import PersonalizedImputer, SimilarityImputer, _imputate_candidates
+
+
+def _reference_imputate_candidates(profile_df, dataset_df, candidates_col):
+    """
+    Imputation as computed before the centroid and the similarity order were fitted once per pool.
+    """
+    profile_dict = {}
+    num_unique_rankings = len(profile_df.columns)
+    profile_df = profile_df.dropna()
+    for r in range(0, num_unique_rankings):
+        candidates_ranked = list(pd.DataFrame(profile_df.iloc[:, r]).to_numpy().flatten())
+        unranked_set_df = dataset_df[~dataset_df[candidates_col].isin(candidates_ranked)]
+        unranked_data = unranked_set_df.drop(columns=[candidates_col])
+        fit_data = dataset_df.drop(columns=[candidates_col])
+        centroid = sklearn.cluster.KMeans(n_clusters=1, init='k-means++', random_state=0).fit(fit_data).cluster_centers_
+        sim = sklearn.metrics.pairwise.cosine_similarity(centroid, unranked_data.to_numpy(), dense_output=True)
+        unranked_set_df = unranked_set_df.assign(Sim=sim.flatten().tolist())[[candidates_col, 'Sim']]
+        unranked_set_df = unranked_set_df.sort_values(by=['Sim'], ascending=False)
+        profile_dict[list(profile_df.columns)[r]] = candidates_ranked + unranked_set_df[candidates_col].values.tolist()
+    return pd.DataFrame(profile_dict)
+
+
+def _case(seed, ties=False):
+    """
+    Candidate dataset with numeric features (ties: several candidates share a feature row) and a top-k profile.
+    """
+    rng = np.random.default_rng(seed)
+    num_candidates = int(rng.integers(8, 25))
+    features = rng.random((num_candidates, 3))
+    if ties:
+        features[1::3] = features[0]
+    dataset_df = pd.DataFrame({'id': list(rng.permutation(np.arange(200, 200 + num_candidates))),
+                               'f0': features[:, 0], 'f1': features[:, 1], 'f2': features[:, 2]})
+    depth = int(rng.integers(1, num_candidates // 2))
+    profile_df = pd.DataFrame({v: list(rng.permutation(dataset_df['id'].values)[:depth])
+                               for v in range(int(rng.integers(1, 8)))})
+    return profile_df, dataset_df
+
+
+@pytest.mark.parametrize('seed', range(15))
+@pytest.mark.parametrize('ties', [False, True])
+def test_pool_imputation_matches_reference(seed, ties):
+    profile_df, dataset_df = _case(seed, ties)
+    expected = _reference_imputate_candidates(profile_df, dataset_df, 'id')
+    assert _imputate_candidates(profile_df, dataset_df, 'id').equals(expected)
+    imputer = SimilarityImputer(dataset_df, 'id')
+    for col in profile_df.columns:
+        assert imputer.complete(profile_df[col].tolist()) == expected[col].tolist()
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('ties', [False, True])
+def test_batch_imputation_matches_reference(seed, ties):
+    profile_df, dataset_df = _case(seed, ties)
+    expected = _reference_imputate_candidates(profile_df, dataset_df, 'id')
+    completed = SimilarityImputer(dataset_df, 'id').complete_profile(encode_profile(profile_df, dataset_df['id']))
+    assert completed.to_dataframe().equals(expected.astype(object))
+    compressed = compress_profile(encode_profile(profile_df, dataset_df['id']))
+    completed = SimilarityImputer(dataset_df, 'id').complete_profile(compressed)
+    assert completed.weights.tolist() == compressed.weights.tolist()
+    for col in completed.voters:
+        assert completed.to_dataframe()[col].tolist() == expected[col].tolist()
+
+
+def _naive_personalized(candidates_ranked, dataset_df, candidates_col):
+    """
+    Personalized completion of one ranking: the unranked candidates by cosine similarity to the mean features of the
+    ranked ones (of the whole pool when none is ranked), ties keep the pool order.
+    """
+    features = dataset_df.drop(columns=[candidates_col]).to_numpy(dtype=np.float64)
+    ranked = dataset_df[candidates_col].isin(candidates_ranked).to_numpy()
+    centroid = features[ranked].mean(axis=0) if np.any(ranked) else features.mean(axis=0)
+    sim = sklearn.metrics.pairwise.cosine_similarity(centroid[None, :], features[~ranked])[0]
+    unranked_ids = dataset_df[candidates_col].to_numpy()[~ranked]
+    return candidates_ranked + unranked_ids[np.argsort(-sim, kind='stable')].tolist()
+
+
+@pytest.mark.parametrize('seed', range(15))
+def test_personalized_imputation_matches_naive(seed):
+    profile_df, dataset_df = _case(seed)
+    imputer = PersonalizedImputer(dataset_df, 'id', batch_size=3)  # several batches
+    completed = imputer.complete_profile(encode_profile(profile_df, dataset_df['id'])).to_dataframe()
+    for col in profile_df.columns:
+        expected = _naive_personalized(profile_df[col].tolist(), dataset_df, 'id')
+        assert imputer.complete(profile_df[col].tolist()) == expected
+        assert completed[col].tolist() == expected
+    assert imputer.complete([]) == _naive_personalized([], dataset_df, 'id')
@@ -0,0 +1,66 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from src.encoded_profile import compress_profile, encode_profile
+from src.imputation import imputer_for
+from src.imputation_cache import ImputationCache
+
+
+def _case(seed):
+    """
+    Candidate dataset with distinct numeric features and a top-k profile over it.
+    """
+    rng = np.random.default_rng(seed)
+    num_candidates = int(rng.integers(5, 20))
+    features = rng.random((num_candidates, 3))
+    dataset_df = pd.DataFrame({'id': list(rng.permutation(np.arange(100, 100 + num_candidates))),
+                               'f0': features[:, 0], 'f1': features[:, 1], 'f2': features[:, 2]})
+    depth = int(rng.integers(1, num_candidates))
+    profile_df = pd.DataFrame({v: list(rng.permutation(dataset_df['id'].values)[:depth])
+                               for v in range(int(rng.integers(1, 8)))})
+    return profile_df, dataset_df
+
+
+def _assert_same_profile(profile_a, profile_b):
+    assert profile_a.ballots.tolist() == profile_b.ballots.tolist()
+    assert profile_a.candidate_ids.tolist() == profile_b.candidate_ids.tolist()
+    assert profile_a.voters == profile_b.voters
+    assert profile_a.weights.tolist() == profile_b.weights.tolist()
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('imputation', ['POOL', 'PERSONALIZED'])
+def test_cached_profile_matches_imputer(tmp_path, seed, imputation):
+    profile_df, dataset_df = _case(seed)
+    profile = compress_profile(encode_profile(profile_df, dataset_df['id']))
+    expected = imputer_for(imputation, dataset_df, 'id').complete_profile(profile)
+    cache = ImputationCache(str(tmp_path))
+    _assert_same_profile(cache.complete_profile(profile, dataset_df, 'id', imputation), expected)
+    _assert_same_profile(cache.complete_profile(profile, dataset_df, 'id', imputation), expected)
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+def test_changed_inputs_select_a_new_entry(tmp_path):
+    profile_df, dataset_df = _case(0)
+    cache = ImputationCache(str(tmp_path))
+    cache.complete_profile(profile_df, dataset_df, 'id')
+    changed_df = dataset_df.assign(f0=dataset_df['f0'][::-1].to_numpy())
+    expected = imputer_for('POOL', changed_df, 'id').complete_profile(encode_profile(profile_df, changed_df['id']))
+    _assert_same_profile(cache.complete_profile(profile_df, changed_df, 'id'), expected)
+    cache.complete_profile(profile_df.iloc[:-1], dataset_df, 'id')
+    cache.complete_profile(profile_df, dataset_df, 'id', 'PERSONALIZED')
+    assert (cache.misses, cache.hits) == (4, 0)
+
+
+def test_truncated_entry_is_recomputed(tmp_path):
+    profile_df, dataset_df = _case(1)
+    cache = ImputationCache(str(tmp_path))
+    expected = cache.complete_profile(profile_df, dataset_df, 'id')
+    for name in os.listdir(str(tmp_path)):
+        with open(os.path.join(str(tmp_path), name), 'wb') as f:
+            f.write(b'\x93NUMPY')
+    _assert_same_profile(cache.complete_profile(profile_df, dataset_df, 'id'), expected)
+    assert (cache.misses, cache.hits) == (2, 0)
+    cache.clear()
+    assert os.listdir(str(tmp_path)) == []
@@ -0,0 +1,93 @@
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from src.kendall_tau import (inversions, kendall_tau_distance, kendall_tau_distances, kendall_tau_matrix,
+                             random_completion_distances)
+
+
+def _naive_inversions(values):
+    return sum(1 for i, j in itertools.combinations(range(len(values)), 2) if values[i] > values[j])
+
+
+def _naive_distance(rank_a, rank_b):
+    common = [c for c in rank_b if c in rank_a]
+    return sum(1 for x, y in itertools.combinations(common, 2) if rank_a.index(x) > rank_a.index(y))
+
+
+def _random_rankings(rng, num_rankings, num_candidates):
+    rankings = []
+    for _ in range(num_rankings):
+        length = int(rng.integers(0, num_candidates + 1))
+        rankings.append(['c' + str(c) for c in rng.permutation(num_candidates)[:length]])
+    return rankings
+
+
+def _profile(rankings, depth):
+    return pd.DataFrame({v: ranking + [np.nan] * (depth - len(ranking)) for v, ranking in enumerate(rankings)})
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_inversions_with_ties_and_uneven_lengths(seed):
+    rng = np.random.default_rng(seed)
+    width = int(rng.integers(1, 40))
+    values = rng.integers(0, 6, (15, width))  # few distinct values, many ties
+    lengths = rng.integers(0, width + 1, 15)
+    expected = [_naive_inversions(row[:length].tolist()) for row, length in zip(values, lengths)]
+    assert inversions(values, lengths).tolist() == expected
+    assert inversions(values).tolist() == [_naive_inversions(row.tolist()) for row in values]
+
+
+def test_inversions_edge_cases():
+    assert inversions(np.zeros((3, 0), dtype=np.int64)).tolist() == [0, 0, 0]
+    assert inversions([[2, 2, 2]]).tolist() == [0]
+    assert inversions([[3, 2, 1, 0]]).tolist() == [6]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_distances_match_naive(seed):
+    rng = np.random.default_rng(seed)
+    num_candidates = int(rng.integers(2, 20))
+    rankings_a = _random_rankings(rng, 8, num_candidates)
+    rankings_b = _random_rankings(rng, 6, num_candidates)
+    expected = [[_naive_distance(a, b) for b in rankings_b] for a in rankings_a]
+    profile_a, profile_b = _profile(rankings_a, num_candidates), _profile(rankings_b, num_candidates)
+    assert kendall_tau_matrix(profile_a, profile_b, block_size=7).tolist() == expected
+    assert kendall_tau_distances(profile_a.iloc[:, :6], profile_b).tolist() == [expected[i][i] for i in range(6)]
+    assert [kendall_tau_distance(a, b) for a, b in zip(rankings_a, rankings_b)] == \
+        [expected[i][i] for i in range(6)]
+
+
+def _reference_random_completion_distances(rankings, pool_ids, known_rankings, num_trials, seed):
+    """
+    Random completions built one ranking at a time: trial t shuffles every ranking's unranked pool candidates by the
+    keys of its own Generator (one key per voter and candidate code, codes in sorted id order).
+    """
+    codes = {c: i for i, c in enumerate(sorted(set(pool_ids).union(*rankings, *known_rankings)))}
+    streams = np.random.SeedSequence(seed).spawn(num_trials)
+    averages = []
+    for t in range(num_trials):
+        keys = np.random.default_rng(streams[t]).random((len(rankings), len(codes)))
+        distances = []
+        for v, (ranking, known) in enumerate(zip(rankings, known_rankings)):
+            unranked = [c for c in pool_ids if c not in ranking]
+            completed = ranking + sorted(unranked, key=lambda c: keys[v, codes[c]])
+            distances.append(_naive_distance(completed, known))
+        averages.append(np.mean(distances))
+    return averages
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_random_completion_distances_match_reference(seed):
+    rng = np.random.default_rng(seed)
+    num_candidates = int(rng.integers(2, 15))
+    pool_ids = ['c' + str(c) for c in rng.permutation(num_candidates)]
+    known_rankings = [list(rng.permutation(pool_ids)) for _ in range(int(rng.integers(1, 6)))]
+    rankings = [known[:int(rng.integers(0, num_candidates + 1))] for known in known_rankings]  # ragged top-k
+    expected = _reference_random_completion_distances(rankings, pool_ids, known_rankings, 12, seed)
+    profile, known_profile = _profile(rankings, num_candidates), _profile(known_rankings, num_candidates)
+    for block_size in [1, 5, 4096]:  # a trial's result does not depend on how trials are blocked
+        np.testing.assert_allclose(random_completion_distances(profile, pool_ids, known_profile, num_trials=12,
+                                                               seed=seed, block_size=block_size), expected)
+    np.testing.assert_allclose(random_completion_distances(profile, pool_ids, known_profile, num_trials=5, seed=seed),
+                               expected[:5])
@@ -0,0 +1,43 @@
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from comparedmethods.mc4 import markov_chain_stationary, mc4
+
+
+def _unanimous_profile():
+    """
+    Four voters ranking a > b > c. MC4 stays at a, moves from b to a and from c to a or b, each with probability 1/3.
+    With the ergodic jump (alpha = 1/7) the stationary distribution is (7/9, 7/45, 1/15).
+    """
+    return pd.DataFrame({voter: ['a', 'b', 'c'] for voter in range(4)})
+
+
+@pytest.mark.parametrize('solver', ['power', 'direct', 'eigs'])
+def test_mc4_known_stationary_distribution(solver):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        stationary, _, residual = markov_chain_stationary(_unanimous_profile(), 'MC4', solver)
+    np.testing.assert_allclose(stationary, [7 / 9, 7 / 45, 1 / 15], atol=1e-6)
+    assert residual < 1e-6
+
+
+def test_mc4_ranking():
+    assert mc4(_unanimous_profile(), 3).iloc[:, 0].tolist() == ['a', 'b', 'c']
+
+
+@pytest.mark.parametrize('method', ['MC1', 'MC2', 'MC3', 'MC4'])
+@pytest.mark.parametrize('solver', ['power', 'direct', 'eigs'])
+def test_no_warning_when_converged(method, solver):
+    rng = np.random.default_rng(3)
+    profile = pd.DataFrame({voter: list(rng.permutation(30)) for voter in range(40)})
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        markov_chain_stationary(profile, method, solver)
+
+
+def test_warning_when_not_converged():
+    rng = np.random.default_rng(3)
+    profile = pd.DataFrame({voter: list(rng.permutation(30)) for voter in range(40)})
+    with pytest.warns(RuntimeWarning, match='did not converge'):
+        markov_chain_stationary(profile, 'MC4', 'power', iterations=2)
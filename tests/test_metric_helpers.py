@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.encoded_profile import compress_profile
+from src.metric_helpers import rankingdf_to_proportions
+
+
+def _reference_rankingdf_to_proportions(ranking_df, item_group_dict):
+    """
+    Group counts as computed before the rankings were encoded.
+    """
+    candidates = []
+    for r in range(0, len(ranking_df.columns)):
+        single_ranking = ranking_df[ranking_df.columns[r]]
+        candidates = candidates + np.array(single_ranking[~pd.isnull(single_ranking)]).tolist()
+    groups_of_df = [item_group_dict[c] for c in np.unique(candidates)]
+    grps, grp_count = np.unique(groups_of_df, return_counts=True)
+    return dict(zip(grps.tolist(), grp_count.tolist()))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_group_counts_match_reference(seed):
+    rng = np.random.default_rng(seed)
+    candidates = list(range(100, 100 + int(rng.integers(5, 30))))
+    item_group_dict = {c: str(rng.integers(0, 3)) for c in candidates}
+    rankings = {}
+    for v in range(int(rng.integers(1, 10))):
+        length = int(rng.integers(1, len(candidates) + 1))
+        rankings[v] = list(rng.permutation(candidates)[:length]) + [np.nan] * (len(candidates) - length)
+    profile_df = pd.DataFrame(rankings)
+    expected = _reference_rankingdf_to_proportions(profile_df, item_group_dict)
+    assert rankingdf_to_proportions(profile_df, item_group_dict) == expected
+    assert rankingdf_to_proportions(compress_profile(profile_df), item_group_dict) == expected
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.metrics import NDKL, NDKL_allpos
+
+
+def _kl_divergence(p, q):
+    epsilon = 0.0000001
+    p = p + epsilon
+    q = q + epsilon
+    return np.sum(p * np.log(p / q))
+
+
+def _distributions(ranking, num_groups):
+    return np.array([((ranking == i).sum()) / len(ranking) for i in range(0, num_groups)])
+
+
+def _Z_Vector(k):
+    return 1 / np.log2(np.array(range(0, k)) + 2)
+
+
+def _group_ids(ranking_df, item_group_dict):
+    single_ranking = ranking_df[ranking_df.columns[0]]
+    single_ranking = np.array(single_ranking[~pd.isnull(single_ranking)])
+    unique_grps = np.unique(list(item_group_dict.values()))
+    group_ids = np.asarray([np.argwhere(unique_grps == item_group_dict[c])[0, 0] for c in single_ranking])
+    all_group_ids = np.asarray([np.argwhere(unique_grps == g)[0, 0] for g in item_group_dict.values()])
+    return group_ids, all_group_ids, len(unique_grps)
+
+
+def _desired(all_group_ids, num_groups, fair_rep):
+    if fair_rep == 'PROPORTIONAL':
+        return _distributions(all_group_ids, num_groups)
+    return np.tile((1/(num_groups)), num_groups)
+
+
+def _reference_NDKL(ranking_df, item_group_dict, fair_rep):
+    """
+    NDKL as computed before the prefix distributions came from cumulative counts.
+    """
+    group_ids, all_group_ids, num_groups = _group_ids(ranking_df, item_group_dict)
+    num_items = len(group_ids)
+    dr = _desired(all_group_ids, num_groups, fair_rep)
+    chunks = list(range(num_groups, num_items + num_groups, num_groups))
+    Z = _Z_Vector(len(chunks))
+    vals = []
+    for ind in range(0, len(chunks)):
+        P = _distributions(group_ids[0:chunks[ind]], num_groups)
+        vals.append(Z[ind]*_kl_divergence(P, dr))
+    return (1 / np.sum(Z)) * np.sum(vals)
+
+
+def _reference_NDKL_allpos(ranking_df, item_group_dict, fair_rep):
+    group_ids, all_group_ids, num_groups = _group_ids(ranking_df, item_group_dict)
+    num_items = len(group_ids)
+    dr = _desired(all_group_ids, num_groups, fair_rep)
+    Z = _Z_Vector(num_items)
+    return (1 / np.sum(Z)) * np.sum(
+        [Z[i] * _kl_divergence(_distributions(group_ids[0: i + 1], num_groups), dr) for i in range(0, num_items)])
+
+
+@pytest.mark.parametrize('seed', range(30))
+@pytest.mark.parametrize('fair_rep', ['EQUAL', 'PROPORTIONAL'])
+def test_ndkl_matches_reference_exactly(seed, fair_rep):
+    rng = np.random.default_rng(seed)
+    num_items = int(rng.integers(3, 60))
+    item_group_dict = {'c' + str(i): str(g) for i, g in enumerate(rng.integers(0, int(rng.integers(2, 5)), num_items))}
+    length = int(rng.integers(1, num_items + 1))
+    ranking = list(rng.permutation(list(item_group_dict))[:length])
+    ranking_df = pd.DataFrame(ranking + [np.nan] * int(rng.integers(0, 3)))
+    assert NDKL(ranking_df, item_group_dict, fair_rep) == _reference_NDKL(ranking_df, item_group_dict, fair_rep)
+    assert NDKL_allpos(ranking_df, item_group_dict, fair_rep) == \
+        _reference_NDKL_allpos(ranking_df, item_group_dict, fair_rep)
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+from comparedmethods.copeland import copeland
+from comparedmethods.mc4 import fill_transition_matrix_mc4
+from comparedmethods.precedence import get_voter_item_count, pairwise_majority, precedence_counts, PairwiseMajority
+
+
+def _reference_fill_transition_matrix_mc4(df, items, item_key_dict):
+    """
+    MC4 transitions as computed before the precedence counts: a scan of the profile per candidate pair.
+    """
+    matrix = np.zeros((items, items))
+    df_np = df.to_numpy()
+    for a in item_key_dict:
+        for b in item_key_dict:
+            if a != b:
+                rank_both = np.count_nonzero(np.bitwise_or(df_np == a, df_np == b), axis=0) == 2
+                pref_both = df_np[:, rank_both]
+                ab_compared_in = np.count_nonzero(rank_both)
+                a_over_b_count = 0
+                for i in range(ab_compared_in):
+                    a_over_b_count += np.count_nonzero(np.where(pref_both[:, i] == a)[0]
+                                                       < np.where(pref_both[:, i] == b)[0])
+                if ab_compared_in > 0 and a_over_b_count / ab_compared_in >= 0.5:
+                    matrix[item_key_dict[b], item_key_dict[a]] = 1
+    return matrix
+
+
+def _naive_precedence_counts(df, item_key_dict):
+    """
+    above[a, b]: voters ranking a above b, both[a, b]: voters ranking a and b, one voter and pair at a time.
+    """
+    items = len(item_key_dict)
+    above = np.zeros((items, items), dtype=np.int64)
+    both = np.zeros((items, items), dtype=np.int64)
+    for col in df.columns:
+        ranking = df[col].dropna().tolist()
+        for a in item_key_dict:
+            for b in item_key_dict:
+                if a in ranking and b in ranking:
+                    both[item_key_dict[a], item_key_dict[b]] += 1
+                    above[item_key_dict[a], item_key_dict[b]] += ranking.index(a) < ranking.index(b)
+    return above, both
+
+
+def _case(seed):
+    """
+    Uneven top-k profile (NaN padded) over string or int candidates, with few voters so majorities tie.
+    """
+    rng = np.random.default_rng(seed)
+    num_candidates = int(rng.integers(2, 12))
+    candidates = list(rng.permutation(num_candidates))
+    if seed % 2:
+        candidates = ['c' + str(c) for c in candidates]
+    rankings = {v: list(rng.permutation(candidates)[:int(rng.integers(1, num_candidates + 1))])
+                for v in range(int(rng.integers(1, 7)))}
+    return pd.DataFrame({v: pd.Series(r, dtype=object) for v, r in rankings.items()})
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_precedence_counts_match_naive(seed):
+    profile_df = _case(seed)
+    _, items, item_key_dict = get_voter_item_count(profile_df)
+    expected_above, expected_both = _naive_precedence_counts(profile_df, item_key_dict)
+    for block_size in [1, 7, 2 ** 24]:  # one candidate per block up to a single block
+        above, both = precedence_counts(profile_df, item_key_dict, block_size)
+        assert above.tolist() == expected_above.tolist()
+        assert both.tolist() == expected_both.tolist()
+    assert (fill_transition_matrix_mc4(profile_df, items, item_key_dict).tolist()
+            == _reference_fill_transition_matrix_mc4(profile_df, items, item_key_dict).tolist())
+
+
+def _naive_transition_matrix(df, item_key_dict, method):
+    """
+    Off-diagonal MC1-MC3 transitions of Dwork et al. straight from the definitions, one voter at a time.
+    """
+    items = len(item_key_dict)
+    rankings = [df[col].dropna().tolist() for col in df.columns]
+    matrix = np.zeros((items, items))
+    for a in item_key_dict:
+        voters_a = [r for r in rankings if a in r]
+        higher = [b for b in item_key_dict if any(b in r and r.index(b) < r.index(a) for r in voters_a)]
+        for b in item_key_dict:
+            if method == 'MC1':
+                matrix[item_key_dict[a], item_key_dict[b]] = (b in higher) / (len(higher) + 1)
+            elif voters_a:
+                # MC2: uniform over the candidates ranked at least as high, MC3: uniform over the voter's list
+                matrix[item_key_dict[a], item_key_dict[b]] = sum(
+                    (1 / (r.index(a) + 1) if method == 'MC2' else 1 / len(r))
+                    for r in voters_a if b in r and r.index(b) < r.index(a)) / len(voters_a)
+    return matrix
+
+
+def _naive_copeland_order(df, item_key_dict):
+    """
+    Candidates by pairwise majority wins plus half of the ties, among voters ranking both, stable on item_key order.
+    """
+    above, both = _naive_precedence_counts(df, item_key_dict)
+    scores = {}
+    for a, i in item_key_dict.items():
+        scores[a] = sum(1.0 if 2 * above[i, j] > both[i, j] else 0.5 if 2 * above[i, j] == both[i, j] else 0.0
+                        for b, j in item_key_dict.items() if b != a and both[i, j] > 0)
+    return sorted(item_key_dict, key=lambda a: -scores[a])
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_pairwise_methods_match_definitions(seed):
+    profile_df = _case(seed)
+    _, _, item_key_dict = get_voter_item_count(profile_df)
+    majority = PairwiseMajority(profile_df, item_key_dict, block_size=5)
+    for method in ['MC1', 'MC2', 'MC3']:
+        np.testing.assert_allclose(majority.transition_matrix(method),
+                                   _naive_transition_matrix(profile_df, item_key_dict, method), atol=1e-12)
+    assert copeland(majority, len(item_key_dict))[0].tolist() == _naive_copeland_order(profile_df, item_key_dict)
+    # a cache is reused as is, a profile builds its own
+    assert pairwise_majority(majority) is majority
+    assert copeland(profile_df, 3)[0].tolist() == _naive_copeland_order(profile_df, item_key_dict)[:3]
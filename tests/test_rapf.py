@@ -0,0 +1,84 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from comparedmethods.rapf import RAPF, RAPFBatch, fair_reranking, rank_ranges
+
+
+def _networkx_fair_reranking(single_ranking, group):
+    """
+    Fair re-ranking of the original RAPF implementation, a minimum weight full matching on a networkx graph.
+    """
+    nx = pytest.importorskip('networkx')
+    numberOfItem = len(single_ranking)
+    grpCount = {g: group.count(g) for g in group}
+    seen = {}
+    B = nx.Graph()
+    B.add_nodes_from(list(single_ranking), bipartite=0)
+    B.add_nodes_from([str(j) for j in range(1, numberOfItem + 1)], bipartite=1)
+    for item, g in zip(single_ranking, group):
+        seen[g] = seen.get(g, 0) + 1
+        r1 = math.floor((seen[g] - 1) * numberOfItem / grpCount[g]) + 1
+        r2 = min(math.ceil(seen[g] * numberOfItem / grpCount[g]), numberOfItem)
+        for j in range(1, numberOfItem + 1):
+            B.add_edge(item, str(j), weight=abs(item - j) if r1 <= j <= r2 else 100000000000)
+    matching = nx.algorithms.bipartite.minimum_weight_full_matching(B, list(single_ranking), 'weight')
+    ranking = np.zeros(numberOfItem, dtype=int)
+    for item in single_ranking:
+        ranking[int(matching[item]) - 1] = item
+    return ranking
+
+
+def _cost(ranking, single_ranking, group):
+    r1, r2 = rank_ranges(group)
+    position = {item: j for j, item in enumerate(ranking, start=1)}
+    total = 0
+    for item, low, high in zip(single_ranking, r1, r2):
+        j = position[item]
+        total += abs(item - j) if low <= j <= high else 100000000000
+    return total
+
+
+def _random_ranking(rng):
+    num_items = int(rng.integers(2, 25))
+    single_ranking = rng.permutation(num_items)
+    group = [int(g) for g in rng.integers(0, 3, num_items)]
+    return single_ranking, group
+
+
+def _profile(seed, num_voters=12, num_items=15):
+    rng = np.random.default_rng(seed)
+    candidates = ['c' + str(i) for i in range(num_items)]
+    profile_df = pd.DataFrame({v: list(rng.permutation(candidates)) for v in range(num_voters)})
+    profile_item_group_dict = {c: ('a' if rng.random() < 0.4 else 'b') for c in candidates}
+    return profile_df, profile_item_group_dict
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_fair_reranking_matches_networkx_cost(seed):
+    single_ranking, group = _random_ranking(np.random.default_rng(seed))
+    ranking = fair_reranking(single_ranking, group)
+    assert sorted(ranking.tolist()) == sorted(single_ranking.tolist())
+    expected = _networkx_fair_reranking(single_ranking, group)
+    assert _cost(ranking, single_ranking, group) == _cost(expected, single_ranking, group)
+
+
+def test_fair_reranking_fixed_output():
+    # ranges: positions 1-2 for 4 and 1, 3-4 for 0 and 5, 5-6 for 3 and 2 (3 and 2 cost 6 either way)
+    single_ranking = np.asarray([4, 0, 3, 1, 5, 2])
+    group = ['a', 'a', 'a', 'b', 'b', 'b']
+    assert fair_reranking(single_ranking, group).tolist() == [1, 4, 0, 5, 3, 2]
+
+
+def test_batch_matches_rapf():
+    profile_df, profile_item_group_dict = _profile(0)
+    batch = RAPFBatch(profile_df, profile_item_group_dict)
+    for seed, consensus in zip(range(10), batch.sweep(range(10), 5)):
+        assert consensus.equals(RAPF(profile_df, profile_item_group_dict, 5, seed))
+
+
+def test_parallel_sweep_matches_serial():
+    profile_df, profile_item_group_dict = _profile(1)
+    serial = RAPFBatch(profile_df, profile_item_group_dict).sweep(range(20), 8)
+    parallel = RAPFBatch(profile_df, profile_item_group_dict).sweep(range(20), 8, processes=2)
+    assert all(s.equals(p) for s, p in zip(serial, parallel))
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.encoded_profile import compress_profile
+from src.metrics import (SatisfactionProfile, average_satisfaction_percentage, full_sat_index,
+                         satisfaction_index_count)
+
+
+def _rankings(profile_df):
+    rankings = []
+    for col in profile_df.columns:
+        single_ranking = profile_df[col]
+        rankings.append(list(np.array(single_ranking[~pd.isnull(single_ranking)])))
+    return rankings
+
+
+def _reference_full_sat_index(profile_df, profile_percentage, consensus_df):
+    consensus = list(consensus_df[consensus_df.columns[0]])
+    sats = []
+    for ranking in _rankings(profile_df):
+        indxs = [consensus.index(i) for i in ranking[0:round(profile_percentage * len(ranking))] if i in consensus]
+        if len(indxs) == 0:
+            return np.inf
+        sats.append(np.max(indxs))
+    return (np.max(sats)+1)/len(consensus)
+
+
+def _reference_satisfaction_index_count(profile_df, profile_depth, consensus_df, consensus_depth, overlap):
+    consensus_top = list(consensus_df[consensus_df.columns[0]])[0:consensus_depth]
+    rankings = _rankings(profile_df)
+    num_satisfied = sum(len(set(r[0:profile_depth]).intersection(set(consensus_top))) >= overlap for r in rankings)
+    return num_satisfied/len(rankings)
+
+
+def _reference_average_satisfaction_percentage(profile_df, profile_percentage, consensus_df, consensus_percentage):
+    consensus = list(consensus_df[consensus_df.columns[0]])
+    consensus_top = consensus[0:round(consensus_percentage*len(consensus))]
+    satisfied = []
+    for ranking in _rankings(profile_df):
+        top = ranking[0:round(profile_percentage*len(ranking))]
+        satisfied.append(len(set(top).intersection(set(consensus_top)))/len(top))
+    return np.mean(satisfied)
+
+
+def _case(seed):
+    """
+    Partial profile with repeated ballots and a consensus ranking that misses some candidates.
+    """
+    rng = np.random.default_rng(seed)
+    num_candidates = int(rng.integers(10, 40))
+    candidates = ['c' + str(i) for i in range(num_candidates)]
+    distinct = []
+    for _ in range(int(rng.integers(2, 8))):
+        length = int(rng.integers(num_candidates // 2, num_candidates + 1))
+        distinct.append(list(rng.permutation(candidates)[:length]))
+    rankings = [distinct[int(i)] for i in rng.integers(0, len(distinct), int(rng.integers(5, 30)))]
+    profile_df = pd.DataFrame({v: r + [np.nan] * (num_candidates - len(r)) for v, r in enumerate(rankings)})
+    consensus_df = pd.DataFrame(list(rng.permutation(candidates)[:int(rng.integers(5, num_candidates + 1))]))
+    return profile_df, consensus_df
+
+
+@pytest.mark.parametrize('seed', range(25))
+def test_satisfaction_matches_reference(seed):
+    profile_df, consensus_df = _case(seed)
+    for profile in (profile_df, SatisfactionProfile(profile_df), SatisfactionProfile(compress_profile(profile_df))):
+        for profile_percentage in (.1, .3, 1):
+            assert full_sat_index(profile, profile_percentage, consensus_df) == \
+                _reference_full_sat_index(profile_df, profile_percentage, consensus_df)
+            for consensus_percentage in (.1, .2, .5):
+                assert average_satisfaction_percentage(profile, profile_percentage, consensus_df,
+                                                       consensus_percentage) == pytest.approx(
+                    _reference_average_satisfaction_percentage(profile_df, profile_percentage, consensus_df,
+                                                               consensus_percentage), rel=1e-12)
+        for depth in (1, 5, 10):
+            for overlap in (1, 2):
+                assert satisfaction_index_count(profile, depth, consensus_df, depth, overlap) == pytest.approx(
+                    _reference_satisfaction_index_count(profile_df, depth, consensus_df, depth, overlap), rel=1e-12)
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.borda import borda_scores
+from src.encoded_profile import compress_profile, encode_profile, LazyCompletedProfile
+from src.groupaware_stv import group_aware_single_transferable_vote
+from src.imputation import SimilarityImputer
+from src.transfer_engine import transfer_engine
+
+
+def _case(seed):
+    """
+    Candidate dataset with distinct numeric features, a top-k profile over it and two groups.
+    """
+    rng = np.random.default_rng(seed)
+    num_candidates = int(rng.integers(6, 20))
+    features = rng.random((num_candidates, 3))
+    ids = list(rng.permutation(np.arange(100, 100 + num_candidates)))
+    dataset_df = pd.DataFrame({'id': ids, 'f0': features[:, 0], 'f1': features[:, 1], 'f2': features[:, 2]})
+    depth = int(rng.integers(0, num_candidates // 2 + 1))
+    num_rankings = int(rng.integers(1, 12))
+    # few distinct prefixes so compressed ballots carry weights
+    prefixes = [list(rng.permutation(ids)[:depth]) for _ in range(int(rng.integers(1, 4)))]
+    profile_df = pd.DataFrame({v: prefixes[int(rng.integers(len(prefixes)))] for v in range(num_rankings)})
+    item_group_dict = {c: int(rng.integers(0, 2)) for c in ids}
+    return rng, profile_df, dataset_df, item_group_dict
+
+
+def _lazy_and_materialized(profile_df, dataset_df, compress):
+    profile = encode_profile(profile_df, dataset_df['id'])
+    if compress:
+        profile = compress_profile(profile)
+    lazy = SimilarityImputer(dataset_df, 'id').complete_lazily(profile)
+    assert isinstance(lazy, LazyCompletedProfile)
+    return lazy, lazy.materialize()
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('compress', [False, True])
+def test_lazy_profile_matches_materialized(seed, compress):
+    rng, profile_df, dataset_df, _ = _case(seed)
+    lazy, full = _lazy_and_materialized(profile_df, dataset_df, compress)
+    assert lazy.lengths.tolist() == full.lengths.tolist()
+    assert lazy.first_preferences().tolist() == full.first_preferences().tolist()
+    for num_items in [full.num_candidates, full.num_candidates + 3]:
+        assert borda_scores(lazy, num_items).tolist() == borda_scores(full, num_items).tolist()
+
+    # the same removals and transfers on both engines, in a random order
+    considered = [int(c) for c in rng.permutation(full.num_candidates)]
+    lazy_engine = transfer_engine(lazy, considered)
+    full_engine = transfer_engine(full, considered)
+    for cand in considered:
+        assert lazy_engine.next_preferences(cand) == full_engine.next_preferences(cand)
+        lazy_engine.remove(cand)
+        full_engine.remove(cand)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_group_stv_on_lazy_profile_matches_materialized(seed):
+    _, profile_df, dataset_df, item_group_dict = _case(seed)
+    lazy, full = _lazy_and_materialized(profile_df, dataset_df, compress=True)
+    group_sizes = pd.Series(list(item_group_dict.values())).value_counts()
+    group_constraints = {grp: int(np.ceil(size / 2)) for grp, size in group_sizes.items()}
+    # the count consumes the constraints, every run gets its own copy
+    assert (group_aware_single_transferable_vote(lazy, item_group_dict, dict(group_constraints))
+            == group_aware_single_transferable_vote(full, item_group_dict, dict(group_constraints)))
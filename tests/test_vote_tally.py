@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from src.vote_tally import VoteTally
+
+
+def _reference_lowest(votes, tiebreak_scores, order):
+    """
+    Candidates tied on the fewest votes as the dictionary count ordered them: lowest tiebreak score first, then the
+    candidate order.
+    """
+    min_votes = min(votes.values())
+    tied = [c for c in votes if votes[c] == min_votes]
+    return sorted(tied, key=lambda c: (tiebreak_scores[c], order.index(c)))
+
+
+def _reference_reaching(votes, quota):
+    """
+    Candidates reaching the quota sorted like sorted(zip(votes, candidates), reverse=True).
+    """
+    return [c for v, c in sorted(((v, c) for c, v in votes.items() if v >= quota), reverse=True)]
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_tie_order_matches_dictionary_count(seed):
+    rng = np.random.default_rng(seed)
+    num_candidates = int(rng.integers(2, 15))
+    order = [int(c) for c in rng.permutation(num_candidates)]
+    tiebreak_scores = {c: int(rng.integers(0, 3)) for c in order}  # many equal tiebreak scores
+    tally = VoteTally(order, tiebreak_scores, num_candidates)
+    votes = {c: 0.0 for c in order}
+    for _ in range(40):
+        if len(votes) > 1 and rng.random() < 0.15:
+            cand = list(votes)[int(rng.integers(0, len(votes)))]
+            assert tally.remove(cand) == votes.pop(cand)
+        else:
+            cand = list(votes)[int(rng.integers(0, len(votes)))]
+            vote_num = float(rng.integers(0, 3))  # small integers keep many candidates tied on votes
+            tally.add(cand, vote_num)
+            votes[cand] += vote_num
+        assert tally.lowest() == _reference_lowest(votes, tiebreak_scores, order)
+        assert tally.max_votes() == max(votes.values())
+        quota = float(rng.integers(0, 5))
+        assert tally.reaching(quota) == _reference_reaching(votes, quota)
+        assert all(tally[c] == v for c, v in votes.items())
+
+
+def test_empty_tally():
+    tally = VoteTally([0], {0: 0}, 1)
+    tally.remove(0)
+    assert tally.max_votes() == -np.inf
+    with pytest.raises(ValueError):
+        tally.lowest()
+    with pytest.raises(KeyError):
+        tally.add(0, 1)
@@ -80,21 +80,23 @@ k_cnt = 20
 #Profile item group dict
 np_profile = profile_df.to_numpy()
 candidate_ids = list(np.unique(np_profile))
-ranked_grps = [dataset_df.loc[dataset_df[candidates_col] == e][sa_col].item() for e in candidate_ids]
-profile_item_group_dict = dict(zip(candidate_ids, ranked_grps))
+pool = src.CandidatePool(dataset_df, candidates_col, sa_col)
+profile_item_group_dict = pool.item_group_dict(candidate_ids)
 dataset_name = 'World Happiness'
 csv_name = 'results/world-happiness/results_equal_rep.csv'
+imputation_cache = src.ImputationCache('cache/imputation')  # EQUAL, PROPORTIONAL and config_study share one imputation
 epira_bnd = .9
 
 workflow(profile_df, dataset_df, candidates_col, sa_col, fair_rep, rank_fairness, k_cnt,
-             profile_item_group_dict, candidate_ids, dataset_name, csv_name, epira_bnd)
+             profile_item_group_dict, candidate_ids, dataset_name, csv_name, epira_bnd, imputation_cache)
 
 fair_rep = 'PROPORTIONAL'
 csv_name = 'results/world-happiness/results_prop_rep.csv'
 epira_bnd = .9
 workflow(profile_df, dataset_df, candidates_col, sa_col, fair_rep, rank_fairness, k_cnt,
-             profile_item_group_dict, candidate_ids, dataset_name, csv_name, epira_bnd)
+             profile_item_group_dict, candidate_ids, dataset_name, csv_name, epira_bnd, imputation_cache)
 
-prefair_akt, random_akt = config_study(profile_df, dataset_df, candidates_col, sa_col, pd.concat(rank_store,  axis = 1))
+prefair_akt, random_akt = config_study(profile_df, dataset_df, candidates_col, sa_col, pd.concat(rank_store,  axis = 1),
+                                       imputation_cache=imputation_cache)
 print("prefair average KT: ", prefair_akt)
 print("random average KT: ", random_akt)